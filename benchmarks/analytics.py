@@ -0,0 +1,49 @@
+from src.analytics import GameStats, aggregate
+from src.game import HigherLowerGame
+from src.strategy import BOTS
+from src.tournament import getGameRng, playGame
+import sys
+import time
+
+
+def playGames(numGames: int) -> list[HigherLowerGame]:
+    return [playGame(BOTS["midpoint"], index % 2 == 0, getGameRng(0, 0, index)) for index in range(numGames)]
+
+def checkMerge(games: list[HigherLowerGame], numWorkers: int) -> bool:
+    """
+    Aggregates the games whole and in interleaved parts, returns whether merging the parts gives exactly the whole
+    """
+    whole = aggregate(games)
+    merged = GameStats()
+    for worker in range(numWorkers):
+        merged.merge(aggregate(games[worker::numWorkers]))
+    return vars(merged) == vars(whole) and merged.getSummary() == whole.getSummary()
+
+def timeListener(games: list[HigherLowerGame]) -> float:
+    """
+    Returns the cost per game of ending a finished game (what playRound does when it returns False) with a GameStats listening
+    """
+    stats = GameStats()
+    for game in games:
+        game.gameOverListeners = [stats.add]
+
+    start = time.perf_counter()
+    for game in games:
+        game.endGame()
+    return (time.perf_counter() - start) / len(games)
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    games = playGames(numGames)
+    isMergeExact = checkMerge(games, 7)
+
+    start = time.perf_counter()
+    stats = aggregate(games)
+    addTime = (time.perf_counter() - start) / numGames
+
+    print(f"merge exact: {isMergeExact}")
+    print(f"add: {addTime * 1e6:.2f} us per game, as a listener: {timeListener(games) * 1e6:.2f} us per game")
+    print(stats.getSummary())
+
+    sys.exit(0 if isMergeExact else 1)
@@ -0,0 +1,56 @@
+from PIL import Image
+from src.atlas import IMAGES_DIR, getAtlasPath, getSourceNames, loadAtlas
+import os
+import sys
+import time
+
+
+CARD_SIZE = (150,218)
+
+def loadFromPngs(names: list[str], size: tuple[int, int]) -> list[Image.Image]:
+    """
+    The original path, every card is opened from its own full size png and resized
+    """
+    images: list[Image.Image] = []
+    for name in names:
+        with Image.open(os.path.join(IMAGES_DIR, f"{name}.png")) as originalImg:
+            images.append(originalImg.resize(size))
+
+    return images
+
+def loadFromAtlas(names: list[str], size: tuple[int, int]) -> list[Image.Image]:
+    """
+    The atlas path, one file is loaded the way the game loads it (loadAtlas) then every card is sliced out of it
+    """
+    atlas = loadAtlas(size)
+    return [atlas.getImage(name) for name in names]
+
+def timeLoad(loadFn, names: list[str], size: tuple[int, int], repeats: int) -> float:
+    """
+    Returns the best wall time (in seconds) of loading every card
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        loadFn(names, size)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def getDirSize(paths: list[str]) -> int:
+    return sum(os.path.getsize(path) for path in paths)
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    names = getSourceNames()
+
+    pngTime = timeLoad(loadFromPngs, names, CARD_SIZE, repeats)
+    atlasTime = timeLoad(loadFromAtlas, names, CARD_SIZE, repeats)
+
+    pngBytes = getDirSize([os.path.join(IMAGES_DIR, f"{name}.png") for name in names])
+    atlasBytes = getDirSize([getAtlasPath(CARD_SIZE)])
+
+    print(f"{len(names)} cards at {CARD_SIZE[0]}x{CARD_SIZE[1]}, best of {repeats}")
+    print(f"per png: {pngTime * 1000:8.1f} ms  {pngBytes / 1024:8.0f} KiB on disk")
+    print(f"atlas:   {atlasTime * 1000:8.1f} ms  {atlasBytes / 1024:8.0f} KiB on disk")
+    print(f"speedup: {pngTime / atlasTime:8.1f}x")
@@ -0,0 +1,125 @@
+from src.game import CARDS, MJ_CARDS, NUM_NORMAL_CARDS, RODMAN_CARDS, Constant, buildDeckIds, buildDecks, getDeckSize
+import math
+import random
+import sys
+import time
+
+
+def buildLegacyDeckIds(isBullsEdition: bool, rng: random.Random) -> list[int]:
+    """
+    The original construction, reshuffle until the top card is normal then list.insert the MJ cards
+    """
+    cardIds = list(range(NUM_NORMAL_CARDS))
+    if isBullsEdition:
+        cardIds.extend(card.id for card in RODMAN_CARDS)
+
+    rng.shuffle(cardIds)
+    while isBullsEdition and cardIds[-1] >= NUM_NORMAL_CARDS:
+        rng.shuffle(cardIds)
+
+    if isBullsEdition:
+        for card, pos in zip(MJ_CARDS, Constant.MJ_LOCATIONS.value):
+            cardIds.insert(len(cardIds) - pos, card.id)
+
+    return cardIds
+
+def getLegacyDecks(numDecks: int, rng: random.Random) -> list[list[int]]:
+    return [buildLegacyDeckIds(True, rng) for _ in range(numDecks)]
+
+def getSinglePassDecks(numDecks: int, rng: random.Random) -> list[bytearray]:
+    return [buildDeckIds(True, rng) for _ in range(numDecks)]
+
+def getBulkDecks(numDecks: int, rng: random.Random) -> list[bytearray]:
+    deckSize = getDeckSize(True)
+    out = buildDecks(numDecks, True, rng)
+    return [out[i * deckSize:(i + 1) * deckSize] for i in range(numDecks)]
+
+def countPositions(decks) -> list[list[int]]:
+    """
+    Returns counts[position from the top][card id] over Bulls edition decks (top card last)
+    """
+    counts = [[0] * len(CARDS) for _ in range(getDeckSize(True))]
+    for deck in decks:
+        for pos, cardId in enumerate(reversed(deck)):
+            counts[pos][cardId] += 1
+
+    return counts
+
+def countAdjacentPairs(decks) -> list[int]:
+    """
+    Returns counts[card id * len(CARDS) + id of the card right below it] over every adjacent pair of cards in the decks,
+    which the per-position counts cannot see: a construction can get every position right and still correlate neighbours
+    """
+    counts = [0] * (len(CARDS) * len(CARDS))
+    for deck in decks:
+        for below, above in zip(deck, deck[1:]):
+            counts[above * len(CARDS) + below] += 1
+
+    return counts
+
+def getChiSquarePValue(countsA: list[int], countsB: list[int]) -> float:
+    """
+    Two sample chi-square test of whether both sets of counts come from the same distribution (Wilson-Hilferty approximation)
+    """
+    totalA, totalB = sum(countsA), sum(countsB)
+    statistic = 0.0
+    degreesOfFreedom = -1
+    for a, b in zip(countsA, countsB):
+        if a + b == 0:
+            continue
+        degreesOfFreedom += 1
+        expectedA = (a + b) * totalA / (totalA + totalB)
+        expectedB = (a + b) * totalB / (totalA + totalB)
+        statistic += (a - expectedA) ** 2 / expectedA + (b - expectedB) ** 2 / expectedB
+
+    if degreesOfFreedom <= 0:
+        return 1.0
+
+    z = ((statistic / degreesOfFreedom) ** (1 / 3) - (1 - 2 / (9 * degreesOfFreedom))) / math.sqrt(2 / (9 * degreesOfFreedom))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def checkDistribution(getDecks, numDecks: int, seed: int) -> tuple[float, float]:
+    """
+    Compares decks from getDecks(numDecks, rng) against the legacy construction, returning the smallest per-position
+    p-value (each of ~58 positions is tested separately, so expect it to be small just by chance, roughly < 1/58) and the
+    p-value of the adjacent pair counts
+    """
+    legacyDecks = getLegacyDecks(numDecks, random.Random(seed))
+    decks = getDecks(numDecks, random.Random(seed + 1))
+
+    legacyCounts, counts = countPositions(legacyDecks), countPositions(decks)
+    minPositionPValue = min(getChiSquarePValue(legacyCounts[pos], counts[pos]) for pos in range(len(counts)))
+    return minPositionPValue, getChiSquarePValue(countAdjacentPairs(legacyDecks), countAdjacentPairs(decks))
+
+def timeBuild(build, numDecks: int, isBullsEdition: bool) -> float:
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(numDecks):
+        build(isBullsEdition, rng)
+    return numDecks / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    numDecks = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    for isBullsEdition in (False, True):
+        edition = "bulls" if isBullsEdition else "normal"
+        print(f"{edition:>6}: legacy {timeBuild(buildLegacyDeckIds, numDecks, isBullsEdition):10,.0f} decks/sec, single pass {timeBuild(buildDeckIds, numDecks, isBullsEdition):10,.0f} decks/sec")
+
+    # the first call imports numpy, keep that out of the timing
+    buildDecks(1, True, random.Random(0))
+    rng = random.Random(0)
+    start = time.perf_counter()
+    buildDecks(numDecks, True, rng)
+    print(f"  bulk: {numDecks / (time.perf_counter() - start):10,.0f} decks/sec into one preallocated buffer")
+
+    # Bonferroni corrected over the positions, a failure here means the two constructions disagree
+    isSameDistribution = True
+    for name, getDecks in (("single pass", getSinglePassDecks), ("bulk", getBulkDecks)):
+        minPositionPValue, pairPValue = checkDistribution(getDecks, numDecks, seed=0)
+        matches = minPositionPValue > 0.001 / getDeckSize(True) and pairPValue > 0.001
+        isSameDistribution = isSameDistribution and matches
+        print(
+            f"{name} distribution: smallest per-position p-value {minPositionPValue:.4f}, adjacent pairs p-value {pairPValue:.4f} "
+            f"({'matches' if matches else 'DIFFERS from'} legacy)"
+        )
+    sys.exit(0 if isSameDistribution else 1)
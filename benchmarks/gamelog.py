@@ -0,0 +1,60 @@
+from src import gamelog
+from src.game import HigherLowerGame
+from src.gamelog import GameLogReader, GameLogWriter, replay, verifyLog
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def writeLog(path: str, numGames: int) -> None:
+    """
+    Plays numGames games with mostly midpoint guesses and logs them, every 1000th game is logged with a wrong score
+    """
+    rng = random.Random(0)
+    with GameLogWriter(path) as writer:
+        for gameNumber in range(numGames):
+            game = HigherLowerGame()
+            game.configureSpecialEdition(gameNumber % 2 == 0, rng, 2 if gameNumber % 100 == 0 else 1)
+            cardIds = bytes(game.deck.cardIds)
+            game.startGame()
+
+            guesses = []
+            isPlayNextRound = True
+            while isPlayNextRound:
+                guesses.append(game.currentCard.rank.value < 8 if rng.random() < 0.9 else rng.random() < 0.5)
+                isPlayNextRound = game.playRound(guesses[-1])
+
+            score = game.score + 1 if gameNumber % 1000 == 999 else game.score
+            writer.append(cardIds, guesses, score, game.isBullsEdition, game.deck.numDecks, game.isTieCorrect)
+
+def timeVerify(path: str, numGames: int) -> tuple[float, list[int]]:
+    start = time.perf_counter()
+    numVerified, mismatches = verifyLog(path)
+    assert numVerified == numGames
+    return numGames / (time.perf_counter() - start) * 60, mismatches
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    expected = list(range(999, numGames, 1000))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.log")
+        writeLog(path, numGames)
+        print(f"log: {os.path.getsize(path) / numGames:.1f} bytes per game")
+
+        reader = GameLogReader(path)
+        start = time.perf_counter()
+        for gameNumber in random.Random(1).sample(range(numGames), 1000):
+            replay(reader.getGame(gameNumber), 10)
+        print(f"random access: {(time.perf_counter() - start):.3f} ms per game (lookup and replay to round 10)")
+
+        batchRate, batchMismatches = timeVerify(path, numGames)
+        print(f"verify (simulator):  {batchRate:12,.0f} games per minute, {len(batchMismatches)} wrong scores found")
+
+        gamelog.np = None
+        replayRate, replayMismatches = timeVerify(path, numGames)
+        print(f"verify (playRound):  {replayRate:12,.0f} games per minute, {len(replayMismatches)} wrong scores found")
+
+    sys.exit(0 if batchMismatches == expected and replayMismatches == expected else 1)
@@ -0,0 +1,120 @@
+from src.game import Deck, HigherLowerGame
+from src.history import EventSourcedGame
+import copy
+import random
+import sys
+import time
+import tracemalloc
+
+
+def replayFromScratch(game: EventSourcedGame) -> HigherLowerGame:
+    """
+    Plays the guesses leading to the game's current state on a plain HigherLowerGame with the same deck order
+    """
+    replayed = HigherLowerGame()
+    replayed.isBullsEdition = game.isBullsEdition
+    replayed.isTieCorrect = game.isTieCorrect
+    replayed.deck = Deck.fromCardIds(game.deck.order, game.deck.numDecks)
+    replayed.startGame()
+    for isUserInputHigher in game.getGuesses():
+        replayed.playRound(isUserInputHigher)
+    return replayed
+
+def getComparableState(game: HigherLowerGame) -> tuple:
+    return (
+        bytes(game.deck.cardIds), game.currentCard, game.normalCardsDrawned, game.currentRodmanCards, game.currentMjRound,
+        game.currentMjSequence, game.isMjActivated, game.isRodmanActivated, game.score, game.rodmanCardsUsed,
+        game.mjRoundsEntered, game.mjRoundsWon, game.deck.countHigher(game.currentCard), game.deck.countLower(game.currentCard),
+    )
+
+def checkAgainstReplay(numGames: int, seed: int) -> int:
+    """
+    Plays games with random guesses, undos, redos and forks, comparing every state with a replay from scratch, returns the number of mismatches
+    """
+    rng = random.Random(seed)
+    numMismatches = 0
+
+    for _ in range(numGames):
+        game = EventSourcedGame()
+        game.configureSpecialEdition(True, rng, rng.choice((1, 2)))
+        game.startGame()
+
+        for _ in range(200):
+            action = rng.random()
+            if action < 0.2 and game.canUndo():
+                game.undo()
+            elif action < 0.3 and game.canRedo():
+                game.redo()
+            elif action < 0.4:
+                game = game.fork()
+            elif not game.isOver:
+                game.playRound(rng.random() < 0.5)
+
+            if getComparableState(game) != getComparableState(replayFromScratch(game)):
+                numMismatches += 1
+
+    return numMismatches
+
+def getGame(seed: int, numRounds: int) -> EventSourcedGame:
+    """
+    Returns a Bulls edition game played numRounds rounds in, taking back any guess that would end it
+    """
+    game = EventSourcedGame()
+    game.configureSpecialEdition(True, random.Random(seed))
+    game.startGame()
+    while game.node.numRounds < numRounds and len(game.deck) > 1:
+        if not game.playRound(game.deck.countHigher(game.currentCard) >= game.deck.countLower(game.currentCard)):
+            game.undo()
+            game.playRound(game.deck.countHigher(game.currentCard) < game.deck.countLower(game.currentCard))
+    return game
+
+def timePerOp(op, numOps: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(numOps):
+        op()
+    return (time.perf_counter_ns() - start) / numOps
+
+def measureBranchBytes(fork, numBranches: int) -> float:
+    """
+    Returns the traced memory held per branch after making numBranches branches that each play one more round
+    """
+    tracemalloc.start()
+    branches = []
+    for i in range(numBranches):
+        branch = fork()
+        branch.playRound(i % 2 == 0)
+        branches.append(branch)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / numBranches
+
+if __name__ == "__main__":
+    numBranches = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    numMismatches = checkAgainstReplay(100, 0)
+    print(f"undo/redo/fork against replaying from scratch: {numMismatches} mismatches")
+
+    # the same operations on a shallow and a deep game, the event sourced ones should not depend on the depth
+    for numRounds in (1, 40):
+        game = getGame(1, numRounds)
+
+        def undoRedo():
+            game.undo()
+            game.redo()
+
+        print(
+            f"{game.node.numRounds:2} rounds in: undo + redo {timePerOp(undoRedo, 100_000):6.0f} ns, fork {timePerOp(game.fork, 100_000):6.0f} ns, "
+            f"deepcopy {timePerOp(lambda: copy.deepcopy(game), 200):8.0f} ns"
+        )
+
+    forks = [game.fork() for _ in range(numBranches)]
+    isShared = all(fork.deck.order is game.deck.order and fork.node is game.node for fork in forks)
+    print(f"{numBranches} forks share the deck order and history: {isShared}")
+
+    forkBytes = measureBranchBytes(game.fork, numBranches)
+    # deep copies are slow enough that a sample of them is plenty
+    copyBytes = measureBranchBytes(lambda: copy.deepcopy(game), max(1, numBranches // 20))
+    print(f"fork:     {forkBytes:8.0f} bytes per branch")
+    print(f"deepcopy: {copyBytes:8.0f} bytes per branch (the history included)")
+
+    sys.exit(1 if numMismatches or not isShared else 0)
@@ -0,0 +1,47 @@
+from benchmarks.suite import benchDeckConstruction, benchPlayRound
+from src import instrumentation
+import argparse
+import json
+import sys
+
+
+# each benchmark is measured before instrumentation was ever enabled, while it is enabled and after it has been disabled
+# again, disabled should match never enabled to within run to run noise (which is large for deck construction, so the
+# check that disabling puts back the very same functions is what shows there is nothing left running)
+BENCHMARKS = {
+    "game.playRound": benchPlayRound(True),
+    "deck.construct": benchDeckConstruction(True),
+}
+
+def measure(bench, seed: int, scale: float, repeats: int) -> float:
+    return max(bench(seed, scale) for _ in range(repeats))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the overhead of src.instrumentation when enabled and when disabled")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    before = {(owner, methodName): owner.__dict__[methodName] for owner, methodName, _, _ in instrumentation.targets}
+
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        # for the first benchmark this is before instrumentation was ever enabled in this process
+        baseline = measure(bench, args.seed, args.scale, args.repeats)
+        instrumentation.enable()
+        enabled = measure(bench, args.seed, args.scale, args.repeats)
+        instrumentation.disable()
+        disabled = measure(bench, args.seed, args.scale, args.repeats)
+
+        results[name] = {
+            "baselinePerSec": baseline,
+            "enabledPerSec": enabled,
+            "disabledPerSec": disabled,
+            "enabledOverhead": baseline / enabled - 1,
+            "disabledOverhead": baseline / disabled - 1,
+        }
+
+    isRestored = all(owner.__dict__[methodName] is method for (owner, methodName), method in before.items())
+    print(json.dumps({"results": results, "isRestored": isRestored, "spans": instrumentation.dump()["spans"]}, indent=2))
+    sys.exit(0 if isRestored else 1)
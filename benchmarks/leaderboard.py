@@ -0,0 +1,93 @@
+from src.leaderboard import INSERT_SCORE, Leaderboard, LeaderboardWriter, connect
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+
+def getRow(rng: random.Random) -> tuple:
+    """
+    Returns a made up score row, roughly shaped like real scores (most games end within a few rounds)
+    """
+    isBullsEdition = rng.random() < 0.5
+    numRounds = min(int(rng.expovariate(0.4)) + 1, 60)
+    return (numRounds - 1 + (10 * (rng.random() < 0.05) if isBullsEdition else 0), isBullsEdition, rng.random() < 0.2, numRounds, rng.choice((1, 1, 2, 4)))
+
+def writeScores(path: str, numScores: int, seed: int) -> None:
+    """
+    One writer process, recording scores as fast as it can like a busy headless runner would
+    """
+    rng = random.Random(seed)
+    with LeaderboardWriter(path) as writer:
+        for _ in range(numScores):
+            writer.record(*getRow(rng))
+
+def loadTest(path: str, numWriters: int, scoresPerWriter: int) -> float:
+    """
+    Runs numWriters writer processes against the same database at once, returns the scores written per second
+    """
+    processes = [multiprocessing.Process(target=writeScores, args=(path, scoresPerWriter, seed)) for seed in range(numWriters)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"writer exited with {process.exitcode}")
+    return numWriters * scoresPerWriter / (time.perf_counter() - start)
+
+def fill(path: str, numRows: int, seed: int) -> None:
+    """
+    Bulk loads rows straight through one connection, to get the table up to the size the queries are timed at
+    """
+    rng = random.Random(seed)
+    connection = connect(path)
+    for start in range(0, numRows, 100_000):
+        connection.execute("BEGIN IMMEDIATE")
+        connection.executemany(INSERT_SCORE, (getRow(rng) + (time.time(),) for _ in range(min(100_000, numRows - start))))
+        connection.execute("COMMIT")
+    connection.close()
+
+def timeQuery(query, repeats: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - start) / repeats * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load tests the leaderboard with concurrent writer processes, then times its queries on a large table")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--scores-per-writer", type=int, default=50_000)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows in the table when the queries are timed")
+    parser.add_argument("--path", default=None, help="database to use (defaults to a new temporary one)")
+    args = parser.parse_args()
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), "leaderboard.db")
+
+    scoresPerSec = loadTest(path, args.writers, args.scores_per_writer)
+    leaderboard = Leaderboard(path)
+    numRows = leaderboard.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    numCounted = leaderboard.getNumGames(False) + leaderboard.getNumGames(True)
+    expected = args.writers * args.scores_per_writer
+    print(f"{args.writers} concurrent writers: {scoresPerSec:,.0f} scores/sec, {numRows} rows and {numCounted} counted of {expected} recorded")
+    # at least, since --path may point at a database that already has scores in it
+    isConsistent = numRows >= expected and numCounted == numRows
+
+    fill(path, max(0, args.rows - numRows), args.writers)
+    numRows = leaderboard.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    print(f"queries at {numRows:,} rows:")
+    print(f"  top 10:                {timeQuery(lambda: leaderboard.getTopScores(10)):7.3f} ms")
+    for isBullsEdition in (False, True):
+        edition = "bulls" if isBullsEdition else "normal"
+        print(f"  top 10 {edition:<7}        {timeQuery(lambda: leaderboard.getTopScores(10, isBullsEdition)):7.3f} ms")
+        print(f"  p50 and p99 {edition:<7}   {timeQuery(lambda: (leaderboard.getQuantile(0.5, isBullsEdition), leaderboard.getQuantile(0.99, isBullsEdition))):7.3f} ms")
+
+    for query in ("SELECT * FROM scores ORDER BY score DESC LIMIT 10", "SELECT * FROM scores WHERE isBullsEdition = 1 ORDER BY score DESC LIMIT 10"):
+        plan = " / ".join(row[-1] for row in leaderboard.connection.execute(f"EXPLAIN QUERY PLAN {query}"))
+        print(f"  plan: {plan}")
+
+    isConsistent = isConsistent and leaderboard.getNumGames(False) + leaderboard.getNumGames(True) == numRows
+    leaderboard.close()
+    raise SystemExit(0 if isConsistent else 1)
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+
+
+class Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        One client connection and the games it is playing
+        """
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.sessions: list[str] = []
+        self.currentCards: list[str] = []
+
+    async def send(self, request: dict) -> dict:
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        return json.loads(await self.reader.readline())
+
+    async def startSessions(self, numSessions: int, seed: int) -> None:
+        for i in range(numSessions):
+            response = await self.send({"op": "start", "bulls": True, "seed": seed + i})
+            self.sessions.append(response["session"])
+            self.currentCards.append(response["state"]["currentCard"])
+
+    async def guess(self, numRequests: int, latencies: list[float]) -> None:
+        """
+        Keeps guessing across this connection's games round robin (restarting any game that ends) until numRequests guesses have been made
+        """
+        for i in range(numRequests):
+            slot = i % len(self.sessions)
+            # midpoint guessing, so games last long enough to exercise the whole rule set
+            isHigher = self.currentCards[slot].split("_")[0] in ("2", "3", "4", "5", "6", "7")
+
+            start = time.perf_counter()
+            response = await self.send({"op": "guess", "session": self.sessions[slot], "higher": isHigher})
+            latencies.append(time.perf_counter() - start)
+
+            if not response["continue"]:
+                response = await self.send({"op": "start", "bulls": True})
+                self.sessions[slot] = response["session"]
+            self.currentCards[slot] = response["state"]["currentCard"]
+
+async def runLevel(host: str, port: int, numSessions: int, numConnections: int, numRequests: int) -> dict:
+    numConnections = min(numConnections, numSessions)
+    connections = [Connection(*await asyncio.open_connection(host, port, limit=64 * 1024)) for _ in range(numConnections)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        connection.startSessions(numSessions // numConnections + (1 if i < numSessions % numConnections else 0), i * numSessions)
+        for i, connection in enumerate(connections)
+    ))
+    startElapsed = time.perf_counter() - start
+
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(connection.guess(numRequests // numConnections, latencies) for connection in connections))
+    guessElapsed = time.perf_counter() - start
+
+    for connection in connections:
+        connection.writer.close()
+
+    latencies.sort()
+    return {
+        "sessions": numSessions,
+        "sessionsStartedPerSec": numSessions / startElapsed,
+        "requests": len(latencies),
+        "requestsPerSec": len(latencies) / guessElapsed,
+        "p50Ms": latencies[len(latencies) // 2] * 1000,
+        "p99Ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+def spawnServer(port: int) -> subprocess.Popen:
+    server = subprocess.Popen([sys.executable, "-m", "src.server", "--port", str(port)])
+    # wait until it accepts connections
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+
+    server.kill()
+    raise RuntimeError("server did not start")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load tests src.server, a fresh server is spawned for every session count unless --port is given")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="use an already running server instead of spawning one")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=100_000, help="guesses made at each session count")
+    args = parser.parse_args()
+
+    for numSessions in args.sessions:
+        server = spawnServer(18765) if args.port is None else None
+        try:
+            result = asyncio.run(runLevel(args.host, args.port or 18765, numSessions, args.connections, args.requests))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        print(json.dumps(result))
@@ -0,0 +1,51 @@
+from src.game import CARDS, Deck, HigherLowerGame
+import random
+import sys
+import tracemalloc
+
+
+class LegacyCard:
+    def __init__(self, rank, suit, count=None):
+        """
+        The Card class as it was before card ids, a regular object with a __dict__
+        """
+        self.rank = rank
+        self.suit = suit
+        self.value = rank.value + suit.value
+        self.count = count
+
+def buildLegacyDeck(deck: Deck) -> list[LegacyCard]:
+    """
+    Returns the same deck as the old representation, a list holding a separate Card object per card
+    """
+    return [LegacyCard(card.rank, card.suit, card.count) for card in deck.cards]
+
+def measureBytes(build, numItems: int) -> float:
+    """
+    Returns the traced memory held per item after building numItems items
+    """
+    tracemalloc.start()
+    items = [build(i) for i in range(numItems)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del items
+    return allocated / numItems
+
+def buildGame(seed: int) -> HigherLowerGame:
+    game = HigherLowerGame()
+    game.configureSpecialEdition(True, random.Random(seed))
+    return game
+
+if __name__ == "__main__":
+    numItems = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    template = Deck(True, random.Random(0))
+    legacyBytes = measureBytes(lambda i: buildLegacyDeck(template), numItems)
+    deckBytes = measureBytes(lambda i: bytearray(template.cardIds), numItems)
+    gameBytes = measureBytes(buildGame, numItems)
+
+    print(f"{len(template)} cards per Bulls deck, {len(CARDS)} shared Card objects")
+    print(f"list of Card objects: {legacyBytes:8.0f} bytes per deck ({legacyBytes / len(template):6.1f} per card)")
+    print(f"card id bytearray:    {deckBytes:8.0f} bytes per deck ({deckBytes / len(template):6.1f} per card)")
+    print(f"full HigherLowerGame: {gameBytes:8.0f} bytes per game (before its value index is first used)")
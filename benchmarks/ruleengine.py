@@ -0,0 +1,157 @@
+from src.game import MJ_CARDS, NUM_NORMAL_CARDS, RODMAN_CARDS, Card, Constant, Deck, HigherLowerGame, Rank
+from src.tournament import getGameRng
+import random
+import sys
+import time
+
+
+class LegacyHigherLowerGame(HigherLowerGame):
+    def playRound(self, isUserInputHigher: bool) -> bool:
+        """
+        playRound as it was before the rules were compiled into a RuleTable
+        """
+        nextCard: Card = self.deck.drawCard()
+
+        if nextCard.rank == Rank.MJ:
+            self.isMjActivated = True
+            self.mjRoundsEntered += 1
+            return True
+        elif nextCard.rank == Rank.RODMAN:
+            self.currentRodmanCards += 1
+            return True
+        else: # next card is NOT a special card
+            isCorrect: bool = self.compareCards(self.currentCard, nextCard, isUserInputHigher)
+            
+            # need to increment before if statements so, because if we are on the last card, the game needs to know that this is the last round and return false
+            self.normalCardsDrawned += 1
+
+            if self.isMjActivated:
+                # if player correctly guess current MJ sequence
+                if (isCorrect and Constant.MJ_WINNING_SEQUENCE.value[self.currentMjRound] == 1) or (not isCorrect and Constant.MJ_WINNING_SEQUENCE.value[self.currentMjRound] == 0):
+                    self.score += 1
+                    self.currentMjSequence.append(Constant.MJ_WINNING_SEQUENCE.value[self.currentMjRound])
+
+                    # check if the player won the mj round 
+                    if self.currentMjSequence == Constant.MJ_WINNING_SEQUENCE.value:
+                        self.score += Constant.MJ_BONUS_POINTS.value
+                        self.mjRoundsWon += 1
+                        self.resetMjRound()
+                        self.currentCard = nextCard
+                        return True
+                else: # player guesses wrong so we end
+                    self.resetMjRound()
+                    self.currentCard = nextCard
+                    return True
+                self.currentMjRound += 1
+            elif isCorrect and self.isRodmanActivated:
+                self.score += Constant.RODMAN_BONUS_POINTS.value
+                self.isRodmanActivated = False
+            elif isCorrect:
+                self.score += 1
+            else:
+                if self.isBullsEdition and self.currentRodmanCards > 0 and self.normalCardsDrawned < self.deck.startingNumPlayingCards:
+                    self.currentRodmanCards -= 1
+                    self.rodmanCardsUsed += 1
+                    self.isRodmanActivated = True
+                else: # this means u either (have no rodman cards and got it wrong) or (u are playing normal version of the game and got it wrong)
+                    return self.endGame()
+
+            if self.normalCardsDrawned == self.deck.startingNumPlayingCards:
+                return self.endGame()
+            
+            self.currentCard = nextCard
+
+            return True
+
+def getState(game: HigherLowerGame) -> tuple:
+    return (
+        game.currentCard, game.normalCardsDrawned, len(game.deck), game.score, game.currentRodmanCards, game.isRodmanActivated,
+        game.isMjActivated, game.currentMjRound, game.currentMjSequence, game.rodmanCardsUsed, game.mjRoundsEntered, game.mjRoundsWon,
+    )
+
+def newGame(gameClass: type, index: int) -> HigherLowerGame:
+    """
+    Sets up the index-th game of the differential test, covering both editions, shoes and the tie rule
+    """
+    rng = getGameRng(0, 0, index)
+    game = gameClass()
+    game.configureSpecialEdition(index % 4 != 0, rng, (1, 1, 2, 8)[index % 4], index % 3 == 0)
+    game.startGame()
+    return game
+
+def newBackToBackMjGame(gameClass: type, index: int) -> HigherLowerGame:
+    """
+    Sets up a Bulls edition game whose deck has MJ cards straight after each other, also in the middle of an MJ round and after a
+    Rodman card, which the standard MJ positions never produce
+    """
+    normalIds = list(range(NUM_NORMAL_CARDS))
+    random.Random(index).shuffle(normalIds)
+    mjId, rodmanId = MJ_CARDS[0].id, RODMAN_CARDS[0].id
+    drawOrder = normalIds[:1] + [mjId, mjId] + normalIds[1:3] + [mjId] + normalIds[3:4] + [rodmanId, mjId, mjId] + normalIds[4:]
+
+    game = gameClass()
+    game.configureSpecialEdition(True)
+    game.deck = Deck.fromCardIds(bytes(reversed(drawOrder)))
+    game.startGame()
+    return game
+
+def isSameGame(game: HigherLowerGame, legacyGame: HigherLowerGame, index: int) -> bool:
+    """
+    Plays the same guesses through both games, returning whether they agree after every round
+    """
+    rng = random.Random(index)
+    isPlayNextRound = True
+    while isPlayNextRound:
+        # mostly sensible guesses so games get long enough to reach MJ rounds and Rodman cards
+        isUserInputHigher = game.currentCard.rank.value < 8 if rng.random() < 0.8 else rng.random() < 0.5
+        isPlayNextRound = game.playRound(isUserInputHigher)
+        if legacyGame.playRound(isUserInputHigher) != isPlayNextRound or getState(game) != getState(legacyGame):
+            return False
+    return True
+
+def checkDifferential(numGames: int) -> int:
+    """
+    Plays the same decks and guesses through both engines, returning the number of games where they differ after any round
+    (numGames games over both editions, shoes and the tie rule, plus numGames // 10 with back to back MJ cards)
+    """
+    mismatches = 0
+    for index in range(numGames):
+        if not isSameGame(newGame(HigherLowerGame, index), newGame(LegacyHigherLowerGame, index), index):
+            mismatches += 1
+
+    for index in range(numGames // 10):
+        if not isSameGame(newBackToBackMjGame(HigherLowerGame, index), newBackToBackMjGame(LegacyHigherLowerGame, index), index):
+            mismatches += 1
+
+    return mismatches
+
+def timeRounds(gameClass: type, numGames: int) -> float:
+    """
+    Returns rounds per second, only counting the time spent in playRound
+    """
+    numRounds = 0
+    elapsed = 0.0
+    for index in range(numGames):
+        game = newGame(gameClass, index)
+        # the guesses are fixed up front so both engines get the same ones
+        rng = random.Random(index)
+        guesses = [rng.random() < 0.7 for _ in range(len(game.deck))]
+
+        start = time.perf_counter()
+        for isUserInputHigher in guesses:
+            numRounds += 1
+            if not game.playRound(isUserInputHigher):
+                break
+        elapsed += time.perf_counter() - start
+
+    return numRounds / elapsed
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    mismatches = checkDifferential(numGames)
+    print(f"differential: {mismatches} of {numGames} games differ")
+    for _ in range(2):
+        print(f"legacy: {timeRounds(LegacyHigherLowerGame, numGames):12,.0f} rounds/sec   table: {timeRounds(HigherLowerGame, numGames):12,.0f} rounds/sec")
+
+    sys.exit(0 if mismatches == 0 else 1)
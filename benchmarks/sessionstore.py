@@ -0,0 +1,84 @@
+from src.game import HigherLowerGame
+from src.session import SessionStore, packGame, unpackGame
+import random
+import sys
+import time
+import tracemalloc
+
+
+def getMidGame(seed: int, isBullsEdition: bool) -> HigherLowerGame:
+    """
+    Returns a game stopped after a random number of rounds (possibly already over)
+    """
+    rng = random.Random(seed)
+    game = HigherLowerGame()
+    game.configureSpecialEdition(isBullsEdition, rng, rng.choice((1, 1, 1, 2, 8)))
+    game.startGame()
+    for _ in range(rng.randrange(30)):
+        if not game.playRound(game.currentCard.rank.value < 8):
+            break
+    return game
+
+def getState(game: HigherLowerGame) -> tuple:
+    return (
+        bytes(game.deck.cardIds), game.deck.numDecks, game.deck.getValueIndex().total, game.currentCard, game.normalCardsDrawned,
+        game.isBullsEdition, game.isTieCorrect, game.currentRodmanCards, game.currentMjRound, game.currentMjSequence,
+        game.isMjActivated, game.isRodmanActivated, game.score, game.rodmanCardsUsed, game.mjRoundsEntered, game.mjRoundsWon,
+    )
+
+def playOut(game: HigherLowerGame, seed: int) -> int:
+    rng = random.Random(seed)
+    while game.getNumRemainingNormalCards() and game.playRound(rng.random() < 0.5):
+        pass
+    return game.score
+
+def checkRoundTrip(numGames: int) -> int:
+    """
+    Returns the number of games that did not survive pack/unpack unchanged, or that played on differently afterwards
+    """
+    mismatches = 0
+    for seed in range(numGames):
+        game = getMidGame(seed, seed % 2 == 0)
+        restored = unpackGame(packGame(game))
+        if getState(restored) != getState(game) or playOut(restored, seed) != playOut(game, seed):
+            mismatches += 1
+    return mismatches
+
+def timeRoundTrip(numGames: int) -> tuple[float, float]:
+    games = [getMidGame(seed, True) for seed in range(numGames)]
+
+    start = time.perf_counter()
+    records = [packGame(game) for game in games]
+    packTime = (time.perf_counter() - start) / numGames
+
+    start = time.perf_counter()
+    for record in records:
+        unpackGame(record)
+    unpackTime = (time.perf_counter() - start) / numGames
+
+    return packTime, unpackTime
+
+def measureBytesPerSession(numSessions: int, maxHotBytes: int) -> float:
+    """
+    Returns the memory held per session, games included, by a store with the given budget (spilled games are on disk, only their index entry counts)
+    """
+    tracemalloc.start()
+    store = SessionStore(maxHotBytes)
+    for seed in range(numSessions):
+        store.put(str(seed), getMidGame(seed, True))
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    store.close()
+    return allocated / numSessions
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    mismatches = checkRoundTrip(2_000)
+    packTime, unpackTime = timeRoundTrip(numGames)
+    print(f"round trip: {mismatches} mismatches, pack {packTime * 1e6:.2f} us, unpack {unpackTime * 1e6:.2f} us")
+    print(f"all hot:    {measureBytesPerSession(numGames, 1 << 40):8.0f} bytes per session in memory")
+    print(f"all cold:   {measureBytesPerSession(numGames, 0):8.0f} bytes per session in memory")
+
+    sys.exit(0 if mismatches == 0 else 1)
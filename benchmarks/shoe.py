@@ -0,0 +1,58 @@
+from src.game import Deck, HigherLowerGame
+import random
+import sys
+import time
+
+
+SHOE_SIZES = (1, 8, 64)
+
+def timeConstruction(numDecks: int, numShoes: int) -> float:
+    """
+    Returns the average time (in seconds) to build a shuffled Bulls shoe
+    """
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(numShoes):
+        Deck(True, rng, numDecks)
+    return (time.perf_counter() - start) / numShoes
+
+def timeDraws(numDecks: int) -> float:
+    """
+    Returns the average time (in seconds) of drawing a card, including the value index upkeep
+    """
+    deck = Deck(True, random.Random(0), numDecks)
+    numCards = len(deck)
+    start = time.perf_counter()
+    while deck.drawCard() is not None:
+        pass
+    return (time.perf_counter() - start) / numCards
+
+def timeRounds(numDecks: int, numGames: int) -> float:
+    """
+    Returns the number of playRound calls per second over full games, guessing with the midpoint strategy
+    """
+    rng = random.Random(0)
+    numRounds = 0
+    elapsed = 0.0
+    for _ in range(numGames):
+        game = HigherLowerGame()
+        game.configureSpecialEdition(True, rng, numDecks)
+        game.startGame()
+
+        start = time.perf_counter()
+        while game.playRound(game.currentCard.rank.value < 8):
+            numRounds += 1
+        elapsed += time.perf_counter() - start
+        numRounds += 1
+
+    return numRounds / elapsed
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    for numDecks in SHOE_SIZES:
+        print(
+            f"{numDecks:>3} decks: build {timeConstruction(numDecks, max(1, numGames // numDecks)) * 1e3:8.3f} ms"
+            f"  draw {timeDraws(numDecks) * 1e6:6.2f} us/card"
+            f"  play {timeRounds(numDecks, numGames):10,.0f} rounds/sec"
+        )
@@ -0,0 +1,64 @@
+from src.game import HigherLowerGame
+from src.simulator import encodeDeck, generateDecks, simulateGames
+import numpy as np
+import random
+import sys
+import time
+
+
+def playEngine(game: HigherLowerGame, guesses: np.ndarray) -> int:
+    """
+    Plays an already configured game through HigherLowerGame.playRound with a fixed guess sequence
+    """
+    game.startGame()
+    roundIdx = 0
+    while game.playRound(bool(guesses[roundIdx])):
+        roundIdx += 1
+
+    return game.score
+
+def checkConformance(numGames: int, isBullsEdition: bool, seed: int) -> int:
+    """
+    Plays the same decks and guesses through both engines, returning the number of games where the scores differ
+    """
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    games: list[HigherLowerGame] = []
+    for _ in range(numGames):
+        game = HigherLowerGame()
+        game.configureSpecialEdition(isBullsEdition)
+        games.append(game)
+
+    decks = np.stack([encodeDeck(game.deck) for game in games])
+    # mostly sensible guesses (so games get long enough to reach MJ rounds and Rodman cards) mixed with random ones
+    guesses = np.where(rng.random((numGames, decks.shape[1] - 1)) < 0.8, decks[:, :-1] < 26, rng.random((numGames, decks.shape[1] - 1)) < 0.5)
+
+    engineScores = np.array([playEngine(game, guesses[i]) for i, game in enumerate(games)])
+    simulatorScores = simulateGames(decks, guesses, isBullsEdition)
+
+    return int(np.count_nonzero(engineScores != simulatorScores))
+
+def benchmark(numGames: int, isBullsEdition: bool, seed: int) -> float:
+    """
+    Returns the number of full games simulated per second
+    """
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    decks = generateDecks(numGames, isBullsEdition, rng)
+    guesses = rng.random((numGames, decks.shape[1] - 1)) < 0.5
+    simulateGames(decks, guesses, isBullsEdition)
+
+    return numGames / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    isConformant = True
+
+    for isBullsEdition in (False, True):
+        edition = "bulls" if isBullsEdition else "normal"
+        mismatches = checkConformance(2_000, isBullsEdition, seed=0)
+        isConformant &= mismatches == 0
+        print(f"{edition:>6}: {mismatches} mismatches against HigherLowerGame, {benchmark(numGames, isBullsEdition, seed=0):,.0f} games/sec")
+
+    sys.exit(0 if isConformant else 1)
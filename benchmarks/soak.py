@@ -0,0 +1,140 @@
+from src.game import HigherLowerGame
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+
+# (isBullsEdition, isTrueSightOn), every app plays its games cycling through these
+CONFIGS = list(itertools.product((False, True), (False, True)))
+
+def getRssBytes() -> int:
+    """
+    Returns the resident set size of this process (Linux only, 0 elsewhere)
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+def getSlope(samples: list[dict], key: str) -> float:
+    """
+    Returns the least squares growth of samples[key] per game played
+    """
+    xs = [sample["games"] for sample in samples]
+    ys = [sample[key] for sample in samples]
+    meanX = sum(xs) / len(xs)
+    meanY = sum(ys) / len(ys)
+    variance = sum((x - meanX) ** 2 for x in xs)
+    return sum((x - meanX) * (y - meanY) for x, y in zip(xs, ys)) / variance if variance else 0.0
+
+def startVirtualDisplay() -> subprocess.Popen:
+    """
+    Starts Xvfb on a free display number and points DISPLAY at it
+    """
+    # Xvfb writes the display number it picked to the given file descriptor once it is ready for clients
+    readFd, writeFd = os.pipe()
+    xvfb = subprocess.Popen(["Xvfb", "-displayfd", str(writeFd), "-screen", "0", "1280x1024x24", "-nolisten", "tcp"], pass_fds=(writeFd,))
+    os.close(writeFd)
+    with os.fdopen(readFd) as pipe:
+        display = pipe.readline().strip()
+
+    if not display:
+        xvfb.kill()
+        raise RuntimeError(f"Xvfb exited with {xvfb.wait()} before it was ready")
+    os.environ["DISPLAY"] = f":{display}"
+    return xvfb
+
+def playGames(app, numGames: int, firstGame: int, rng: random.Random, samples: list[dict], sampleEvery: int) -> None:
+    """
+    Plays numGames full games through the app's own handlers, processing Tk events after every click like a player would
+    """
+    for index in range(firstGame, firstGame + numGames):
+        isBullsEdition, isTrueSightOn = CONFIGS[index % len(CONFIGS)]
+        app.menuFrame.isBullsEditionOn.set(isBullsEdition)
+        app.menuFrame.isIsdpOn.set(isTrueSightOn)
+        app.menuFrame.startGame()
+        gameFrame = app.currentFrame
+
+        while app.currentFrame is gameFrame:
+            if rng.random() < 0.5:
+                gameFrame.onHigherBtnClick()
+            else:
+                gameFrame.onLowerBtnClick()
+            app.update()
+
+        if (index + 1) % sampleEvery == 0:
+            samples.append({
+                "games": index + 1,
+                "rssBytes": getRssBytes(),
+                "tracedBytes": tracemalloc.get_traced_memory()[0],
+                "tkImages": len(app.tk.call("image", "names")),
+                "toplevels": sum(1 for child in app.winfo_children() if child.winfo_class() == "Toplevel"),
+            })
+
+def runSoak(numGames: int, numApps: int, seed: int, sampleEvery: int) -> list[dict]:
+    """
+    Plays numGames games spread over numApps apps built one after another, sampling memory every sampleEvery games
+    """
+    from src.gui import HigherLowerApp, Settings
+
+    # the soak games are recorded in a throwaway leaderboard rather than the player's
+    os.environ[Settings.LEADERBOARD_ENV.value] = os.path.join(tempfile.mkdtemp(), "leaderboard.db")
+    # the decks are shuffled with the global random module when the menu starts a game
+    random.seed(seed)
+    rng = random.Random(seed)
+    samples = []
+    gamesPerApp = numGames // numApps
+
+    tracemalloc.start()
+    for appIndex in range(numApps):
+        app = HigherLowerApp(HigherLowerGame())
+        app.update()
+        playGames(app, gamesPerApp, appIndex * gamesPerApp, rng, samples, sampleEvery)
+        app.destroy()
+    tracemalloc.stop()
+    return samples
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays thousands of games through the GUI and fails if memory or Tk images keep growing (starts Xvfb itself when DISPLAY is not set)")
+    parser.add_argument("--games", type=int, default=4000, help="games in total, cycling through both editions with and without True Sight")
+    parser.add_argument("--apps", type=int, default=4, help="number of times the app is built and destroyed over the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-every", type=int, default=50)
+    parser.add_argument("--warm-up", type=float, default=0.2, help="fraction of the samples left out of the growth fit, while the image cache fills")
+    parser.add_argument("--max-rss-per-game", type=float, default=2048, help="bytes")
+    parser.add_argument("--max-traced-per-game", type=float, default=512, help="bytes")
+    parser.add_argument("--max-images-per-game", type=float, default=0.01)
+    args = parser.parse_args()
+
+    xvfb = None
+    if not os.environ.get("DISPLAY"):
+        if shutil.which("Xvfb") is None:
+            sys.exit("DISPLAY is not set and Xvfb is not installed: run with a display, under xvfb-run, or install Xvfb (e.g. the xvfb package)")
+        xvfb = startVirtualDisplay()
+
+    try:
+        samples = runSoak(args.games, args.apps, args.seed, args.sample_every)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+    fitted = samples[int(len(samples) * args.warm_up):]
+
+    growth = {
+        "rssBytes": getSlope(fitted, "rssBytes"),
+        "tracedBytes": getSlope(fitted, "tracedBytes"),
+        "tkImages": getSlope(fitted, "tkImages"),
+    }
+    budgets = {"rssBytes": args.max_rss_per_game, "tracedBytes": args.max_traced_per_game, "tkImages": args.max_images_per_game}
+    overBudget = [key for key, budget in budgets.items() if growth[key] > budget]
+
+    print(json.dumps({"growthPerGame": growth, "budgetsPerGame": budgets, "overBudget": overBudget, "first": samples[0], "last": samples[-1]}, indent=2))
+    sys.exit(1 if overBudget else 0)
@@ -0,0 +1,47 @@
+import time
+# taken before the GUI is imported, like main.py does
+startTime = time.perf_counter()
+
+import argparse
+import json
+import sys
+
+
+def measureStartup(timeout: float) -> dict[str, float]:
+    """
+    Starts the app, presses Start Game as soon as the menu has been painted and closes the app once the first card is shown
+
+    :returns: milliseconds from startTime to import, firstPaint and firstCard (see HigherLowerApp.markStartup)
+    """
+    from src.game import HigherLowerGame
+    from src.gui import HigherLowerApp
+
+    app = HigherLowerApp(HigherLowerGame(), startTime)
+    deadline = time.perf_counter() + timeout
+
+    def poll():
+        if "firstCard" in app.startupTimes or time.perf_counter() > deadline:
+            app.destroy()
+            return
+        if "firstPaint" in app.startupTimes and app.currentFrame is app.menuFrame:
+            app.menuFrame.startGame()
+        app.after(5, poll)
+
+    app.after(5, poll)
+    app.mainloop()
+    return app.startupTimes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures GUI startup (needs a display, e.g. xvfb-run in CI) and fails if it is over budget")
+    parser.add_argument("--import-ms", type=float, default=1000, help="budget from process start to the app being constructed")
+    parser.add_argument("--first-paint-ms", type=float, default=2000, help="budget to the menu being painted")
+    parser.add_argument("--first-card-ms", type=float, default=3000, help="budget to the first card being shown after pressing Start Game straight away")
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    times = measureStartup(args.timeout)
+    budgets = {"import": args.import_ms, "firstPaint": args.first_paint_ms, "firstCard": args.first_card_ms}
+    overBudget = [milestone for milestone, budget in budgets.items() if times.get(milestone, float("inf")) > budget]
+
+    print(json.dumps({"times": times, "budgets": budgets, "overBudget": overBudget}))
+    sys.exit(1 if overBudget else 0)
@@ -0,0 +1,173 @@
+from benchmarks.atlas import CARD_SIZE, loadFromAtlas, loadFromPngs
+from benchmarks.ruleengine import LegacyHigherLowerGame, timeRounds
+from src.atlas import IMAGES_DIR
+from src.game import CARDS, Deck, HigherLowerGame
+from typing import Callable
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+
+# Every benchmark takes (seed, scale) and returns operations per second, higher is always better. They only use seeded
+# random number generators, so every run does exactly the same work.
+
+def benchDeckConstruction(isBullsEdition: bool) -> Callable[[int, float], float]:
+    def bench(seed: int, scale: float) -> float:
+        rng = random.Random(seed)
+        numDecks = int(20_000 * scale)
+        start = time.perf_counter()
+        for _ in range(numDecks):
+            Deck(isBullsEdition, rng)
+        return numDecks / (time.perf_counter() - start)
+    return bench
+
+def getDecks(seed: int, numDecks: int) -> list[Deck]:
+    rng = random.Random(seed)
+    return [Deck(True, rng) for _ in range(numDecks)]
+
+def benchDrawCard(seed: int, scale: float) -> float:
+    decks = getDecks(seed, int(2_000 * scale))
+    numCards = sum(len(deck) for deck in decks)
+
+    start = time.perf_counter()
+    for deck in decks:
+        for _ in range(len(deck)):
+            deck.drawCard()
+    return numCards / (time.perf_counter() - start)
+
+def benchSeeTopCard(seed: int, scale: float) -> float:
+    decks = getDecks(seed, int(2_000 * scale))
+
+    start = time.perf_counter()
+    for deck in decks:
+        for _ in range(50):
+            deck.seeTopCard()
+    return len(decks) * 50 / (time.perf_counter() - start)
+
+def benchPlayRound(isBullsEdition: bool) -> Callable[[int, float], float]:
+    def bench(seed: int, scale: float) -> float:
+        """
+        Full games with random guesses, only the time inside playRound counts
+        """
+        rng = random.Random(seed)
+        numRounds = 0
+        elapsed = 0.0
+        for _ in range(int(20_000 * scale)):
+            game = HigherLowerGame()
+            game.configureSpecialEdition(isBullsEdition, rng)
+            game.startGame()
+            # the guesses are fixed up front, so they do not depend on the engine being measured
+            guesses = [rng.random() < 0.5 for _ in range(len(game.deck))]
+
+            start = time.perf_counter()
+            for isUserInputHigher in guesses:
+                numRounds += 1
+                if not game.playRound(isUserInputHigher):
+                    break
+            elapsed += time.perf_counter() - start
+        return numRounds / elapsed
+    return bench
+
+def benchRuleEngine(gameClass: type) -> Callable[[int, float], float]:
+    def bench(seed: int, scale: float) -> float:
+        """
+        The differential games of benchmarks/ruleengine.py (both editions, shoes and the tie rule), through one engine
+        """
+        return timeRounds(gameClass, int(10_000 * scale))
+    return bench
+
+def benchGetName(seed: int, scale: float) -> float:
+    rng = random.Random(seed)
+    cards = [rng.choice(CARDS) for _ in range(int(200_000 * scale))]
+
+    start = time.perf_counter()
+    for card in cards:
+        card.getName()
+    return len(cards) / (time.perf_counter() - start)
+
+def getCardNames() -> list[str]:
+    return sorted(fileName[:-len(".png")] for fileName in os.listdir(IMAGES_DIR) if fileName.endswith(".png"))
+
+def benchLoadImages(loadFn) -> Callable[[int, float], float]:
+    def bench(seed: int, scale: float) -> float:
+        """
+        Card images decoded and resized to CARD_SIZE per second, through loadFn (see benchmarks/atlas.py)
+        """
+        names = getCardNames()
+        numLoads = max(1, int(3 * scale))
+        start = time.perf_counter()
+        for _ in range(numLoads):
+            loadFn(names, CARD_SIZE)
+        return numLoads * len(names) / (time.perf_counter() - start)
+    return bench
+
+BENCHMARKS: dict[str, Callable[[int, float], float]] = {
+    "deck.construct.normal": benchDeckConstruction(False),
+    "deck.construct.bulls": benchDeckConstruction(True),
+    "deck.drawCard": benchDrawCard,
+    "deck.seeTopCard": benchSeeTopCard,
+    "game.playRound.normal": benchPlayRound(False),
+    "game.playRound.bulls": benchPlayRound(True),
+    # the nested playRound from before RuleTable, kept as the number the table driven engine has to match
+    "game.playRound.legacy": benchRuleEngine(LegacyHigherLowerGame),
+    "game.playRound.table": benchRuleEngine(HigherLowerGame),
+    "card.getName": benchGetName,
+    # the open and resize GameFrame.getImage used before the atlas, and the atlas path CardImageCache uses now
+    "image.pngOpenResize": benchLoadImages(loadFromPngs),
+    "image.atlas": benchLoadImages(loadFromAtlas),
+}
+
+def runSuite(names: list[str], seed: int, scale: float, repeats: int) -> dict:
+    """
+    Runs each benchmark repeats times and keeps the best result
+    """
+    results = {}
+    for name in names:
+        results[name] = max(BENCHMARKS[name](seed, scale) for _ in range(repeats))
+
+    return {
+        "meta": {"python": platform.python_version(), "platform": f"{platform.system()} {platform.machine()}", "seed": seed, "scale": scale, "repeats": repeats},
+        "results": results,
+    }
+
+def compare(report: dict, baseline: dict, threshold: float) -> dict[str, dict]:
+    """
+    Returns every benchmark in both reports with its change against the baseline, flagging those slower by more than threshold
+    """
+    comparison = {}
+    for name, value in report["results"].items():
+        if name in baseline["results"]:
+            change = value / baseline["results"][name] - 1
+            comparison[name] = {"baseline": baseline["results"][name], "current": value, "change": change, "isRegression": change < -threshold}
+    return comparison
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the engine and asset benchmarks (headless, seeded) and writes the results as JSON")
+    parser.add_argument("--only", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS), metavar="NAME")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the amount of work in every benchmark")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="write the report to this file (e.g. to store it as the baseline)")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="a report written by an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="slowdown against the baseline that counts as a regression (run to run noise is around 10%%)")
+    args = parser.parse_args()
+
+    report = runSuite(args.only, args.seed, args.scale, args.repeats)
+
+    if args.compare:
+        with open(args.compare) as file:
+            report["comparison"] = compare(report, json.load(file), args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    print(json.dumps(report, indent=2))
+
+    regressions = [name for name, result in report.get("comparison", {}).items() if result["isRegression"]]
+    if regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
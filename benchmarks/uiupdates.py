@@ -0,0 +1,94 @@
+from collections import Counter
+from src.game import HigherLowerGame
+from src.gui import GameFrame
+from src.tournament import getGameRng
+from types import SimpleNamespace
+import sys
+
+
+# The games are played through GameFrame's own playRound, onGameChange and label updaters, but HeadlessGameFrame never
+# calls CTkFrame.__init__ and its widgets are StubWidgets, so what is measured is how many reconfigurations GameFrame asks
+# for, not customtkinter's configure and redraw behind them. That real widget path is timed by the gui.* spans of
+# src/instrumentation.py (press F12 in the game, or run it under Xvfb with HIGHER_LOWER_INSTRUMENTATION set).
+
+# what GameFrame.updateUi reconfigured after every round before it listened to change events
+# (four info labels, the current card and the deck)
+WIDGETS_PER_ROUND_BEFORE = 6
+
+class StubWidget:
+    def __init__(self, name: str, updates: Counter):
+        """
+        Stands in for a Tk widget, counting how often GameFrame reconfigures it
+        """
+        self.name: str = name
+        self.updates: Counter = updates
+        self.manager: str = ""
+
+    def configure(self, **kwargs):
+        self.updates[self.name] += 1
+
+    def pack(self, **kwargs):
+        self.manager = "pack"
+
+    def pack_forget(self):
+        self.manager = ""
+
+    def winfo_manager(self) -> str:
+        return self.manager
+
+class HeadlessGameFrame(GameFrame):
+    def __init__(self, game: HigherLowerGame, isTrueSightOn: bool, updates: Counter):
+        """
+        GameFrame's own round and change event handling, without Tk: CTkFrame.__init__ is skipped, its widgets are StubWidgets
+        and its master only has the menu settings it reads
+        """
+        self.game: HigherLowerGame = game
+        menuFrame = SimpleNamespace(isIsdpOn=SimpleNamespace(get=lambda: isTrueSightOn), isInlineNotificationOn=SimpleNamespace(get=lambda: True), isHintOn=SimpleNamespace(get=lambda: False))
+        self.master = SimpleNamespace(menuFrame=menuFrame, getFrame=lambda frameClass: None, showFrame=self.showEndFrame)
+        self.isGameOver: bool = False
+        for name in ("scoreLabel", "currentCardLabel", "deckLabel", "rodmanCountLabel", "mjRoundLabel", "numCardsRemainingLabel", "notificationLabel", "hintLabel"):
+            setattr(self, name, StubWidget(name, updates))
+        self.listenToGame()
+
+    def showEndFrame(self, frame) -> None:
+        # playRound hands over to the end frame once the game is over
+        self.isGameOver = True
+
+    def after_idle(self, func, *args):
+        # only used to prefetch card images, which need the app's image cache
+        pass
+
+    def getImage(self, card) -> None:
+        return None
+
+    def getBackOfCard(self) -> None:
+        return None
+
+def countWidgetUpdates(numGames: int, isTrueSightOn: bool) -> tuple[dict, Counter]:
+    """
+    Plays Bulls edition games through GameFrame.playRound, returns its getUiStats and the updates per widget
+    """
+    updates: Counter = Counter()
+    game = HigherLowerGame()
+    frame = HeadlessGameFrame(game, isTrueSightOn, updates)
+
+    for index in range(numGames):
+        # the app keeps one game and frame, and restarts the game for every new one
+        game.configureSpecialEdition(True, getGameRng(0, 0, index))
+        game.startGame()
+
+        frame.isGameOver = False
+        while not frame.isGameOver:
+            frame.playRound(game.currentCard.rank.value < 8)
+
+    return frame.getUiStats(), updates
+
+if __name__ == "__main__":
+    numGames = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    for isTrueSightOn in (False, True):
+        uiStats, updates = countWidgetUpdates(numGames, isTrueSightOn)
+        print(
+            f"True Sight {'on ' if isTrueSightOn else 'off'}: {uiStats['widgetUpdatesPerRound']:.2f} widget updates per round "
+            f"(was {WIDGETS_PER_ROUND_BEFORE}), per widget: {dict(updates)}"
+        )
@@ -1,8 +1,11 @@
+import time
+# taken before the GUI is imported, so the startup report includes the import time
+startTime = time.perf_counter()
 
 from src.game import HigherLowerGame
 from src.gui import HigherLowerApp
 
 if __name__ == "__main__":
     game = HigherLowerGame()
-    app = HigherLowerApp(game)
-    app.mainloop()
\ No newline at end of file
+    app = HigherLowerApp(game, startTime)
+    app.mainloop()
@@ -0,0 +1,122 @@
+from collections import Counter
+from typing import Iterable, Iterator
+from .game import HigherLowerGame
+import argparse
+import json
+
+
+class GameStats:
+    def __init__(self):
+        """
+        Aggregates finished games one at a time in constant memory, two aggregates merge into exactly the aggregate of all their games
+
+        :params scores: histogram of final scores (score -> number of games), scores are small integers so it stays small and quantiles are exact
+        """
+        self.numGames: int = 0
+        self.scores: Counter = Counter()
+        self.numNormalCardsDrawned: int = 0
+        self.numReachedLastCard: int = 0
+
+        self.rodmanCardsDrawn: int = 0
+        self.rodmanCardsUsed: int = 0
+
+        self.numGamesEnteringMj: int = 0
+        self.mjRoundsEntered: int = 0
+        self.mjRoundsWon: int = 0
+
+    def add(self, game: HigherLowerGame) -> None:
+        """
+        Adds a finished game, can be attached directly as one of the game's gameOverListeners
+        """
+        self.numGames += 1
+        self.scores[game.score] += 1
+        self.numNormalCardsDrawned += game.normalCardsDrawned
+        if game.normalCardsDrawned == game.deck.startingNumPlayingCards:
+            self.numReachedLastCard += 1
+
+        # Rodman cards still held at the end were drawn but never needed
+        self.rodmanCardsDrawn += game.rodmanCardsUsed + game.currentRodmanCards
+        self.rodmanCardsUsed += game.rodmanCardsUsed
+
+        if game.mjRoundsEntered:
+            self.numGamesEnteringMj += 1
+        self.mjRoundsEntered += game.mjRoundsEntered
+        self.mjRoundsWon += game.mjRoundsWon
+
+    def merge(self, other: "GameStats") -> "GameStats":
+        """
+        Adds another aggregate (e.g. from a worker process) into this one, returns self
+        """
+        self.numGames += other.numGames
+        self.scores.update(other.scores)
+        self.numNormalCardsDrawned += other.numNormalCardsDrawned
+        self.numReachedLastCard += other.numReachedLastCard
+        self.rodmanCardsDrawn += other.rodmanCardsDrawn
+        self.rodmanCardsUsed += other.rodmanCardsUsed
+        self.numGamesEnteringMj += other.numGamesEnteringMj
+        self.mjRoundsEntered += other.mjRoundsEntered
+        self.mjRoundsWon += other.mjRoundsWon
+        return self
+
+    def getMeanScore(self) -> float:
+        return sum(score * count for score, count in self.scores.items()) / max(1, self.numGames)
+
+    def getQuantile(self, q: float) -> int:
+        """
+        Returns the smallest score that at least a q fraction of games scored at most
+        """
+        if self.numGames == 0:
+            return None
+
+        target = max(1, q * self.numGames)
+        seen = 0
+        for score in sorted(self.scores):
+            seen += self.scores[score]
+            if seen >= target:
+                return score
+        return max(self.scores)
+
+    def getSummary(self) -> dict:
+        numGames = max(1, self.numGames)
+        return {
+            "games": self.numGames,
+            "meanScore": self.getMeanScore(),
+            "scoreQuantiles": {str(q): self.getQuantile(q) for q in (0.5, 0.9, 0.99)},
+            "maxScore": max(self.scores, default=None),
+            "meanNormalCardsDrawn": self.numNormalCardsDrawned / numGames,
+            "reachedLastCardRate": self.numReachedLastCard / numGames,
+            "rodmanCardsDrawnPerGame": self.rodmanCardsDrawn / numGames,
+            "rodmanUseRate": self.rodmanCardsUsed / max(1, self.rodmanCardsDrawn),
+            "mjEntryRate": self.numGamesEnteringMj / numGames,
+            "mjCompletionRate": self.mjRoundsWon / max(1, self.mjRoundsEntered),
+        }
+
+def aggregate(games: Iterable[HigherLowerGame], stats: GameStats = None) -> GameStats:
+    """
+    Consumes a stream of finished games (any iterable, e.g. a generator playing or replaying them) into an aggregate
+    """
+    stats = stats or GameStats()
+    for game in games:
+        stats.add(game)
+    return stats
+
+def loggedGames(path: str) -> Iterator[HigherLowerGame]:
+    """
+    Replays every game of a game log, one at a time
+    """
+    # imported here so the GUI does not pull in the simulator's numpy just to aggregate its own games
+    from .gamelog import GameLogReader, replay
+
+    for loggedGame in GameLogReader(path):
+        yield replay(loggedGame)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarises the games in game logs (the logs are aggregated separately then merged)")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    stats = GameStats()
+    for path in args.paths:
+        stats.merge(aggregate(loggedGames(path)))
+
+    print(json.dumps(stats.getSummary(), indent=2))
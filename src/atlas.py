@@ -0,0 +1,162 @@
+from PIL import Image, PngImagePlugin
+import hashlib
+import json
+import os
+import sys
+import threading
+
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+ATLAS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "atlases")
+ATLAS_COLUMNS = 10
+# the card sizes that ship pre-built, other sizes (e.g. 300x436 for 2x displays) can be built on demand
+DEFAULT_SIZES = ((150,218),)
+
+def getAtlasPath(size: tuple[int, int]) -> str:
+    return os.path.join(ATLAS_DIR, f"cards_{size[0]}x{size[1]}.png")
+
+def getSourceNames() -> list[str]:
+    """
+    Returns the names of the card pngs the atlases are built from, none when only the atlases were installed (as in the wheel)
+    """
+    if not os.path.isdir(IMAGES_DIR):
+        return []
+    return sorted(fileName[:-len(".png")] for fileName in os.listdir(IMAGES_DIR) if fileName.endswith(".png"))
+
+def getSourceHash(names: list[str]) -> str:
+    """
+    Returns a hash of the card pngs' names and contents, stored in each atlas so one built from older pngs is noticed
+    """
+    sourceHash = hashlib.sha256()
+    for name in names:
+        sourceHash.update(name.encode() + b"\0")
+        with open(os.path.join(IMAGES_DIR, f"{name}.png"), "rb") as file:
+            sourceHash.update(file.read())
+    return sourceHash.hexdigest()
+
+def buildAtlas(size: tuple[int, int]) -> str:
+    """
+    Packs every card asset, pre-scaled to the given size, into a single png (the index of card positions is stored inside the png itself)
+
+    :param size: the size each card is resized to
+    """
+    names: list[str] = getSourceNames()
+    numRows = -(-len(names) // ATLAS_COLUMNS)
+    atlas = Image.new("RGBA", (size[0] * ATLAS_COLUMNS, size[1] * numRows))
+
+    index: dict[str, tuple[int, int]] = {}
+    for i, name in enumerate(names):
+        position = ((i % ATLAS_COLUMNS) * size[0], (i // ATLAS_COLUMNS) * size[1])
+        # resized the same way GameFrame used to resize each png, so the cards look identical
+        with Image.open(os.path.join(IMAGES_DIR, f"{name}.png")) as originalImg:
+            atlas.paste(originalImg.resize(size).convert("RGBA"), position)
+        index[name] = position
+
+    pngInfo = PngImagePlugin.PngInfo()
+    pngInfo.add_text("index", json.dumps({"size": size, "sourceHash": getSourceHash(names), "cards": index}))
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    atlasPath = getAtlasPath(size)
+    atlas.save(atlasPath, pnginfo=pngInfo, optimize=True)
+    return atlasPath
+
+class CardAtlas:
+    def __init__(self, atlasPath: str):
+        """
+        Loads a pre-built atlas once, after which card images are sliced out of it without any further disk I/O
+        """
+        with Image.open(atlasPath) as atlasImg:
+            index = json.loads(atlasImg.text["index"])
+            self.image: Image.Image = atlasImg.convert("RGBA")
+
+        self.size: tuple[int, int] = tuple(index["size"])
+        # None for atlases built before the hash was stored, which --check always reports as stale
+        self.sourceHash: str = index.get("sourceHash")
+        self.positions: dict[str, tuple[int, int]] = {name: tuple(position) for name, position in index["cards"].items()}
+
+    def getImage(self, name: str) -> Image.Image:
+        """
+        Returns the region of the atlas holding the given card
+        """
+        x, y = self.positions[name]
+        return self.image.crop((x, y, x + self.size[0], y + self.size[1]))
+
+# atlases are shared between every image cache, and may be requested from the prefetch worker thread
+loadedAtlases: dict[tuple[int, int], CardAtlas] = {}
+atlasLock = threading.Lock()
+
+def isStale(atlas: CardAtlas, names: list[str]) -> bool:
+    """
+    Whether the atlas was built from other card pngs than the ones in IMAGES_DIR (reads every png, so only the build step checks this)
+    """
+    return atlas.sourceHash != getSourceHash(names)
+
+def loadAtlas(size: tuple[int, int]) -> CardAtlas:
+    """
+    Loads the atlas for the given card size, or returns None if it has not been built. Nothing but the atlas itself is read,
+    whether it is up to date with the pngs is checked by python -m src.atlas --check instead.
+    """
+    atlasPath = getAtlasPath(size)
+    if not os.path.exists(atlasPath):
+        return None
+
+    atlas = CardAtlas(atlasPath)
+    if atlas.size != size:
+        raise ValueError(f"{atlasPath} holds {atlas.size[0]}x{atlas.size[1]} cards, rebuild it with python -m src.atlas {size[0]}x{size[1]}")
+    return atlas
+
+def getAtlas(size: tuple[int, int]) -> CardAtlas:
+    """
+    Returns the atlas for the given card size, or None if it has not been built
+    """
+    with atlasLock:
+        if size not in loadedAtlases:
+            loadedAtlases[size] = loadAtlas(size)
+
+        return loadedAtlases[size]
+
+def getShippedAtlas() -> CardAtlas:
+    """
+    Returns the atlas that ships pre-built, which is all there is to draw the cards from when the pngs are not installed
+    """
+    atlas = getAtlas(DEFAULT_SIZES[0])
+    if atlas is None:
+        raise FileNotFoundError(f"no card images: neither the pngs in {IMAGES_DIR} nor the atlas {getAtlasPath(DEFAULT_SIZES[0])} exist")
+    return atlas
+
+def getCardNames() -> list[str]:
+    """
+    Returns the name of every card image, from the pngs or, when only the atlases are installed, from the shipped atlas
+    """
+    return getSourceNames() or sorted(getShippedAtlas().positions)
+
+def getCardImage(name: str, size: tuple[int, int]) -> Image.Image:
+    """
+    Returns a card at the given size, sliced from its atlas if one was built, otherwise resized from its png (or from the
+    shipped atlas when the pngs are not installed)
+    """
+    atlas = getAtlas(size)
+    if atlas is not None:
+        return atlas.getImage(name)
+
+    if os.path.exists(os.path.join(IMAGES_DIR, f"{name}.png")):
+        # resized the same way GameFrame used to resize each png, so the cards look identical
+        with Image.open(os.path.join(IMAGES_DIR, f"{name}.png")) as originalImg:
+            return originalImg.resize(size)
+    return getShippedAtlas().getImage(name).resize(size)
+
+if __name__ == "__main__":
+    # usage: python -m src.atlas [--check] [WIDTHxHEIGHT ...]
+    isCheck = "--check" in sys.argv
+    sizes = [tuple(int(n) for n in arg.split("x")) for arg in sys.argv[1:] if arg != "--check"] or DEFAULT_SIZES
+    if not isCheck:
+        for size in sizes:
+            print(f"Built {buildAtlas(size)}")
+        sys.exit(0)
+
+    # fails if any atlas is missing, or was built from other pngs than the ones in IMAGES_DIR
+    names = getSourceNames()
+    staleSizes = [size for size in sizes if loadAtlas(size) is None or isStale(loadAtlas(size), names)]
+    for size in staleSizes:
+        print(f"{getAtlasPath(size)} is missing or stale, rebuild it with python -m src.atlas {size[0]}x{size[1]}")
+    sys.exit(1 if staleSizes else 0)
@@ -0,0 +1,156 @@
+from .game import Card, Constant, HigherLowerGame, Rank
+from .leaderboard import LeaderboardWriter
+from typing import Iterable, TextIO, Union
+import argparse
+import json
+import random
+import sys
+
+
+# A terminal frontend over HigherLowerGame, it never imports customtkinter or PIL so it starts as fast as the engine.
+#
+# Scripted mode reads one game per line, as JSON, and writes one result per line:
+#   {"seed": 123, "bulls": true, "decks": 1, "tie": false, "guesses": "HLHHL"}
+#   -> {"ok": true, "seed": 123, "score": 4, "rounds": 5, "isOver": true, "rodmanCardsUsed": 0, "mjRoundsEntered": 0, "mjRoundsWon": 0}
+# The guesses are H (higher) or L (lower), or a list of booleans (true for higher). A game whose guesses run out before it is
+# over is reported with "isOver": false. Bad lines are answered with {"ok": false, "error": "..."}, like src/server.py does.
+
+# largest shoe a script (or the player) can ask for, the same limit as GameServer's default
+MAX_DECKS = 8
+
+class ScriptError(Exception):
+    pass
+
+def parseGuesses(guesses: Union[str, list]) -> Iterable[bool]:
+    """
+    Returns the guesses as booleans (True for higher), converted lazily since most games end long before their guesses do
+    """
+    if isinstance(guesses, str):
+        guesses = guesses.upper()
+        invalid = guesses.replace("H", "").replace("L", "")
+        if invalid:
+            raise ScriptError(f"unknown guess {invalid[0]!r}, expected H or L")
+        return map("H".__eq__, guesses)
+    return map(bool, guesses)
+
+def playScriptedGame(request: dict, leaderboardWriter: LeaderboardWriter = None) -> dict:
+    """
+    Plays one scripted game on the real engine, the seed makes the deck (and so the result) reproducible
+
+    :param leaderboardWriter: if given, the score of a game that was played to the end is recorded with it
+    """
+    seed = request.get("seed")
+    guesses = parseGuesses(request.get("guesses", ""))
+    numDecks = int(request.get("decks", 1))
+    if not 1 <= numDecks <= MAX_DECKS:
+        raise ScriptError(f"decks must be between 1 and {MAX_DECKS}")
+
+    game = HigherLowerGame()
+    game.configureSpecialEdition(bool(request.get("bulls", False)), random.Random(seed), numDecks, bool(request.get("tie", False)))
+    game.startGame()
+
+    numRounds = 0
+    isPlayNextRound = True
+    for isUserInputHigher in guesses:
+        numRounds += 1
+        isPlayNextRound = game.playRound(isUserInputHigher)
+        if not isPlayNextRound:
+            break
+
+    if leaderboardWriter is not None and not isPlayNextRound:
+        leaderboardWriter.recordGame(game)
+
+    return {
+        "ok": True,
+        "seed": seed,
+        "score": game.score,
+        "rounds": numRounds,
+        "isOver": not isPlayNextRound,
+        "rodmanCardsUsed": game.rodmanCardsUsed,
+        "mjRoundsEntered": game.mjRoundsEntered,
+        "mjRoundsWon": game.mjRoundsWon,
+    }
+
+def runScript(lines: Iterable[str], output: TextIO, leaderboardWriter: LeaderboardWriter = None) -> int:
+    """
+    Plays every game in lines and writes its result to output as JSON lines, returns the number of games played
+    """
+    numGames = 0
+    for line in lines:
+        if not line.strip():
+            continue
+
+        try:
+            response = playScriptedGame(json.loads(line), leaderboardWriter)
+            numGames += 1
+        except (ScriptError, ValueError, TypeError, AttributeError) as error:
+            response = {"ok": False, "error": str(error)}
+
+        output.write(json.dumps(response, separators=(",", ":")) + "\n")
+    return numGames
+
+def describeSpecialCard(card: Card) -> str:
+    if card.rank == Rank.MJ:
+        return f"{card.getName()}: guess the next {len(Constant.MJ_WINNING_SEQUENCE.value)} cards in the sequence (W, W, W, L, L, W, W, W) to win {Constant.MJ_BONUS_POINTS.value} bonus points!"
+    return f"{card.getName()}: a 2nd chance on the next card you get wrong!"
+
+def printState(game: HigherLowerGame, isTrueSightOn: bool) -> None:
+    print(f"\nScore: {game.score}    Normal Cards Remaining: {game.getNumRemainingNormalCards()}")
+    if game.isBullsEdition:
+        mjRound = f"{game.currentMjRound + 1}/{len(Constant.MJ_WINNING_SEQUENCE.value)}" if game.isMjActivated else "N/A"
+        print(f"Available Rodman Cards: {game.currentRodmanCards}    Current MJ Round: {mjRound}")
+    if isTrueSightOn:
+        print(f"Next Card: {game.deck.seeTopCard().getName()}")
+    print(f"Current Card: {game.currentCard.getName()}")
+
+def playInteractive(isBullsEdition: bool, numDecks: int, isTrueSightOn: bool, seed: int = None) -> int:
+    """
+    Plays one game in the terminal, returns the final score
+    """
+    game = HigherLowerGame()
+    game.configureSpecialEdition(isBullsEdition, random.Random(seed) if seed is not None else None, numDecks)
+    game.startGame()
+
+    isPlayNextRound = True
+    while isPlayNextRound:
+        printState(game, isTrueSightOn)
+        answer = input("[h]igher, [l]ower or [q]uit: ").strip().lower()
+        if answer == "q":
+            break
+        if answer not in ("h", "l"):
+            continue
+
+        nextCard: Card = game.deck.seeTopCard()
+        if game.isNextCardMj(nextCard) or game.isNextCardRodman(nextCard):
+            print(describeSpecialCard(nextCard))
+        isPlayNextRound = game.playRound(answer == "h")
+
+    print(f"\nGame Over! Your Final Score: {game.score}")
+    return game.score
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays the game in the terminal, or plays scripted games from JSON lines (see src/cli.py for the format)")
+    parser.add_argument("--script", default=None, metavar="FILE", help="play the games in FILE (- for stdin) and write their results to stdout as JSON lines")
+    parser.add_argument("--bulls", action="store_true", help="play the Bulls edition")
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--true-sight", action="store_true", help="show the next card")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--leaderboard", default=None, metavar="DB", help="record the scores of scripted games in this leaderboard (see src/leaderboard.py)")
+    args = parser.parse_args()
+    if not 1 <= args.decks <= MAX_DECKS:
+        parser.error(f"--decks must be between 1 and {MAX_DECKS}")
+
+    leaderboardWriter = LeaderboardWriter(args.leaderboard) if args.leaderboard and args.script is not None else None
+    if args.script is None:
+        try:
+            playInteractive(args.bulls, args.decks, args.true_sight, args.seed)
+        except (KeyboardInterrupt, EOFError):
+            print()
+    elif args.script == "-":
+        runScript(sys.stdin, sys.stdout, leaderboardWriter)
+    else:
+        with open(args.script) as file:
+            runScript(file, sys.stdout, leaderboardWriter)
+
+    if leaderboardWriter is not None:
+        leaderboardWriter.close()
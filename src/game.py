@@ -1,4 +1,8 @@
+from collections import Counter
 from enum import Enum
+from typing import Callable, Optional
+import bisect
+import itertools
 import random
 
 class Suit(Enum):
@@ -68,6 +72,9 @@ class Constant(Enum):
     RODMAN_BONUS_POINTS = 2
 
 class Card:
+    # cards are shared between every deck (see CARDS), so they carry no per-instance dict
+    __slots__ = ("rank", "suit", "value", "count", "id", "name")
+
     def __init__(self, rank: Rank, suit: Suit, count: int = None):
         """
         Initialises a playing card (can be normal or special card)
@@ -79,85 +86,415 @@ class Card:
         self.suit: Suit = suit
         self.value: int = rank.value + suit.value
         self.count: int = count
+        # position in CARDS, set once the lookup tables are built
+        self.id: int = None
+        self.name: str = f"{self.rank}_of_{self.suit}" if self.suit != Suit.BULLS else f"{self.rank}_of_{self.suit}_{self.count}"
     
     def getName(self) -> str:
         """
         Returns the card's name
         """
-        return f"{self.rank}_of_{self.suit}" if self.suit != Suit.BULLS else f"{self.rank}_of_{self.suit}_{self.count}"
+        return self.name
+
+# Every distinct card exists exactly once, decks only store card ids (indexes into CARDS).
+# Normal cards come first in ascending value order, so comparing the ids of two normal cards is the same as comparing their values.
+NORMAL_CARDS: list[Card] = sorted(
+    (Card(rank, suit) for rank in Rank if rank not in (Rank.MJ, Rank.RODMAN) for suit in Suit if suit != Suit.BULLS),
+    key=lambda card: card.value
+)
+MJ_CARDS: list[Card] = [Card(Rank.MJ, Suit.BULLS, i + 1) for i in range(Constant.NUM_MJ_CARDS.value)]
+RODMAN_CARDS: list[Card] = [Card(Rank.RODMAN, Suit.BULLS, i + 1) for i in range(Constant.NUM_RODMAN_CARDS.value)]
+CARDS: list[Card] = NORMAL_CARDS + MJ_CARDS + RODMAN_CARDS
+for cardId, card in enumerate(CARDS):
+    card.id = cardId
+
+CARD_VALUES: list[float] = [card.value for card in CARDS]
+CARD_NAMES: list[str] = [card.name for card in CARDS]
+NUM_NORMAL_CARDS = len(NORMAL_CARDS)
+NORMAL_CARD_VALUES: list[float] = CARD_VALUES[:NUM_NORMAL_CARDS]
+
+class CardValueIndex:
+    def __init__(self, values: list[float], distinctValues: list[float] = None):
+        """
+        Initialises a Fenwick tree counting the card values still in the deck, so higher/lower counts take O(log n) instead of a scan
+
+        :param values: the values of every card to index (duplicates are allowed, e.g. when playing with several decks)
+        :param distinctValues: optional sorted list of every value that can appear, shared between indexes instead of building one each
+        """
+        # every distinct value gets a slot, in ascending order
+        self.values: list[float] = distinctValues if distinctValues is not None else sorted(set(values))
+
+        slotCounts = [0] * len(self.values)
+        for value, count in Counter(values).items():
+            slotCounts[bisect.bisect_left(self.values, value)] = count
+        self.setSlotCounts(slotCounts)
+
+    @classmethod
+    def fromSlotCounts(cls, slotCounts: list[int], distinctValues: list[float]) -> "CardValueIndex":
+        """
+        Returns an index holding slotCounts[i] cards of value distinctValues[i], skipping the per value lookups
+        """
+        index = cls.__new__(cls)
+        index.values = distinctValues
+        index.setSlotCounts(slotCounts)
+        return index
+
+    def setSlotCounts(self, slotCounts: list[int]) -> None:
+        # build the tree in linear time, slot i covers the slots after i & (i - 1) up to itself
+        prefixSums = [0, *itertools.accumulate(slotCounts)]
+        self.tree: list[int] = [0] + [prefixSums[i] - prefixSums[i & (i - 1)] for i in range(1, len(prefixSums))]
+        self.total: int = prefixSums[-1]
+
+    def add(self, value: float, delta: int) -> None:
+        """
+        Adds delta to the count of cards with the given value (use -1 to remove a card)
+        """
+        self.total += delta
+        i = bisect.bisect_left(self.values, value) + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefixCount(self, numSlots: int) -> int:
+        """
+        Returns the number of cards in the lowest numSlots distinct values
+        """
+        count = 0
+        while numSlots > 0:
+            count += self.tree[numSlots]
+            numSlots -= numSlots & -numSlots
+        return count
+
+    def countLower(self, value: float) -> int:
+        return self.prefixCount(bisect.bisect_left(self.values, value))
+
+    def countHigher(self, value: float) -> int:
+        return self.total - self.prefixCount(bisect.bisect_right(self.values, value))
+
+def getDeckSize(isBullsEdition: bool, numDecks: int = 1) -> int:
+    return numDecks * (NUM_NORMAL_CARDS + (len(MJ_CARDS) + len(RODMAN_CARDS) if isBullsEdition else 0))
+
+def getMjLocations(numDecks: int) -> list[tuple[Card, int]]:
+    """
+    Returns each MJ card of a shoe and its position from the top, every deck in the shoe repeats MJ_LOCATIONS one deck further down
+    """
+    deckSize = getDeckSize(True)
+    return [(card, i * deckSize + pos) for i in range(numDecks) for card, pos in zip(MJ_CARDS, Constant.MJ_LOCATIONS.value)]
+
+def buildDeckIds(isBullsEdition: bool, rng: random.Random, numDecks: int = 1) -> bytearray:
+    """
+    Returns the card ids of a shuffled deck (or shoe of numDecks decks), top card last, in a single pass
+
+    The top card of a Bulls deck must be a normal card, rather than reshuffling until it is, the top card is drawn
+    uniformly from the normal cards and everything else is shuffled below it (the same distribution as reshuffling).
+    MJ cards are then placed at their predefined positions while the deck is assembled, instead of being inserted after.
+    """
+    # sorting by random keys is a uniform shuffle, and about twice as fast as random.shuffle's python level swaps
+    randomKey = lambda _: rng.random()
+
+    if not isBullsEdition:
+        return bytearray(sorted(list(range(NUM_NORMAL_CARDS)) * numDecks, key=randomKey))
+
+    # every normal card appears numDecks times, so picking an id uniformly picks uniformly from all the normal cards
+    topId = rng.randrange(NUM_NORMAL_CARDS)
+    rest = (list(range(NUM_NORMAL_CARDS)) + [card.id for card in RODMAN_CARDS]) * numDecks
+    rest[topId] = rest[-1]
+    rest.pop()
+    rest = bytearray(sorted(rest, key=randomKey))
+
+    # MJ locations are positions from the top (the top card being 0), so build the deck from the bottom up splicing them in
+    deckSize = getDeckSize(True, numDecks)
+    cardIds = bytearray()
+    restIdx = 0
+    for card, pos in sorted(getMjLocations(numDecks), key=lambda item: item[1], reverse=True):
+        numCardsBelow = deckSize - 1 - pos - len(cardIds)
+        cardIds += rest[restIdx:restIdx + numCardsBelow]
+        restIdx += numCardsBelow
+        cardIds.append(card.id)
+
+    cardIds += rest[restIdx:]
+    cardIds.append(topId)
+    return cardIds
+
+def buildDecks(count: int, isBullsEdition: bool, rng: random.Random, out=None, numDecks: int = 1):
+    """
+    Builds many decks back to back in one buffer, deck i (top card last) is out[i * deckSize:(i + 1) * deckSize]
+
+    With numpy (the sim extra) every deck is shuffled at once by sorting one (count, deck size) array of random keys, seeded
+    from rng, so the decks follow the same distribution as buildDeckIds but are not the same decks. Without it they are
+    built one at a time with buildDeckIds.
+
+    :param out: optional preallocated writable buffer of count * deckSize bytes, e.g. a bytearray or a C-contiguous numpy uint8 array
+    :param numDecks: number of decks in each shoe
+    """
+    try:
+        # imported here so the engine (and the GUI) never pay for importing numpy
+        import numpy as np
+    except ImportError:
+        np = None
+
+    deckSize = getDeckSize(isBullsEdition, numDecks)
+    if out is None:
+        out = bytearray(count * deckSize)
+
+    view = memoryview(out).cast("B")
+    if np is None:
+        for i in range(count):
+            view[i * deckSize:(i + 1) * deckSize] = buildDeckIds(isBullsEdition, rng, numDecks)
+        return out
+
+    npRng = np.random.default_rng(rng.getrandbits(128))
+    rows = np.arange(count)[:, None]
+    if not isBullsEdition:
+        cardIds = np.tile(np.arange(NUM_NORMAL_CARDS, dtype=np.uint8), numDecks)
+        decks = cardIds[np.argsort(npRng.random((count, len(cardIds))), axis=1)]
+    else:
+        # in draw order (top card first): the top card is drawn uniformly from the normal cards, the rest is shuffled below
+        # it and the MJ cards are inserted at their locations, as buildDeckIds does
+        cardsPerDeck = NUM_NORMAL_CARDS + len(RODMAN_CARDS)
+        cardIds = np.tile(np.array(list(range(NUM_NORMAL_CARDS)) + [card.id for card in RODMAN_CARDS], dtype=np.uint8), numDecks)
+        normalIdx = npRng.integers(0, NUM_NORMAL_CARDS * numDecks, size=count)
+        topIdx = normalIdx // NUM_NORMAL_CARDS * cardsPerDeck + normalIdx % NUM_NORMAL_CARDS
+
+        rest = np.tile(cardIds, (count, 1))
+        topIds = rest[rows[:, 0], topIdx]
+        rest[rows[:, 0], topIdx] = rest[:, -1]
+        rest = rest[:, :-1]
+        decks = np.concatenate((topIds[:, None], rest[rows, np.argsort(npRng.random(rest.shape), axis=1)]), axis=1)
+
+        # np.insert takes positions in the array before any insertion, hence the - i
+        mjLocations = sorted(getMjLocations(numDecks), key=lambda item: item[1])
+        decks = np.insert(decks, [pos - i for i, (_, pos) in enumerate(mjLocations)], np.array([card.id for card, _ in mjLocations], dtype=np.uint8), axis=1)
+        decks = decks[:, ::-1]
+
+    np.frombuffer(view, dtype=np.uint8).reshape(count, deckSize)[:] = decks
+    return out
 
 class Deck:
-    def __init__(self, isBullsEdition: bool):
+    def __init__(self, isBullsEdition: bool, rng: random.Random = None, numDecks: int = 1):
         """
         Initialises a deck of, already shuffled and ready to use, playing cards
 
         :param isBullsEdition: if true, adds the corresponding special cards
+        :param rng: the random number generator used to shuffle, pass a seeded one to get a reproducible deck (defaults to the global random module)
+        :param numDecks: number of standard decks shuffled together into one shoe, each bringing its own special cards
         """
-        self.cards: list[Card] = []
-        self.startingNumPlayingCards: int = 0
-        
-        # initialise the playing cards according to the enum classes, skipping the special cards
-        for rank in Rank:
-            if rank in (Rank.MJ, Rank.RODMAN):
-                continue
-            for suit in Suit:
-                if suit == Suit.BULLS:
-                    continue
-                
-                self.startingNumPlayingCards += 1
-                self.cards.append(Card(rank, suit))
-
-        # insert Rodman cards
-        if isBullsEdition:
-            for i in range(Constant.NUM_RODMAN_CARDS.value):
-                self.cards.append(Card(Rank.RODMAN, Suit.BULLS, i + 1))
-        
-        self.shuffle()
+        self.numDecks: int = numDecks
+        # one byte per card, the top of the deck is the end of the array
+        # (the rng is not kept, a seeded Random is several times bigger than the deck itself)
+        self.cardIds: bytearray = buildDeckIds(isBullsEdition, rng if rng is not None else random, numDecks)
+        self.startingNumPlayingCards: int = NUM_NORMAL_CARDS * numDecks
+        # built on first use (see getValueIndex), most decks are never asked for odds
+        self.valueIndex: CardValueIndex = None
+
+    @classmethod
+    def fromCardIds(cls, cardIds: bytes, numDecks: int = 1) -> "Deck":
+        """
+        Returns a deck holding exactly the given card ids (top card last) without shuffling, used to restore or replay a game
+        """
+        deck = cls.__new__(cls)
+        deck.numDecks = numDecks
+        deck.cardIds = bytearray(cardIds)
+        deck.startingNumPlayingCards = NUM_NORMAL_CARDS * numDecks
+        deck.valueIndex = None
+        return deck
+
+    def getValueIndex(self) -> CardValueIndex:
+        """
+        Returns the index of the normal card values left in the deck, building it from the remaining cards on first use
+        """
+        if self.valueIndex is None:
+            # normal card ids are already in value order, so a card's id is its slot in the index (special cards are left out)
+            counts = Counter(self.cardIds)
+            self.valueIndex = CardValueIndex.fromSlotCounts([counts[cardId] for cardId in range(NUM_NORMAL_CARDS)], NORMAL_CARD_VALUES)
+
+        return self.valueIndex
 
-        # assuming we are playing the special mode, this ensure the 1st card we draw is always a normal card.
-        while isBullsEdition and self.seeTopCard().rank in (Rank.MJ, Rank.RODMAN):
-            self.shuffle()
+    def __len__(self) -> int:
+        return len(self.cardIds)
 
-        # after ensuring top card is a normal card, insert MJ cards into appropriate places
-        if isBullsEdition:
-            self.insertMjCards()
+    @property
+    def cards(self) -> list[Card]:
+        """
+        The cards left in the deck (the top card is last), built from the card ids on every access
+        """
+        return [CARDS[cardId] for cardId in self.cardIds]
     
     def printDeck(self) -> None:
         """
         For debugging purposes, prints the entire deck
         """
-        res: list[str] = []
-        for card in self.cards:
-            res.append(f"{card.getName()}")
+        print([CARD_NAMES[cardId] for cardId in self.cardIds])
 
-        print(res)
-
-    def shuffle(self) -> None:
+    def shuffle(self, rng: random.Random = None) -> None:
         """
         Shuffles the cards
+
+        :param rng: optional random number generator (defaults to the global random module)
         """
-        random.shuffle(self.cards)
+        (rng if rng is not None else random).shuffle(self.cardIds)
 
     def drawCard(self) -> Card:
         """
         Returns the top card from the deck (removing it from the deck)
         """
-        return self.cards.pop() if self.cards else None
+        if not self.cardIds:
+            return None
+
+        cardId = self.cardIds.pop()
+        if cardId < NUM_NORMAL_CARDS and self.valueIndex is not None:
+            self.valueIndex.add(CARD_VALUES[cardId], -1)
+        return CARDS[cardId]
     
     def seeTopCard(self) -> Card:
         """
         See the top card without removing it 
         """
-        return self.cards[-1] if self.cards else None
+        return CARDS[self.cardIds[-1]] if self.cardIds else None
+
+    def seeCards(self, numCards: int) -> list[Card]:
+        """
+        See the next few cards (top card first) without removing them
+        """
+        return [CARDS[cardId] for cardId in self.cardIds[:-numCards-1:-1]]
     
-    def insertMjCards(self) -> None:
+    def countHigher(self, card: Card) -> int:
         """
-        Inserts MJ cards into the predefined locations
+        Returns the number of normal cards left in the deck that are higher than the given card
         """
-        for i, pos in enumerate(Constant.MJ_LOCATIONS.value):
-            self.cards.insert(len(self.cards)-pos, Card(Rank.MJ, Suit.BULLS, i + 1))
+        return self.getValueIndex().countHigher(card.value)
+
+    def countLower(self, card: Card) -> int:
+        """
+        Returns the number of normal cards left in the deck that are lower than the given card
+        """
+        return self.getValueIndex().countLower(card.value)
+
+    def getProbabilityHigher(self, card: Card) -> float:
+        """
+        Returns the probability that the next normal card drawn is higher than the given card
+        """
+        valueIndex = self.getValueIndex()
+        return valueIndex.countHigher(card.value) / valueIndex.total if valueIndex.total else 0.0
+
+    def getProbabilityLower(self, card: Card) -> float:
+        """
+        Returns the probability that the next normal card drawn is lower than the given card
+        """
+        valueIndex = self.getValueIndex()
+        return valueIndex.countLower(card.value) / valueIndex.total if valueIndex.total else 0.0
+
+# what HigherLowerGame.changeListeners are told about, mjRound is None outside of an MJ round
+CHANGE_EVENTS = ("score", "currentCard", "topCard", "rodmanCards", "mjRound", "normalCardsRemaining")
+
+# Card kinds the rules tell apart. A new special card gets a kind here, an entry in SPECIAL_CARD_KINDS and a rule in RuleTable.
+NORMAL_CARD = 0
+MJ_CARD = 1
+RODMAN_CARD = 2
+NUM_CARD_KINDS = 3
+SPECIAL_CARD_KINDS: dict[Rank, int] = {Rank.MJ: MJ_CARD, Rank.RODMAN: RODMAN_CARD}
+
+# what playRound does once a transition has been applied
+CONTINUE = 0
+CHECK_LAST_CARD = 1
+GAME_OVER = 2
+
+class Transition:
+    __slots__ = (
+        "scoreDelta", "isMjActivated", "currentMjRound", "currentMjSequence", "isRodmanActivated", "rodmanCardsDelta", "rodmanCardsUsed",
+        "mjRoundsEntered", "mjRoundsWon", "hasCounters", "isCurrentCardUpdated", "result",
+    )
+
+    def __init__(self, isMjActivated: bool, currentMjRound: int, isRodmanActivated: bool, scoreDelta: int = 0, rodmanCardsDelta: int = 0,
+                 rodmanCardsUsed: int = 0, mjRoundsEntered: int = 0, mjRoundsWon: int = 0, isCurrentCardUpdated: bool = False, result: int = CONTINUE):
+        """
+        The effect of one round on the game: the MJ and Rodman state after the round, what is added to the score and counters,
+        whether the drawn card becomes the current card and how the round ends
+        """
+        self.scoreDelta: int = scoreDelta
+        self.isMjActivated: bool = isMjActivated
+        self.currentMjRound: int = currentMjRound
+        # set by the RuleTable, which owns the shared sequences
+        self.currentMjSequence: list[int] = None
+        self.isRodmanActivated: bool = isRodmanActivated
+        self.rodmanCardsDelta: int = rodmanCardsDelta
+        self.rodmanCardsUsed: int = rodmanCardsUsed
+        self.mjRoundsEntered: int = mjRoundsEntered
+        self.mjRoundsWon: int = mjRoundsWon
+        # most rounds change none of the Rodman card count or the counters, so applyRound can skip them
+        self.hasCounters: bool = bool(rodmanCardsDelta or rodmanCardsUsed or mjRoundsEntered or mjRoundsWon)
+        self.isCurrentCardUpdated: bool = isCurrentCardUpdated
+        self.result: int = result
+
+class RuleTable:
+    def __init__(self, mjWinningSequence: list[int], mjBonusPoints: int, rodmanBonusPoints: int):
+        """
+        Compiles the rules into a flat state transition table, indexed by (card kind, guess outcome, MJ state, Rodman state)
+
+        :param mjWinningSequence: 1 where the player must guess right during an MJ round, 0 where they must guess wrong
+        """
+        self.mjWinningSequence: list[int] = list(mjWinningSequence)
+        self.mjBonusPoints: int = mjBonusPoints
+        self.rodmanBonusPoints: int = rodmanBonusPoints
+        # MJ state 0 is no MJ round, r + 1 is MJ round r
+        self.numMjStates: int = len(self.mjWinningSequence) + 1
+        # currentMjSequence for each MJ round, shared by every game so never mutated
+        self.mjSequences: list[list[int]] = [self.mjWinningSequence[:mjRound] for mjRound in range(self.numMjStates)]
+        self.cardKinds: list[int] = [SPECIAL_CARD_KINDS.get(card.rank, NORMAL_CARD) for card in CARDS]
+
+        cardRules = {NORMAL_CARD: self.getNormalCardTransition, MJ_CARD: self.getMjCardTransition, RODMAN_CARD: self.getRodmanCardTransition}
+        self.transitions: list[Transition] = [None] * (NUM_CARD_KINDS * 2 * self.numMjStates * 4)
+        for kind, isCorrect, mjState, isRodmanActivated, isRodmanAvailable in itertools.product(
+            range(NUM_CARD_KINDS), (False, True), range(self.numMjStates), (False, True), (False, True)
+        ):
+            transition = cardRules[kind](isCorrect, mjState, isRodmanActivated, isRodmanAvailable)
+            transition.currentMjSequence = self.mjSequences[transition.currentMjRound]
+            self.transitions[self.getIndex(kind, isCorrect, mjState, isRodmanActivated, isRodmanAvailable)] = transition
+
+    def getIndex(self, kind: int, isCorrect: bool, mjState: int, isRodmanActivated: bool, isRodmanAvailable: bool) -> int:
+        """
+        :param isRodmanAvailable: whether a wrong guess would be saved by a Rodman card
+        """
+        return (((kind * 2 + isCorrect) * self.numMjStates + mjState) * 2 + isRodmanActivated) * 2 + isRodmanAvailable
+
+    def getMjCardTransition(self, isCorrect: bool, mjState: int, isRodmanActivated: bool, isRodmanAvailable: bool) -> Transition:
+        """
+        An MJ card starts an MJ round (or leaves the current one as it is)
+        """
+        # the counters are deltas added by applyRound, so every MJ card counts as entering an MJ round, also one drawn during an
+        # MJ round, the same as the nested playRound counted them
+        return Transition(True, max(mjState - 1, 0), isRodmanActivated, mjRoundsEntered=1)
+
+    def getRodmanCardTransition(self, isCorrect: bool, mjState: int, isRodmanActivated: bool, isRodmanAvailable: bool) -> Transition:
+        return Transition(mjState > 0, max(mjState - 1, 0), isRodmanActivated, rodmanCardsDelta=1)
+
+    def getNormalCardTransition(self, isCorrect: bool, mjState: int, isRodmanActivated: bool, isRodmanAvailable: bool) -> Transition:
+        if mjState:
+            mjRound = mjState - 1
+            if isCorrect != bool(self.mjWinningSequence[mjRound]):
+                # missing the sequence ends the MJ round but not the game (the last card is not checked either)
+                return Transition(False, 0, isRodmanActivated, isCurrentCardUpdated=True)
+            elif mjRound + 1 == len(self.mjWinningSequence):
+                # completing the sequence does not check for the last card either
+                return Transition(False, 0, isRodmanActivated, scoreDelta=1 + self.mjBonusPoints, mjRoundsWon=1, isCurrentCardUpdated=True)
+            else:
+                return Transition(True, mjRound + 1, isRodmanActivated, scoreDelta=1, isCurrentCardUpdated=True, result=CHECK_LAST_CARD)
+        elif isCorrect:
+            scoreDelta = self.rodmanBonusPoints if isRodmanActivated else 1
+            return Transition(False, 0, False, scoreDelta=scoreDelta, isCurrentCardUpdated=True, result=CHECK_LAST_CARD)
+        elif isRodmanAvailable:
+            return Transition(False, 0, True, rodmanCardsDelta=-1, rodmanCardsUsed=1, isCurrentCardUpdated=True, result=CHECK_LAST_CARD)
+        else:
+            return Transition(False, 0, isRodmanActivated, result=GAME_OVER)
+
+DEFAULT_RULES = RuleTable(Constant.MJ_WINNING_SEQUENCE.value, Constant.MJ_BONUS_POINTS.value, Constant.RODMAN_BONUS_POINTS.value)
 
 class HigherLowerGame:
+    # shared by every game unless a game is given its own RuleTable (e.g. one with another MJ sequence)
+    rules: RuleTable = DEFAULT_RULES
+    # what configureSpecialEdition builds the deck with, subclasses can swap in another Deck (e.g. history.SharedDeck)
+    deckClass: type = Deck
+
     def __init__(self):
         """
         Initialises the high level game object (However, it does not initilise deck since user needs to decide which version of game to play)
@@ -171,6 +508,7 @@ class HigherLowerGame:
         self.normalCardsDrawned: int = 0
 
         self.isBullsEdition: bool = None
+        self.isTieCorrect: bool = False
         self.currentRodmanCards: int = 0
         self.currentMjRound: int = 0
         self.currentMjSequence: list[int] = []
@@ -178,25 +516,76 @@ class HigherLowerGame:
         self.isRodmanActivated: bool = False
         self.score: int = 0
 
+        # totals over the whole game, for analytics
+        self.rodmanCardsUsed: int = 0
+        self.mjRoundsEntered: int = 0
+        self.mjRoundsWon: int = 0
+        # called with the game once playRound returns False
+        self.gameOverListeners: list[Callable[["HigherLowerGame"], None]] = []
+        # called with (event, new value) for each of CHANGE_EVENTS whose value a round (or startGame) changed
+        self.changeListeners: list[Callable[[str, object], None]] = []
+
+    def getObservedState(self) -> tuple:
+        """
+        Returns the values behind CHANGE_EVENTS, in the same order
+        """
+        return (
+            self.score,
+            self.currentCard,
+            self.deck.seeTopCard() if self.deck is not None else None,
+            self.currentRodmanCards,
+            self.currentMjRound if self.isMjActivated else None,
+            self.getNumRemainingNormalCards() if self.deck is not None else 0,
+        )
+
+    def notifyChanges(self, previousState: tuple) -> None:
+        """
+        Tells the change listeners about every observed value that differs from previousState (see getObservedState)
+        """
+        for event, previousValue, value in zip(CHANGE_EVENTS, previousState, self.getObservedState()):
+            if value is not previousValue and value != previousValue:
+                for listener in self.changeListeners:
+                    listener(event, value)
+
     def getNumRemainingNormalCards(self) -> int:
         return self.deck.startingNumPlayingCards - self.normalCardsDrawned
     
-    def configureSpecialEdition(self, isBullsEdition: bool) -> None:
+    def configureSpecialEdition(self, isBullsEdition: bool, rng: random.Random = None, numDecks: int = 1, isTieCorrect: bool = False) -> None:
         """
         Update the variables relevant to special edition and also initialises the deck of cards accordingly
+
+        :param rng: optional seeded random number generator, so the game can be replayed
+        :param numDecks: number of decks in the shoe
+        :param isTieCorrect: whether drawing a card equal to the current card counts as a correct guess (only possible with more than 1 deck)
         """
         self.isBullsEdition = isBullsEdition
-        self.deck = Deck(self.isBullsEdition)
+        self.isTieCorrect = isTieCorrect
+        self.deck = self.deckClass(self.isBullsEdition, rng, numDecks)
 
     def compareCards(self, currentCard: Card, nextCard: Card, isUserInputHigher: bool) -> bool:
         """
-        Returns a boolean depending on if the user correctly guesses the next card's value
+        Returns a boolean depending on if the user correctly guesses the next card's value (an equal card is correct for either guess if isTieCorrect, otherwise wrong for both)
         """
-        if (nextCard.value > currentCard.value and isUserInputHigher) or (nextCard.value < currentCard.value and not isUserInputHigher):
+        if nextCard.value == currentCard.value:
+            return self.isTieCorrect
+        elif (nextCard.value > currentCard.value and isUserInputHigher) or (nextCard.value < currentCard.value and not isUserInputHigher):
             return True
         else:
             return False
     
+    def getBestGuess(self) -> Optional[bool]:
+        """
+        Returns the guess (True for higher) that maximises the expected final score, or None where the solver does not apply
+        (shoes of more than one deck, or a game given its own RuleTable)
+        """
+        if self.deck.numDecks != 1 or self.rules is not DEFAULT_RULES:
+            return None
+
+        # imported here since the solver is itself built on the game
+        from .solver import getSolver
+        solver = getSolver(self.isBullsEdition)
+        return solver.bestGuess(solver.getState(self))
+
     def isNextCardRodman(self, card: Card) -> bool:
         return True if card.rank == (Rank.RODMAN) else False
     
@@ -211,69 +600,90 @@ class HigherLowerGame:
         self.currentMjRound = 0
         self.currentMjSequence = []
 
+    def endGame(self) -> bool:
+        """
+        Tells the game over listeners that the game has ended, returns False so playRound can return it directly
+        """
+        for listener in self.gameOverListeners:
+            listener(self)
+        return False
+
     def playRound(self, isUserInputHigher: bool) -> bool:
         """
-        Returns a boolean indicating if the round should continue (logic to handle player's guess and next card scenarios are here)
-        """ 
-        
-        nextCard: Card = self.deck.drawCard()
+        Returns a boolean indicating if the round should continue (the rules themselves are in the game's RuleTable)
+        """
+        if not self.changeListeners:
+            return self.applyRound(isUserInputHigher)
 
-        if nextCard.rank == Rank.MJ:
-            self.isMjActivated = True
-            return True
-        elif nextCard.rank == Rank.RODMAN:
-            self.currentRodmanCards += 1
-            return True
-        else: # next card is NOT a special card
+        previousState = self.getObservedState()
+        isPlayNextRound = self.applyRound(isUserInputHigher)
+        self.notifyChanges(previousState)
+        return isPlayNextRound
+
+    def applyRound(self, isUserInputHigher: bool) -> bool:
+        """
+        Plays a round without telling the change listeners, see playRound
+        """
+        deck = self.deck
+        nextCard: Card = deck.drawCard()
+        rules = self.rules
+        kind = rules.cardKinds[nextCard.id]
+
+        if kind == NORMAL_CARD:
             isCorrect: bool = self.compareCards(self.currentCard, nextCard, isUserInputHigher)
-            
-            # need to increment before if statements so, because if we are on the last card, the game needs to know that this is the last round and return false
+            # need to increment before looking up the transition, because a wrong guess on the last card cannot be saved by a Rodman card
             self.normalCardsDrawned += 1
+            # only a wrong guess can be saved, the table ignores isRodmanAvailable for a right one so it is not worked out then
+            isRodmanAvailable = not isCorrect and self.currentRodmanCards > 0 and self.isBullsEdition and self.normalCardsDrawned < deck.startingNumPlayingCards
+        else:
+            isCorrect = isRodmanAvailable = False
 
-            if self.isMjActivated:
-                # if player correctly guess current MJ sequence
-                if (isCorrect and Constant.MJ_WINNING_SEQUENCE.value[self.currentMjRound] == 1) or (not isCorrect and Constant.MJ_WINNING_SEQUENCE.value[self.currentMjRound] == 0):
-                    self.score += 1
-                    self.currentMjSequence.append(Constant.MJ_WINNING_SEQUENCE.value[self.currentMjRound])
-
-                    # check if the player won the mj round 
-                    if self.currentMjSequence == Constant.MJ_WINNING_SEQUENCE.value:
-                        self.score += Constant.MJ_BONUS_POINTS.value
-                        self.resetMjRound()
-                        self.currentCard = nextCard
-                        return True
-                else: # player guesses wrong so we end
-                    self.resetMjRound()
-                    self.currentCard = nextCard
-                    return True
-                self.currentMjRound += 1
-            elif isCorrect and self.isRodmanActivated:
-                self.score += Constant.RODMAN_BONUS_POINTS.value
-                self.isRodmanActivated = False
-            elif isCorrect:
-                self.score += 1
-            else:
-                if self.isBullsEdition and self.currentRodmanCards > 0 and self.normalCardsDrawned < self.deck.startingNumPlayingCards:
-                    self.currentRodmanCards -= 1
-                    self.isRodmanActivated = True
-                else: # this means u either (have no rodman cards and got it wrong) or (u are playing normal version of the game and got it wrong)
-                    return False
-
-            if self.normalCardsDrawned == self.deck.startingNumPlayingCards:
-                return False
-            
+        # same as rules.getIndex, inlined since it runs every round
+        mjState = self.currentMjRound + 1 if self.isMjActivated else 0
+        transition = rules.transitions[(((kind * 2 + isCorrect) * rules.numMjStates + mjState) * 2 + self.isRodmanActivated) * 2 + isRodmanAvailable]
+
+        self.score += transition.scoreDelta
+        self.isMjActivated = transition.isMjActivated
+        self.currentMjRound = transition.currentMjRound
+        self.currentMjSequence = transition.currentMjSequence
+        self.isRodmanActivated = transition.isRodmanActivated
+        if transition.hasCounters:
+            self.currentRodmanCards += transition.rodmanCardsDelta
+            self.rodmanCardsUsed += transition.rodmanCardsUsed
+            self.mjRoundsEntered += transition.mjRoundsEntered
+            self.mjRoundsWon += transition.mjRoundsWon
+
+        result = transition.result
+        if result == GAME_OVER or (result == CHECK_LAST_CARD and self.normalCardsDrawned == deck.startingNumPlayingCards):
+            return self.endGame()
+
+        if transition.isCurrentCardUpdated:
             self.currentCard = nextCard
 
-            return True
+        return True
             
     def startGame(self) -> None:
         """
-        Draws a card to start the game
+        Resets everything left over from a previous game and draws a card to start the game
         """
+        previousState = self.getObservedState() if self.changeListeners else None
+
+        self.normalCardsDrawned = 0
+        self.currentRodmanCards = 0
+        self.isRodmanActivated = False
+        self.resetMjRound()
+        self.score = 0
+        self.rodmanCardsUsed = 0
+        self.mjRoundsEntered = 0
+        self.mjRoundsWon = 0
+
         # Draws the initial card for the user
         self.currentCard = self.deck.drawCard()
         self.normalCardsDrawned += 1
 
+        if self.changeListeners:
+            self.notifyChanges(previousState)
+
     
     
     
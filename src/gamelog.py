@@ -0,0 +1,249 @@
+from typing import Iterator, NamedTuple
+from .game import Deck, HigherLowerGame
+import argparse
+import os
+import struct
+
+try:
+    import numpy as np
+    from .simulator import CARD_CODES, simulateGames
+except ImportError:
+    # without the sim extra every game is verified through HigherLowerGame.playRound
+    np = None
+
+
+# Each game is appended as: flags, numDecks, number of cards, number of guesses, final score, then the deck's card ids
+# as they were before startGame (top card last), then the guesses packed 8 per byte (bit set == guessed higher).
+# The index file next to the log holds the byte offset of every BLOCK_SIZEth game, so any game is found by one seek and
+# skipping past at most BLOCK_SIZE - 1 records.
+RECORD_HEADER = struct.Struct("<BBHHi")
+INDEX_ENTRY = struct.Struct("<Q")
+BLOCK_SIZE = 1024
+
+IS_BULLS_EDITION = 1
+IS_TIE_CORRECT = 2
+
+class LoggedGame(NamedTuple):
+    isBullsEdition: bool
+    isTieCorrect: bool
+    numDecks: int
+    cardIds: bytes
+    numGuesses: int
+    guesses: bytes
+    score: int
+
+    def getGuess(self, roundIdx: int) -> bool:
+        return bool(self.guesses[roundIdx >> 3] & (1 << (roundIdx & 7)))
+
+def packGuesses(guesses: list[bool]) -> bytes:
+    packed = bytearray((len(guesses) + 7) // 8)
+    for roundIdx, isUserInputHigher in enumerate(guesses):
+        if isUserInputHigher:
+            packed[roundIdx >> 3] |= 1 << (roundIdx & 7)
+    return bytes(packed)
+
+def getIndexPath(path: str) -> str:
+    return path + ".idx"
+
+def readRecord(file) -> LoggedGame:
+    """
+    Reads the next game from an open log, returns None at the end of the log (or at a partially written last record)
+    """
+    header = file.read(RECORD_HEADER.size)
+    if len(header) < RECORD_HEADER.size:
+        return None
+
+    flags, numDecks, numCards, numGuesses, score = RECORD_HEADER.unpack(header)
+    body = file.read(numCards + (numGuesses + 7) // 8)
+    if len(body) < numCards + (numGuesses + 7) // 8:
+        return None
+
+    return LoggedGame(bool(flags & IS_BULLS_EDITION), bool(flags & IS_TIE_CORRECT), numDecks, body[:numCards], numGuesses, body[numCards:], score)
+
+class GameLogWriter:
+    def __init__(self, path: str):
+        """
+        Opens a game log for appending, creating it if needed
+        """
+        self.path: str = path
+        self.numGames: int = self.countGames()
+        self.file = open(path, "ab")
+        self.indexFile = open(getIndexPath(path), "ab")
+
+    def countGames(self) -> int:
+        """
+        Counts the games already in the log, only reading the last block. A partially written last record (from a crash) is
+        cut off so appends follow the last whole game, and a missing or empty index is rebuilt by reading the whole log.
+        """
+        indexPath = getIndexPath(self.path)
+        if not os.path.exists(self.path):
+            open(indexPath, "wb").close()
+            return 0
+
+        index = b""
+        if os.path.exists(indexPath):
+            with open(indexPath, "rb") as indexFile:
+                index = indexFile.read()
+        # a torn last entry is dropped, as is any entry past the end of the log
+        blockOffsets = [offset for (offset,) in INDEX_ENTRY.iter_unpack(index[:len(index) - len(index) % INDEX_ENTRY.size])]
+        logSize = os.path.getsize(self.path)
+        while blockOffsets and blockOffsets[-1] > logSize:
+            blockOffsets.pop()
+
+        with open(self.path, "rb") as file:
+            numGames = (len(blockOffsets) - 1) * BLOCK_SIZE if blockOffsets else 0
+            file.seek(blockOffsets[-1] if blockOffsets else 0)
+            while True:
+                endOffset = file.tell()
+                if numGames == len(blockOffsets) * BLOCK_SIZE:
+                    blockOffsets.append(endOffset)
+                if readRecord(file) is None:
+                    break
+                numGames += 1
+
+        # the entry just added for a block that has no whole game yet is written again by the next append
+        del blockOffsets[(numGames + BLOCK_SIZE - 1) // BLOCK_SIZE:]
+        os.truncate(self.path, endOffset)
+        with open(indexPath, "wb") as indexFile:
+            indexFile.write(b"".join(INDEX_ENTRY.pack(offset) for offset in blockOffsets))
+        return numGames
+
+    def append(self, cardIds: bytes, guesses: list[bool], score: int, isBullsEdition: bool, numDecks: int = 1, isTieCorrect: bool = False) -> int:
+        """
+        Appends a finished game, returns its game number
+
+        :param cardIds: the deck's card ids before startGame was called (top card last)
+        :param guesses: the isUserInputHigher given to each playRound, in order
+        :param score: the final score, checked when the log is verified
+        """
+        if not 1 <= numDecks <= 255:
+            # the record header keeps the shoe size in one byte
+            raise ValueError(f"numDecks must be between 1 and 255 to be logged, not {numDecks}")
+
+        if self.numGames % BLOCK_SIZE == 0:
+            self.indexFile.write(INDEX_ENTRY.pack(self.file.tell()))
+
+        flags = (IS_BULLS_EDITION if isBullsEdition else 0) | (IS_TIE_CORRECT if isTieCorrect else 0)
+        self.file.write(RECORD_HEADER.pack(flags, numDecks, len(cardIds), len(guesses), score))
+        self.file.write(cardIds)
+        self.file.write(packGuesses(guesses))
+
+        self.numGames += 1
+        return self.numGames - 1
+
+    def close(self) -> None:
+        self.file.close()
+        self.indexFile.close()
+
+    def __enter__(self) -> "GameLogWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+class GameLogReader:
+    def __init__(self, path: str):
+        """
+        Opens a game log for reading, games are streamed from disk so the log can be bigger than memory
+        """
+        self.path: str = path
+        with open(getIndexPath(path), "rb") as indexFile:
+            index = indexFile.read()
+        self.blockOffsets: list[int] = [offset for (offset,) in INDEX_ENTRY.iter_unpack(index)]
+
+    def __iter__(self) -> Iterator[LoggedGame]:
+        with open(self.path, "rb", buffering=1 << 20) as file:
+            while (loggedGame := readRecord(file)) is not None:
+                yield loggedGame
+
+    def getGame(self, gameNumber: int) -> LoggedGame:
+        """
+        Returns a single game, seeking straight to its block
+        """
+        block, skip = divmod(gameNumber, BLOCK_SIZE)
+        if block >= len(self.blockOffsets):
+            raise IndexError(f"game {gameNumber} is not in the log")
+
+        with open(self.path, "rb") as file:
+            file.seek(self.blockOffsets[block])
+            for _ in range(skip):
+                if readRecord(file) is None:
+                    raise IndexError(f"game {gameNumber} is not in the log")
+            loggedGame = readRecord(file)
+
+        if loggedGame is None:
+            raise IndexError(f"game {gameNumber} is not in the log")
+        return loggedGame
+
+def replay(loggedGame: LoggedGame, numRounds: int = None) -> HigherLowerGame:
+    """
+    Replays a logged game through HigherLowerGame.playRound, stopping after numRounds rounds (or at the end of the game)
+    """
+    game = HigherLowerGame()
+    game.isBullsEdition = loggedGame.isBullsEdition
+    game.isTieCorrect = loggedGame.isTieCorrect
+    game.deck = Deck.fromCardIds(loggedGame.cardIds, loggedGame.numDecks)
+    game.startGame()
+
+    numRounds = loggedGame.numGuesses if numRounds is None else min(numRounds, loggedGame.numGuesses)
+    for roundIdx in range(numRounds):
+        if not game.playRound(loggedGame.getGuess(roundIdx)):
+            break
+
+    return game
+
+def verifyBatch(batch: list[tuple[int, LoggedGame]]) -> list[int]:
+    """
+    Replays a batch of games of the same edition and size with the batch simulator, returns the game numbers whose score differs
+    """
+    decks = CARD_CODES[np.frombuffer(b"".join(loggedGame.cardIds for _, loggedGame in batch), dtype=np.uint8).reshape(len(batch), -1)[:, ::-1]]
+
+    numRounds = decks.shape[1] - 1
+    guessBytes = b"".join(loggedGame.guesses.ljust((numRounds + 7) // 8, b"\0") for _, loggedGame in batch)
+    guesses = np.unpackbits(np.frombuffer(guessBytes, dtype=np.uint8).reshape(len(batch), -1), axis=1, bitorder="little")[:, :numRounds].astype(bool)
+
+    scores = simulateGames(decks, guesses, batch[0][1].isBullsEdition)
+    expected = np.array([loggedGame.score for _, loggedGame in batch])
+    return [batch[i][0] for i in np.flatnonzero(scores != expected)]
+
+def verifyLog(path: str, batchSize: int = 1 << 16) -> tuple[int, list[int]]:
+    """
+    Re-plays every game in the log, streaming it in batches, returns the number of games and the game numbers whose logged score is wrong
+    """
+    numGames = 0
+    mismatches: list[int] = []
+    # single deck games without the tie rule are replayed in bulk by the simulator, grouped by edition
+    batches: dict[bool, list[tuple[int, LoggedGame]]] = {False: [], True: []}
+
+    for gameNumber, loggedGame in enumerate(GameLogReader(path)):
+        numGames += 1
+        if np is not None and loggedGame.numDecks == 1 and not loggedGame.isTieCorrect:
+            batch = batches[loggedGame.isBullsEdition]
+            batch.append((gameNumber, loggedGame))
+            if len(batch) == batchSize:
+                mismatches.extend(verifyBatch(batch))
+                batch.clear()
+        elif replay(loggedGame).score != loggedGame.score:
+            mismatches.append(gameNumber)
+
+    for batch in batches.values():
+        if batch:
+            mismatches.extend(verifyBatch(batch))
+
+    return numGames, sorted(mismatches)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspects and verifies game logs")
+    parser.add_argument("path")
+    parser.add_argument("--game", type=int, default=None, help="replay a single game instead of verifying the whole log")
+    parser.add_argument("--round", type=int, default=None, help="with --game, stop the replay after this many rounds")
+    args = parser.parse_args()
+
+    if args.game is not None:
+        loggedGame = GameLogReader(args.path).getGame(args.game)
+        game = replay(loggedGame, args.round)
+        print(f"game {args.game}: score {game.score} (logged final score {loggedGame.score}), current card {game.currentCard.getName()}, "
+              f"{game.getNumRemainingNormalCards()} normal cards remaining")
+    else:
+        numGames, mismatches = verifyLog(args.path)
+        print(f"{numGames} games verified, {len(mismatches)} with a wrong score{': ' + str(mismatches[:20]) if mismatches else ''}")
@@ -1,19 +1,159 @@
 import customtkinter as ctk
-from .game import HigherLowerGame, Card, Rank, Constant as GameConstant
 from PIL import Image, ImageTk
+from .game import HigherLowerGame, Card, Rank, Constant as GameConstant
+from .analytics import GameStats
+from . import instrumentation
+from .atlas import getCardImage, getCardNames
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
+import json
 import os
+import time
+
+# the leaderboard (and sqlite3) is only imported once the menu has been painted, see HigherLowerApp.getLeaderboardWriter
 
 
 class Settings(Enum):
     CARD_SIZE = (150,218)
     COLOUR_MODE = "dark"
     WINDOW_TITLE = "Card Game"
+    # Roughly 4 bytes per pixel, all 59 assets at CARD_SIZE come to ~7.7MB
+    IMAGE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    PRELOAD_IMAGES = True
+    # the next card and the one after it, so special card popups are covered too
+    NUM_PREFETCH_CARDS = 2
+    SHOE_SIZES = ("1", "2", "4", "8")
+    # default for the menu option to show special cards under the game info instead of in a popup
+    INLINE_SPECIAL_CARDS = False
+    # set to a file path to have the startup timings written there as JSON once the first card is shown ("-" for stdout)
+    STARTUP_REPORT_ENV = "HIGHER_LOWER_STARTUP_REPORT"
+    # set to a file path to start with instrumentation and its overlay on, the spans are written there as JSON on close ("-" for stdout)
+    INSTRUMENTATION_ENV = "HIGHER_LOWER_INSTRUMENTATION"
+    # toggles instrumentation and its overlay while the app is running
+    INSTRUMENTATION_KEY = "<F12>"
+    INSTRUMENTATION_REFRESH_MS = 500
+    # set to a file path to keep the leaderboard somewhere else than the default (LEADERBOARD_PATH)
+    LEADERBOARD_ENV = "HIGHER_LOWER_LEADERBOARD"
+    LEADERBOARD_PATH = os.path.join(os.path.expanduser("~"), ".higher_lower_leaderboard.db")
+    LEADERBOARD_SIZE = 5
+    # how often the end screen checks whether the final score has been written yet
+    LEADERBOARD_POLL_MS = 50
+
+class CardImageCache:
+    def __init__(self, maxBytes: int):
+        """
+        Initialises an LRU cache of resized card images, keyed by card name and target size
+
+        :param maxBytes: memory cap for the cache, estimated from the decoded RGBA pixels of each image
+        """
+        self.maxBytes: int = maxBytes
+        self.currentBytes: int = 0
+        self.images: OrderedDict[tuple[str, tuple[int, int]], ImageTk.PhotoImage] = OrderedDict()
+
+        # decoding and resizing is done by a worker thread, only the PhotoImage (which needs Tk) is created on the main thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="card-prefetch")
+        self.pending: dict[tuple[str, tuple[int, int]], Future] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.prefetched: int = 0
+
+    def get(self, name: str, size: tuple[int, int]) -> ImageTk.PhotoImage:
+        """
+        Returns the image for the given card name at the given size, only reading it from disk on a miss
+        """
+        key = (name, size)
+        image = self.images.get(key)
+
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+
+        future = self.pending.pop(key, None)
+        if future is not None:
+            self.prefetched += 1
+            image = ImageTk.PhotoImage(future.result())
+        else:
+            self.misses += 1
+            image = ImageTk.PhotoImage(self.decode(name, size))
+
+        self.images[key] = image
+        self.currentBytes += size[0] * size[1] * 4
+
+        # evict the least recently used images, always keeping the one we just loaded
+        while self.currentBytes > self.maxBytes and len(self.images) > 1:
+            (_, evictedSize), _ = self.images.popitem(last=False)
+            self.currentBytes -= evictedSize[0] * evictedSize[1] * 4
+
+        return image
+
+    def decode(self, name: str, size: tuple[int, int]) -> Image.Image:
+        """
+        Reads and resizes a card asset (safe to call from the worker thread)
+        """
+        return getCardImage(name, size)
+
+    def prefetch(self, names: list[str], size: tuple[int, int]) -> None:
+        """
+        Starts decoding the given card images in the background, skipping any that are cached or already on their way
+        """
+        for name in names:
+            key = (name, size)
+            if key not in self.images and key not in self.pending:
+                self.pending[key] = self.executor.submit(self.decode, name, size)
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker thread, dropping any prefetches that have not started yet
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.pending.clear()
+
+    def warmUp(self, size: tuple[int, int]) -> None:
+        """
+        Starts decoding every card asset at the given size in the background, so the game itself never has to touch the disk
+        """
+        self.prefetch(getCardNames(), size)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters, used to confirm that the cache is actually being hit
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "images": len(self.images),
+            "bytes": self.currentBytes,
+        }
 
 class HigherLowerApp(ctk.CTk):
-    def __init__(self, game: HigherLowerGame):
+    def __init__(self, game: HigherLowerGame, startTime: float = None):
+        """
+        :param startTime: time.perf_counter() when the process started importing the GUI, the startup timings are measured from it
+        """
+        self.startTime: float = startTime if startTime is not None else time.perf_counter()
+        # milliseconds from startTime to each startup milestone: import, firstPaint, firstCard
+        self.startupTimes: dict[str, float] = {}
+        self.markStartup("import")
+
         super().__init__()
         self.game: HigherLowerGame = game
+        # finished games are aggregated as they end, the same way simulated games are
+        self.stats = GameStats()
+        self.game.gameOverListeners.append(self.stats.add)
+
+        # scores are written by the writer's own thread, started once the menu has been painted (see onFirstPaint), and the
+        # read connection is only opened once the end screen needs it
+        self.leaderboardPath: str = os.environ.get(Settings.LEADERBOARD_ENV.value) or Settings.LEADERBOARD_PATH.value
+        self.leaderboardWriter: "LeaderboardWriter" = None
+        self.leaderboard: "Leaderboard" = None
+        # the writer's ticket for the last game's score (see LeaderboardWriter.isWritten), None if it could not be recorded and why
+        self.leaderboardTicket: int = None
+        self.leaderboardError: Exception = None
+        self.game.gameOverListeners.append(self.recordScore)
 
         ctk.set_appearance_mode(Settings.COLOUR_MODE.value)
 
@@ -23,15 +163,59 @@ class HigherLowerApp(ctk.CTk):
 
         self.title(Settings.WINDOW_TITLE.value)
 
-        # initialises all frames
+        # card images are shared by every frame, so they are only ever decoded once
+        self.imageCache = CardImageCache(Settings.IMAGE_CACHE_MAX_BYTES.value)
+
+        # only the menu is built up front, the other frames are built the first time they are shown (see getFrame)
         self.menuFrame = MenuFrame(self)
-        self.gameFrame = GameFrame(self)
-        self.endFrame = EndFrame(self)
+        self.frames: dict[type, ctk.CTkFrame] = {MenuFrame: self.menuFrame}
 
         self.currentFrame: ctk.CTkFrame = self.menuFrame
+
+        self.instrumentationOverlay = InstrumentationOverlay(self)
+        instrumentation.registerCounters("imageCache", self.imageCache.stats)
+        instrumentation.registerCounters("ui", lambda: self.frames[GameFrame].getUiStats() if GameFrame in self.frames else {})
+        self.bind(Settings.INSTRUMENTATION_KEY.value, lambda event: self.toggleInstrumentation())
+        if os.environ.get(Settings.INSTRUMENTATION_ENV.value):
+            self.toggleInstrumentation()
         
         # Show menu frame initially
         self.showFrame(self.menuFrame)
+        # idle callbacks run after the pending redraws, so this runs once the menu has been painted
+        self.after_idle(self.onFirstPaint)
+
+    def getFrame(self, frameClass: type) -> ctk.CTkFrame:
+        """
+        Returns the app's frame of the given class, building it on first use
+        """
+        if frameClass not in self.frames:
+            self.frames[frameClass] = frameClass(self)
+        return self.frames[frameClass]
+
+    def onFirstPaint(self):
+        self.markStartup("firstPaint")
+        # decoding the card images can wait until the menu is up, the player still has to pick their options
+        if Settings.PRELOAD_IMAGES.value:
+            self.imageCache.warmUp(Settings.CARD_SIZE.value)
+        # so is opening the leaderboard, it is needed by the end of the first game at the earliest
+        self.after_idle(self.getLeaderboardWriter)
+
+    def markStartup(self, milestone: str):
+        """
+        Records the first time a startup milestone is reached, writing the report once the first card has been shown
+        """
+        if milestone in self.startupTimes:
+            return
+
+        self.startupTimes[milestone] = (time.perf_counter() - self.startTime) * 1000
+        reportPath = os.environ.get(Settings.STARTUP_REPORT_ENV.value)
+        if milestone == "firstCard" and reportPath:
+            report = json.dumps(self.startupTimes)
+            if reportPath == "-":
+                print(report)
+            else:
+                with open(reportPath, "w") as file:
+                    file.write(report)
     
     def showFrame(self, frameToShow: ctk.CTkFrame):
         self.currentFrame.grid_forget() 
@@ -42,6 +226,135 @@ class HigherLowerApp(ctk.CTk):
 
         self.currentFrame = frameToShow
 
+    def recordScore(self, game: HigherLowerGame):
+        # cleared first, so a ticket from an earlier game never stands in for this one
+        self.leaderboardTicket = None
+        try:
+            self.leaderboardTicket = self.getLeaderboardWriter().recordGame(game, self.menuFrame.isIsdpOn.get())
+        except (ImportError, OSError, RuntimeError) as error:
+            # this runs inside playRound, which must still end the game, the end screen says the score was not saved
+            self.leaderboardError = error
+
+    def getLeaderboardWriter(self) -> "LeaderboardWriter":
+        if self.leaderboardWriter is None:
+            from .leaderboard import LeaderboardWriter
+            self.leaderboardWriter = LeaderboardWriter(self.leaderboardPath)
+        return self.leaderboardWriter
+
+    def getLeaderboard(self) -> "Leaderboard":
+        if self.leaderboard is None:
+            from .leaderboard import Leaderboard
+            self.leaderboard = Leaderboard(self.leaderboardPath)
+        return self.leaderboard
+
+    def toggleInstrumentation(self):
+        if instrumentation.isEnabled:
+            instrumentation.disable()
+            self.instrumentationOverlay.hide()
+        else:
+            instrumentation.enable()
+            self.instrumentationOverlay.show()
+
+    def destroy(self):
+        reportPath = os.environ.get(Settings.INSTRUMENTATION_ENV.value)
+        if reportPath:
+            if reportPath == "-":
+                print(json.dumps(instrumentation.dump(), indent=2))
+            else:
+                instrumentation.dump(reportPath)
+
+        self.imageCache.shutdown()
+        if self.leaderboardWriter is not None:
+            self.leaderboardWriter.close()
+        if self.leaderboard is not None:
+            self.leaderboard.close()
+        super().destroy()
+
+class InstrumentationOverlay(ctk.CTkLabel):
+    def __init__(self, master: HigherLowerApp):
+        """
+        A debug overlay in the corner of the window with the latency of every span recorded so far, refreshed while it is shown
+        """
+        super().__init__(master, text=None, justify="left", anchor="w", font=("Courier", 11), fg_color="gray15", corner_radius=6)
+        self.isShown: bool = False
+        # the pending refresh, cancelled on hide so toggling quickly never leaves a second refresh loop running
+        self.refreshId: str = None
+
+    def show(self):
+        if self.isShown:
+            return
+        self.isShown = True
+        self.place(x=8, y=8)
+        self.lift()
+        self.refresh()
+
+    def hide(self):
+        self.isShown = False
+        if self.refreshId is not None:
+            self.after_cancel(self.refreshId)
+            self.refreshId = None
+        self.place_forget()
+
+    def refresh(self):
+        if not self.isShown:
+            return
+
+        lines = [f"{'span':<28}{'count':>8}{'p50 us':>10}{'p99 us':>10}"]
+        for name, summary in instrumentation.dump()["spans"].items():
+            lines.append(f"{name:<28}{summary['count']:>8}{summary['p50Us']:>10.0f}{summary['p99Us']:>10.0f}")
+        self.configure(text="\n".join(lines))
+        self.refreshId = self.after(Settings.INSTRUMENTATION_REFRESH_MS.value, self.refresh)
+
+def getSpecialCardDescription(card: Card) -> str:
+    if card.rank == Rank.MJ:
+        return f"You have received the special {card.getName()} card.\n\n Goal: Guess the next 8 cards in the following sequence: \n(W, W, W, L, L, W, W, W)\n\n to win 10 bonus points!"
+    elif card.rank == Rank.RODMAN:
+        return f"You have received the special {card.getName()} card. Get a 2nd chance on the next card you get wrong!\n\n"
+    return ""
+
+class SpecialCardPopup(ctk.CTkToplevel):
+    def __init__(self, master: HigherLowerApp):
+        """
+        A popup for special cards that is built once and then hidden and shown again, it does not block the main window
+        """
+        super().__init__(master)
+        self.title("Special Card Received")
+        # closing the window only hides it, so it can be shown again
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.frame = ctk.CTkFrame(self)
+        self.frame.grid(padx=40, pady=50)
+
+        self.descLabel = ctk.CTkLabel(
+            self.frame,
+            text=None,
+            wraplength=400,
+            font=("Arial", 14),
+        )
+        self.descLabel.grid(pady=10, padx=20) 
+
+        self.cardLabel = ctk.CTkLabel(
+            self.frame,
+            text=None,
+        )
+        self.cardLabel.grid(pady=20) 
+
+        self.closeBtn = ctk.CTkButton(
+            self.frame, 
+            text="Close", 
+            command=self.withdraw
+        )
+        self.closeBtn.grid(pady=10)
+
+    def show(self, description: str, image: ImageTk.PhotoImage):
+        self.descLabel.configure(text=description)
+        self.cardLabel.configure(image=image)
+        self.deiconify()
+        self.lift()
+
 class GameFrame(ctk.CTkFrame):
     def __init__(self, master: HigherLowerApp):
         super().__init__(master)
@@ -89,6 +402,22 @@ class GameFrame(ctk.CTkFrame):
         )
         self.mjRoundLabel.pack()
 
+        # the solver's best guess, only packed while hints are on and the game has one
+        self.hintLabel = ctk.CTkLabel(
+            self.infoFrame, 
+            text=None, 
+            font=("Arial", 16, "bold")
+        )
+
+        # special card notifications when they are shown inline, only packed while one is showing
+        self.notificationLabel = ctk.CTkLabel(
+            self.infoFrame, 
+            text=None, 
+            wraplength=400,
+            font=("Arial", 14)
+        )
+        self.specialCardPopup: SpecialCardPopup = None
+
         # Deck and Current Card Frame
         self.currentCardFrame = ctk.CTkFrame(self)
         self.currentCardFrame.grid(
@@ -131,127 +460,172 @@ class GameFrame(ctk.CTkFrame):
             pady=10, 
         )
 
+        # the handlers are looked up on every click, so they are timed once instrumentation is turned on
         self.higherBtn = ctk.CTkButton(
             self.btnFrame, 
             text="Higher", 
-            command=self.onHigherBtnClick
+            command=lambda: self.onHigherBtnClick()
         )
         self.higherBtn.grid(row=0, column=0, padx=20)
 
         self.lowerBtn = ctk.CTkButton(
             self.btnFrame, 
             text="Lower", 
-            command=self.onLowerBtnClick
+            command=lambda: self.onLowerBtnClick()
         )
         self.lowerBtn.grid(row=0, column=1, padx=20)
 
-    def showSpecialCardPopup(self, card: Card): 
-        popup = ctk.CTkToplevel(self)
-        popup.title("Special Card Received")
-
-        popup.grid_rowconfigure(0, weight=1)
-        popup.grid_columnconfigure(0, weight=1)
-
-        frame = ctk.CTkFrame(popup)
-        frame.grid(padx=40, pady=50)
-
-        desc = ""
-        if card.rank == Rank.MJ:
-            desc = f"You have received the special {card.getName()} card.\n\n Goal: Guess the next 8 cards in the following sequence: \n(W, W, W, L, L, W, W, W)\n\n to win 10 bonus points!"
-        elif card.rank == Rank.RODMAN:
-            desc = f"You have received the special {card.getName()} card. Get a 2nd chance on the next card you get wrong!\n\n"
-
-        descLabel = ctk.CTkLabel(
-            frame,
-            text=desc,
-            wraplength=400,
-            font=("Arial", 14),
-        )
-        descLabel.grid(pady=10, padx=20) 
-
-        cardLabel = ctk.CTkLabel(
-            frame,
-            text=None,
-            image=self.getImage(card)
-        )
-        cardLabel.grid(pady=20) 
+        self.listenToGame()
 
-        closeBtn = ctk.CTkButton(
-            frame, 
-            text="Close", 
-            command=popup.destroy
-        )
-        closeBtn.grid(pady=10)
-        
-        # Freeze main window until the popup is closed
-        popup.grab_set()
-        self.master.wait_window(popup)
+    def listenToGame(self):
+        """
+        Starts updating the widgets from the game's change events (needs no Tk, so benchmarks/uiupdates.py can drive it with stand-in widgets)
+        """
+        # only the widgets whose values changed are reconfigured after a round, updateUi refreshes all of them when the frame is shown.
+        # The updaters are kept by name and the listener is a lambda, so methods wrapped later by the instrumentation are still called.
+        self.widgetUpdaters: dict[str, str] = {
+            "score": "updateScoreLabel",
+            "currentCard": "updateCurrentCardLabel",
+            "topCard": "updateDeckLabel",
+            "rodmanCards": "updateRodmanCountLabel",
+            "mjRound": "updateMjRoundLabel",
+            "normalCardsRemaining": "updateNumCardsRemainingLabel",
+        }
+        self.game.changeListeners.append(lambda event, value: self.onGameChange(event, value))
+
+        # counted to compare widget reconfigurations against rounds played (see getUiStats)
+        self.numRounds: int = 0
+        self.numWidgetUpdates: int = 0
+
+    def showSpecialCard(self, card: Card):
+        """
+        Tells the player about a special card, inline under the game info or in the popup, without stopping the game
+        """
+        if self.master.menuFrame.isInlineNotificationOn.get():
+            self.configureWidget(self.notificationLabel, text=" ".join(getSpecialCardDescription(card).split()))
+            self.notificationLabel.pack(pady=(10, 0))
+        else:
+            # built the first time a special card comes up, then only reconfigured
+            if self.specialCardPopup is None:
+                self.specialCardPopup = SpecialCardPopup(self.master)
+            self.specialCardPopup.show(getSpecialCardDescription(card), self.getImage(card))
     
     def onHigherBtnClick(self):
-        nextCard: Card = self.game.deck.seeTopCard()
-
-        if self.game.isNextCardMj(nextCard):
-            self.showSpecialCardPopup(nextCard)
-        elif self.game.isNextCardRodman(nextCard):
-            self.showSpecialCardPopup(nextCard)
-
-        isPlayNextRound: bool = self.game.playRound(isUserInputHigher=True)
-
-        if isPlayNextRound:
-            self.updateUi()
-        else:
-            self.master.showFrame(self.master.endFrame)
+        self.playRound(isUserInputHigher=True)
             
     def onLowerBtnClick(self):
+        self.playRound(isUserInputHigher=False)
+
+    def playRound(self, isUserInputHigher: bool):
         nextCard: Card = self.game.deck.seeTopCard()
-        if self.game.isNextCardMj(nextCard):
-            self.showSpecialCardPopup(nextCard)
-        elif self.game.isNextCardRodman(nextCard):
-            self.showSpecialCardPopup(nextCard)
+        if self.game.isNextCardMj(nextCard) or self.game.isNextCardRodman(nextCard):
+            self.showSpecialCard(nextCard)
+        elif self.notificationLabel.winfo_manager():
+            # an inline notification stays up until the next normal card
+            self.notificationLabel.pack_forget()
 
-        isPlayNextRound: bool = self.game.playRound(isUserInputHigher=False)
+        # the widgets are updated by onGameChange while the round is played
+        isPlayNextRound: bool = self.game.playRound(isUserInputHigher)
+        self.numRounds += 1
 
         if isPlayNextRound:
-            self.updateUi()
+            self.updateHintLabel()
+            self.after_idle(self.prefetchUpcomingCards)
         else:
-            self.master.showFrame(self.master.endFrame)
+            self.master.showFrame(self.master.getFrame(EndFrame))
 
-    def updateUi(self):
-        self.currentCardLabel.configure(image=self.getImage(self.game.currentCard))
-        self.scoreLabel.configure(text=f"Score: {self.game.score}")
-        self.deckLabel.configure(image=self.getImage(self.master.game.deck.seeTopCard()) if self.master.menuFrame.isIsdpOn.get() else self.getBackOfCard())
+    def onGameChange(self, event: str, value: object):
+        getattr(self, self.widgetUpdaters[event])()
+
+    def configureWidget(self, widget: ctk.CTkBaseClass, **kwargs):
+        widget.configure(**kwargs)
+        self.numWidgetUpdates += 1
+
+    def updateScoreLabel(self):
+        self.configureWidget(self.scoreLabel, text=f"Score: {self.game.score}")
+
+    def updateCurrentCardLabel(self):
+        self.configureWidget(self.currentCardLabel, image=self.getImage(self.game.currentCard))
+
+    def updateDeckLabel(self, isRefresh: bool = False):
+        """
+        Shows the top card with True Sight, otherwise the back of the card which only needs setting when the frame is shown
+        """
+        topCard: Card = self.game.deck.seeTopCard()
+        if self.master.menuFrame.isIsdpOn.get() and topCard is not None:
+            self.configureWidget(self.deckLabel, image=self.getImage(topCard))
+        elif isRefresh:
+            self.configureWidget(self.deckLabel, image=self.getBackOfCard())
 
-        rodmanText = f"Available Rodman Cards: {self.master.game.currentRodmanCards}" if self.game.isBullsEdition else f"Available Rodman Cards: N/A"
-        self.rodmanCountLabel.configure(text=rodmanText)
+    def updateRodmanCountLabel(self):
+        rodmanText = f"Available Rodman Cards: {self.game.currentRodmanCards}" if self.game.isBullsEdition else f"Available Rodman Cards: N/A"
+        self.configureWidget(self.rodmanCountLabel, text=rodmanText)
 
+    def updateMjRoundLabel(self):
         mjText = f"Current MJ Round: {self.game.currentMjRound+1}/{len(GameConstant.MJ_WINNING_SEQUENCE.value)}" if self.game.isBullsEdition and self.game.isMjActivated else f"Current MJ Round: N/A"
-        self.mjRoundLabel.configure(text=mjText)
+        self.configureWidget(self.mjRoundLabel, text=mjText)
 
-        self.numCardsRemainingLabel.configure(text=f"Normal Cards Remaining: {self.game.getNumRemainingNormalCards()}")
+    def updateNumCardsRemainingLabel(self):
+        self.configureWidget(self.numCardsRemainingLabel, text=f"Normal Cards Remaining: {self.game.getNumRemainingNormalCards()}")
+
+    def updateHintLabel(self):
+        """
+        Shows the best guess for the next card while hints are on, hidden when they are off or the game has none (see HigherLowerGame.getBestGuess)
+        """
+        bestGuess = self.game.getBestGuess() if self.master.menuFrame.isHintOn.get() else None
+        if bestGuess is None:
+            if self.hintLabel.winfo_manager():
+                self.hintLabel.pack_forget()
+            return
+
+        self.configureWidget(self.hintLabel, text=f"Hint: {'Higher' if bestGuess else 'Lower'}")
+        if not self.hintLabel.winfo_manager():
+            self.hintLabel.pack(after=self.mjRoundLabel)
+
+    def updateUi(self):
+        """
+        Refreshes every widget, used when the frame is shown
+        """
+        self.updateScoreLabel()
+        self.updateCurrentCardLabel()
+        self.updateDeckLabel(isRefresh=True)
+        self.updateRodmanCountLabel()
+        self.updateMjRoundLabel()
+        self.updateNumCardsRemainingLabel()
+        self.updateHintLabel()
+
+        # the player is now deciding, so use that time to get the upcoming cards ready
+        self.after_idle(self.prefetchUpcomingCards)
+        self.after_idle(self.master.markStartup, "firstCard")
+
+    def getUiStats(self) -> dict:
+        """
+        Returns how many widget reconfigurations each round has needed so far
+        """
+        return {
+            "rounds": self.numRounds,
+            "widgetUpdates": self.numWidgetUpdates,
+            "widgetUpdatesPerRound": self.numWidgetUpdates / max(1, self.numRounds),
+        }
+
+    def prefetchUpcomingCards(self):
+        """
+        Decodes the images of the next few cards in the background, including special cards for the popup
+        """
+        upcomingCards: list[Card] = self.game.deck.seeCards(Settings.NUM_PREFETCH_CARDS.value)
+        self.master.imageCache.prefetch([card.getName() for card in upcomingCards], Settings.CARD_SIZE.value)
 
     def getImage(self, card: Card) -> ImageTk.PhotoImage:
         """
         Returns the corresponding resized image of a card
         """
-        scriptDir = os.path.dirname(os.path.abspath(__file__))
-        imagePath = os.path.join(scriptDir, "images", f"{card.getName()}.png")
-
-        originalImg = Image.open(imagePath)
-        resizedImg = originalImg.resize(Settings.CARD_SIZE.value)
-        newImg = ImageTk.PhotoImage(resizedImg)
-        return newImg
+        return self.master.imageCache.get(card.getName(), Settings.CARD_SIZE.value)
     
     def getBackOfCard(self) -> ImageTk.PhotoImage:
         """
         Returns the back image of a card
         """
-        scriptDir = os.path.dirname(os.path.abspath(__file__))
-        imagePath = os.path.join(scriptDir, "images", "back_of_card.png")
-        
-        originalImg = Image.open(imagePath)
-        resizedImg = originalImg.resize(Settings.CARD_SIZE.value)
-        newImg = ImageTk.PhotoImage(resizedImg)
-        return newImg
+        return self.master.imageCache.get("back_of_card", Settings.CARD_SIZE.value)
     
 class MenuFrame(ctk.CTkFrame):
     def __init__(self, master: HigherLowerApp):
@@ -279,12 +653,13 @@ class MenuFrame(ctk.CTkFrame):
                 1. You are given a card and you need to guess if the next card in the deck is higher or lower. Guessing wrongly will end the game.\n
                 2. The ascending order of card rank is: 2, 3, 4, 5, 6, 7, 8, 9, 10, J, Q, K, A.\n
                 3. If the card rank is the same, then game will compare by suit. The ascending order of suit is: diamonds, clubs, hearts, spades.\n
-                4. Enabling special edition will add {GameConstant.NUM_MJ_CARDS.value} MJ and {GameConstant.NUM_RODMAN_CARDS.value} Rodman cards into the deck.\n
+                4. Enabling special edition will add {GameConstant.NUM_MJ_CARDS.value} MJ and {GameConstant.NUM_RODMAN_CARDS.value} Rodman cards into each deck.\n
                 5. Drawing the MJ card activates a special round where you need to guess the next 8 cards in the following sequence: (W, W, W, L, L, W, W, W) 
                     where 'W' means you want to correctly guess it and 'L' means you want to 'wrongly' guess it. If succesful, win 10 bonus points.\n
                 6. Note that during the MJ Round, any rodman cards received during this special round will not count towards the win / loss sequence but will\n 
                     still be kept. As soon as your sequence does not match the prefined sequence, you will immediately exit the MJ round.\n
                 7. Drawing a Rodman card means that on the next card you get wrong, it will activate, giving you a 2nd chance to win double points!\n
+                8. When playing with more than 1 deck, drawing a card equal to your current card counts as a wrong guess.\n
             """, 
             justify="left", 
             wraplength=1200,
@@ -318,6 +693,36 @@ class MenuFrame(ctk.CTkFrame):
         )
         self.isIsdpCheckbox.grid(pady=10)
 
+        self.isInlineNotificationOn = ctk.BooleanVar(value=Settings.INLINE_SPECIAL_CARDS.value)
+        self.inlineNotificationCheckbox = ctk.CTkCheckBox(
+            self, 
+            text="Show special cards inline (instead of a popup)", 
+            variable=self.isInlineNotificationOn
+        )
+        self.inlineNotificationCheckbox.grid(pady=10)
+
+        self.isHintOn = ctk.BooleanVar(value=False)
+        self.hintCheckbox = ctk.CTkCheckBox(
+            self, 
+            text="Enable hints (best guess, single deck only)", 
+            variable=self.isHintOn
+        )
+        self.hintCheckbox.grid(pady=10)
+
+        self.numDecksLabel = ctk.CTkLabel(
+            self, 
+            text="Number of decks:", 
+        )
+        self.numDecksLabel.grid()
+
+        self.numDecks = ctk.StringVar(value=Settings.SHOE_SIZES.value[0])
+        self.numDecksMenu = ctk.CTkOptionMenu(
+            self, 
+            values=list(Settings.SHOE_SIZES.value), 
+            variable=self.numDecks
+        )
+        self.numDecksMenu.grid(pady=10)
+
         self.startBtn = ctk.CTkButton(
             self, 
             text="Start Game", 
@@ -326,10 +731,10 @@ class MenuFrame(ctk.CTkFrame):
         self.startBtn.grid(pady=20)
 
     def startGame(self):
-        self.game.configureSpecialEdition(self.isBullsEditionOn.get())
+        self.game.configureSpecialEdition(self.isBullsEditionOn.get(), numDecks=int(self.numDecks.get()))
         self.game.startGame()
         
-        self.master.showFrame(self.master.gameFrame)
+        self.master.showFrame(self.master.getFrame(GameFrame))
 
 class EndFrame(ctk.CTkFrame):
     def __init__(self, master: HigherLowerGame):
@@ -352,6 +757,14 @@ class EndFrame(ctk.CTkFrame):
         )
         self.scoreLabel.grid(pady=10)
 
+        self.leaderboardLabel = ctk.CTkLabel(
+            self, 
+            text=None, 
+            justify="left", 
+            font=("Arial", 14)
+        )
+        self.leaderboardLabel.grid(pady=10)
+
         self.closeBtn = ctk.CTkButton(
             self, 
             text="Close Game", 
@@ -368,3 +781,43 @@ class EndFrame(ctk.CTkFrame):
 
     def updateUi(self):
         self.scoreLabel.configure(text=f"Your Final Score: {self.game.score}")
+        self.leaderboardLabel.configure(text="Loading the leaderboard...")
+        self.updateLeaderboardLabel()
+
+    def updateLeaderboardLabel(self):
+        """
+        Shows the best scores of this edition once the final score has been written, checking again later until it has
+        """
+        if self.master.leaderboardTicket is None:
+            self.leaderboardLabel.configure(text=f"Your score could not be saved to the leaderboard ({self.master.leaderboardError})")
+            return
+
+        writer: "LeaderboardWriter" = self.master.leaderboardWriter
+        if not writer.isResolved(self.master.leaderboardTicket):
+            self.after(Settings.LEADERBOARD_POLL_MS.value, self.updateLeaderboardLabel)
+            return
+        if not writer.isWritten(self.master.leaderboardTicket):
+            self.leaderboardLabel.configure(text=f"Your score could not be saved to the leaderboard ({writer.error})")
+            return
+
+        leaderboard: "Leaderboard" = self.master.getLeaderboard()
+        isBullsEdition: bool = self.game.isBullsEdition
+        lines = [
+            f"Better than {leaderboard.getPercentileRank(self.game.score, isBullsEdition):.0%} of {leaderboard.getNumGames(isBullsEdition)} "
+            f"{'Special' if isBullsEdition else 'Normal'} Edition games",
+            "",
+            "Best Scores:",
+        ]
+        for rank, entry in enumerate(leaderboard.getTopScores(Settings.LEADERBOARD_SIZE.value, isBullsEdition), 1):
+            lines.append(f"{rank}. {entry.score} in {entry.numRounds} rounds{' (True Sight)' if entry.isTrueSightOn else ''}")
+        self.leaderboardLabel.configure(text="\n".join(lines))
+
+# the span of a click lasts until its changes have been redrawn, see instrumentation.wrap
+instrumentation.register(GameFrame, "onHigherBtnClick", "gui.click.higher", isUntilIdle=True)
+instrumentation.register(GameFrame, "onLowerBtnClick", "gui.click.lower", isUntilIdle=True)
+instrumentation.register(GameFrame, "updateUi", "gui.updateUi")
+instrumentation.register(GameFrame, "onGameChange", "gui.onGameChange")
+for methodName in ("updateScoreLabel", "updateCurrentCardLabel", "updateDeckLabel", "updateRodmanCountLabel", "updateMjRoundLabel", "updateNumCardsRemainingLabel"):
+    instrumentation.register(GameFrame, methodName, f"gui.{methodName}")
+instrumentation.register(GameFrame, "getImage", "gui.getImage")
+instrumentation.register(GameFrame, "getBackOfCard", "gui.getBackOfCard")
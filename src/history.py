@@ -0,0 +1,212 @@
+from .game import CARD_VALUES, CARDS, NUM_NORMAL_CARDS, Card, Deck, HigherLowerGame
+import random
+
+
+# A game is the deck's order (fixed once shuffled) plus the guesses made so far, so every state of it can be kept as a
+# cursor into the shared order and a handful of counters. Each guess adds one node pointing at the one before it, and
+# undo, redo and fork only ever move or share references, whatever the length of the game.
+
+class SharedDeck(Deck):
+    def __init__(self, isBullsEdition: bool, rng: random.Random = None, numDecks: int = 1):
+        """
+        A deck whose order is an immutable bytes object shared with every fork of its game, drawing only moves the cursor
+        """
+        # set by Deck.__init__ through the cardIds setter
+        self.order: bytes = b""
+        self.cursor: int = 0
+        super().__init__(isBullsEdition, rng, numDecks)
+
+    @classmethod
+    def fromOrder(cls, order: bytes, cursor: int, numDecks: int = 1) -> "SharedDeck":
+        """
+        Returns a deck sharing the given order, with the top cursor cards still to be drawn
+        """
+        deck = cls.fromCardIds(b"", numDecks)
+        deck.order = order
+        deck.cursor = cursor
+        return deck
+
+    @property
+    def cardIds(self) -> bytes:
+        """
+        The card ids left in the deck (top card last), a copy of the part of the order below the cursor
+        """
+        return self.order[:self.cursor]
+
+    @cardIds.setter
+    def cardIds(self, cardIds: bytes) -> None:
+        self.order = bytes(cardIds)
+        self.cursor = len(cardIds)
+
+    def __len__(self) -> int:
+        return self.cursor
+
+    def shuffle(self, rng: random.Random = None) -> None:
+        cardIds = bytearray(self.cardIds)
+        (rng if rng is not None else random).shuffle(cardIds)
+        self.cardIds = cardIds
+        self.valueIndex = None
+
+    def drawCard(self) -> Card:
+        if not self.cursor:
+            return None
+
+        self.cursor -= 1
+        cardId = self.order[self.cursor]
+        if cardId < NUM_NORMAL_CARDS and self.valueIndex is not None:
+            self.valueIndex.add(CARD_VALUES[cardId], -1)
+        return CARDS[cardId]
+
+    def seeTopCard(self) -> Card:
+        return CARDS[self.order[self.cursor - 1]] if self.cursor else None
+
+    def seeCards(self, numCards: int) -> list[Card]:
+        return [CARDS[self.order[i]] for i in range(self.cursor - 1, max(self.cursor - numCards, 0) - 1, -1)]
+
+    def moveCursor(self, cursor: int) -> None:
+        """
+        Puts the cursor back to where it was in an earlier (or later) state of the game, keeping the value index in step
+        """
+        if self.valueIndex is not None:
+            # a round draws one card, so undo and redo only ever put back or take out a single card here
+            if cursor > self.cursor:
+                cardIds, delta = self.order[self.cursor:cursor], 1
+            else:
+                cardIds, delta = self.order[cursor:self.cursor], -1
+
+            for cardId in cardIds:
+                if cardId < NUM_NORMAL_CARDS:
+                    self.valueIndex.add(CARD_VALUES[cardId], delta)
+        self.cursor = cursor
+
+class HistoryNode:
+    __slots__ = ("parent", "isUserInputHigher", "state", "isOver", "numRounds")
+
+    def __init__(self, parent: "HistoryNode", isUserInputHigher: bool, state: tuple, isOver: bool):
+        """
+        One event of a game (a guess) and the state it led to, nodes are never changed once made so any number of games can share them
+
+        :param parent: the node before this guess, None for the state right after startGame
+        :param state: see EventSourcedGame.getState
+        """
+        self.parent: HistoryNode = parent
+        self.isUserInputHigher: bool = isUserInputHigher
+        self.state: tuple = state
+        self.isOver: bool = isOver
+        self.numRounds: int = parent.numRounds + 1 if parent is not None else 0
+
+class EventSourcedGame(HigherLowerGame):
+    deckClass: type = SharedDeck
+
+    def __init__(self):
+        """
+        A HigherLowerGame that can undo and redo its rounds and be forked, all in constant time
+
+        :params node: the current state, the guesses leading to it are found by following the parents
+        :params redoNodes: the undone nodes as a linked list of (node, rest) pairs, dropped by the next new guess
+        :params isOver: whether the game ended in the current state
+        :params isGameOverReported: whether the game over listeners were already told about this game, they are told only once
+            even if the game over is undone and the game ends again (e.g. so GameStats and the leaderboard count it once)
+        """
+        super().__init__()
+        self.node: HistoryNode = None
+        self.redoNodes: tuple = None
+        self.isOver: bool = False
+        self.isGameOverReported: bool = False
+
+    def getState(self) -> tuple:
+        """
+        Returns everything a round can change, restored by setState
+        """
+        return (
+            self.deck.cursor, self.currentCard, self.normalCardsDrawned, self.currentRodmanCards, self.currentMjRound,
+            self.isMjActivated, self.isRodmanActivated, self.score, self.rodmanCardsUsed, self.mjRoundsEntered, self.mjRoundsWon,
+        )
+
+    def setState(self, node: HistoryNode) -> None:
+        previousState = self.getObservedState() if self.changeListeners else None
+
+        (cursor, self.currentCard, self.normalCardsDrawned, self.currentRodmanCards, self.currentMjRound, self.isMjActivated,
+         self.isRodmanActivated, self.score, self.rodmanCardsUsed, self.mjRoundsEntered, self.mjRoundsWon) = node.state
+        self.deck.moveCursor(cursor)
+        self.currentMjSequence = self.rules.mjSequences[self.currentMjRound]
+        self.isOver = node.isOver
+        self.node = node
+
+        if self.changeListeners:
+            self.notifyChanges(previousState)
+
+    def startGame(self) -> None:
+        super().startGame()
+        self.node = HistoryNode(None, None, self.getState(), False)
+        self.redoNodes = None
+        self.isOver = False
+        self.isGameOverReported = False
+
+    def endGame(self) -> bool:
+        if self.isGameOverReported:
+            return False
+        self.isGameOverReported = True
+        return super().endGame()
+
+    def playRound(self, isUserInputHigher: bool) -> bool:
+        isPlayNextRound = super().playRound(isUserInputHigher)
+        self.isOver = not isPlayNextRound
+        self.node = HistoryNode(self.node, isUserInputHigher, self.getState(), self.isOver)
+        self.redoNodes = None
+        return isPlayNextRound
+
+    def canUndo(self) -> bool:
+        return self.node is not None and self.node.parent is not None
+
+    def canRedo(self) -> bool:
+        return self.redoNodes is not None
+
+    def undo(self) -> None:
+        """
+        Takes back the last guess
+        """
+        if not self.canUndo():
+            raise IndexError("nothing to undo")
+
+        self.redoNodes = (self.node, self.redoNodes)
+        self.setState(self.node.parent)
+
+    def redo(self) -> None:
+        """
+        Makes the last undone guess again (any new guess drops the undone ones)
+        """
+        if not self.canRedo():
+            raise IndexError("nothing to redo")
+
+        node, self.redoNodes = self.redoNodes
+        self.setState(node)
+
+    def fork(self) -> "EventSourcedGame":
+        """
+        Returns a game in the same state, with the same history and redo stack, that plays on independently of this one
+
+        Only the current state is copied, the deck order and the history are shared. Listeners are not copied, whoever
+        forks a game attaches its own. A fork of a game that already reported its game over does not report it again.
+        """
+        game = EventSourcedGame()
+        game.rules = self.rules
+        game.isBullsEdition = self.isBullsEdition
+        game.isTieCorrect = self.isTieCorrect
+        game.deck = SharedDeck.fromOrder(self.deck.order, self.deck.cursor, self.deck.numDecks)
+        game.redoNodes = self.redoNodes
+        game.isGameOverReported = self.isGameOverReported
+        game.setState(self.node)
+        return game
+
+    def getGuesses(self) -> list[bool]:
+        """
+        Returns the guesses leading to the current state, oldest first (together with the deck order this is the whole game,
+        e.g. for GameLogWriter.append)
+        """
+        guesses = []
+        node = self.node
+        while node is not None and node.parent is not None:
+            guesses.append(node.isUserInputHigher)
+            node = node.parent
+        return guesses[::-1]
@@ -0,0 +1,151 @@
+from typing import Callable
+from .game import Deck, HigherLowerGame
+import functools
+import json
+import time
+
+
+# Spans are timed by wrapping the registered methods when instrumentation is enabled, and the original methods are put
+# back when it is disabled, so a disabled build runs exactly the same code as one without instrumentation.
+
+# latencies are bucketed by the bit length of their nanoseconds, bucket b holds [2**(b-1), 2**b) ns, up to ~4.6 minutes
+NUM_BUCKETS = 49
+
+class SpanStats:
+    __slots__ = ("count", "totalNs", "maxNs", "buckets")
+
+    def __init__(self):
+        """
+        Latency histogram of one span, in constant memory
+        """
+        self.count: int = 0
+        self.totalNs: int = 0
+        self.maxNs: int = 0
+        self.buckets: list[int] = [0] * NUM_BUCKETS
+
+    def record(self, elapsedNs: int) -> None:
+        self.count += 1
+        self.totalNs += elapsedNs
+        if elapsedNs > self.maxNs:
+            self.maxNs = elapsedNs
+        self.buckets[min(elapsedNs.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def getQuantileUs(self, q: float) -> float:
+        """
+        Returns the upper edge of the bucket holding the q quantile (so within 2x of the true value)
+        """
+        target = max(1, q * self.count)
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(2 ** bucket, self.maxNs) / 1000
+        return self.maxNs / 1000
+
+    def getSummary(self) -> dict:
+        return {
+            "count": self.count,
+            "totalMs": self.totalNs / 1e6,
+            "meanUs": self.totalNs / max(1, self.count) / 1000,
+            "p50Us": self.getQuantileUs(0.5),
+            "p90Us": self.getQuantileUs(0.9),
+            "p99Us": self.getQuantileUs(0.99),
+            "maxUs": self.maxNs / 1000,
+        }
+
+# (owner, method name, span name, whether the span lasts until the Tk event loop is next idle)
+targets: list[tuple[type, str, str, bool]] = []
+originals: dict[tuple[type, str], Callable] = {}
+spans: dict[str, SpanStats] = {}
+# name -> callable returning a dict of counters, read when dumping
+counterProviders: dict[str, Callable[[], dict]] = {}
+isEnabled: bool = False
+
+def getSpan(name: str) -> SpanStats:
+    if name not in spans:
+        spans[name] = SpanStats()
+    return spans[name]
+
+def wrap(method: Callable, spanName: str, isUntilIdle: bool) -> Callable:
+    span = getSpan(spanName)
+
+    if isUntilIdle:
+        # for Tk callbacks: the span ends once the event loop is idle again, i.e. after the widgets changed by the callback have been redrawn
+        idleSpan = getSpan(f"{spanName}.toRender")
+
+        @functools.wraps(method)
+        def timedUntilIdle(self, *args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                span.record(time.perf_counter_ns() - start)
+                self.after_idle(lambda: idleSpan.record(time.perf_counter_ns() - start))
+        return timedUntilIdle
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            span.record(time.perf_counter_ns() - start)
+    return timed
+
+def patch(owner: type, methodName: str, spanName: str, isUntilIdle: bool) -> None:
+    originals[(owner, methodName)] = owner.__dict__[methodName]
+    setattr(owner, methodName, wrap(owner.__dict__[methodName], spanName, isUntilIdle))
+
+def register(owner: type, methodName: str, spanName: str, isUntilIdle: bool = False) -> None:
+    """
+    Registers a method to be timed as a span whenever instrumentation is enabled (it is wrapped straight away if it already is)
+    """
+    targets.append((owner, methodName, spanName, isUntilIdle))
+    if isEnabled:
+        patch(owner, methodName, spanName, isUntilIdle)
+
+def registerCounters(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Registers a callable whose counters are included in dump (it is only called when dumping)
+    """
+    counterProviders[name] = provider
+
+def enable() -> None:
+    global isEnabled
+    if isEnabled:
+        return
+
+    for owner, methodName, spanName, isUntilIdle in targets:
+        patch(owner, methodName, spanName, isUntilIdle)
+    isEnabled = True
+
+def disable() -> None:
+    """
+    Puts back the original methods, the spans recorded so far are kept
+    """
+    global isEnabled
+    for (owner, methodName), method in originals.items():
+        setattr(owner, methodName, method)
+    originals.clear()
+    isEnabled = False
+
+def reset() -> None:
+    for span in spans.values():
+        span.__init__()
+
+def dump(path: str = None) -> dict:
+    """
+    Returns every span's latency summary and the registered counters, also writing them to path as JSON if given
+    """
+    report = {
+        "enabled": isEnabled,
+        "spans": {name: span.getSummary() for name, span in sorted(spans.items()) if span.count},
+        "counters": {name: provider() for name, provider in counterProviders.items()},
+    }
+    if path is not None:
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+    return report
+
+register(HigherLowerGame, "playRound", "game.playRound")
+register(Deck, "__init__", "deck.construct")
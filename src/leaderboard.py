@@ -0,0 +1,238 @@
+from .game import HigherLowerGame, getDeckSize
+from typing import NamedTuple, Optional
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+
+
+# One SQLite database in WAL mode shared by every GUI and headless runner on the machine: readers never wait for writers,
+# and each process writes through its own LeaderboardWriter thread, which commits whatever has queued up as one transaction.
+# scoreCounts is kept up to date by a trigger, so percentiles only read one row per distinct score however many games there are.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    isBullsEdition INTEGER NOT NULL,
+    isTrueSightOn INTEGER NOT NULL,
+    numRounds INTEGER NOT NULL,
+    numDecks INTEGER NOT NULL,
+    playedAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scoresByEdition ON scores (isBullsEdition, score);
+CREATE INDEX IF NOT EXISTS scoresByScore ON scores (score);
+
+CREATE TABLE IF NOT EXISTS scoreCounts (
+    isBullsEdition INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (isBullsEdition, score)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS countScore AFTER INSERT ON scores BEGIN
+    INSERT INTO scoreCounts VALUES (new.isBullsEdition, new.score, 1)
+    ON CONFLICT (isBullsEdition, score) DO UPDATE SET count = count + 1;
+END;
+"""
+
+INSERT_SCORE = "INSERT INTO scores (score, isBullsEdition, isTrueSightOn, numRounds, numDecks, playedAt) VALUES (?, ?, ?, ?, ?, ?)"
+
+# how long a connection waits for another process's write transaction before giving up
+BUSY_TIMEOUT = 30.0
+
+class LeaderboardEntry(NamedTuple):
+    score: int
+    isBullsEdition: bool
+    isTrueSightOn: bool
+    numRounds: int
+    numDecks: int
+    playedAt: float
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Opens the leaderboard at path (creating it if needed), in autocommit mode so transactions are only ever explicit
+    """
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # with WAL a commit is still atomic and durable across a crash of the process, only a power cut can lose the last ones
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+def getNumRounds(game: HigherLowerGame) -> int:
+    """
+    Returns the number of rounds played in a game, every card drawn after the first one
+    """
+    return getDeckSize(game.isBullsEdition, game.deck.numDecks) - len(game.deck) - 1
+
+class LeaderboardWriter:
+    def __init__(self, path: str, batchSize: int = 1024):
+        """
+        Writes scores to the leaderboard from a background thread, so recording a score never waits on the disk
+
+        :param batchSize: most scores committed in one transaction, everything queued up to this many is written together
+        """
+        self.path: str = path
+        self.batchSize: int = batchSize
+        self.queue: queue.Queue = queue.Queue()
+        # scores recorded (only counted on the recording thread), and scores the writer thread has dealt with, whether committed or not
+        self.numRecorded: int = 0
+        self.numResolved: int = 0
+        # (first ticket, last ticket) of every batch that could not be written, and the error it failed with
+        self.failedTickets: list[tuple[int, int]] = []
+        self.error: sqlite3.Error = None
+
+        self.thread = threading.Thread(target=self.run, name="leaderboard-writer", daemon=True)
+        self.thread.start()
+
+    def record(self, score: int, isBullsEdition: bool, isTrueSightOn: bool, numRounds: int, numDecks: int = 1) -> int:
+        """
+        Queues a score to be written, returns its ticket (see isWritten)
+        """
+        self.queue.put((score, int(isBullsEdition), int(isTrueSightOn), numRounds, numDecks, time.time()))
+        self.numRecorded += 1
+        return self.numRecorded
+
+    def recordGame(self, game: HigherLowerGame, isTrueSightOn: bool = False) -> int:
+        return self.record(game.score, game.isBullsEdition, isTrueSightOn, getNumRounds(game), game.deck.numDecks)
+
+    def isResolved(self, ticket: int) -> bool:
+        """
+        Whether the writer is done with the score with the given ticket, either committed or failed (scores are dealt with in the order they were recorded)
+        """
+        return self.numResolved >= ticket
+
+    def isWritten(self, ticket: int) -> bool:
+        """
+        Whether the score with the given ticket has been committed
+        """
+        return self.isResolved(ticket) and not any(first <= ticket <= last for first, last in self.failedTickets)
+
+    def writeBatch(self, connection: sqlite3.Connection, batch: list[tuple]) -> None:
+        try:
+            if connection is None:
+                raise self.error
+            # IMMEDIATE takes the write lock up front, so concurrent writers queue on the busy timeout instead of deadlocking
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(INSERT_SCORE, batch)
+            connection.execute("COMMIT")
+        except sqlite3.Error as error:
+            # the batch is dropped but the writer carries on, so the scores recorded after it still get their chance
+            self.error = error
+            if connection is not None and connection.in_transaction:
+                try:
+                    connection.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            self.failedTickets.append((self.numResolved + 1, self.numResolved + len(batch)))
+
+        self.numResolved += len(batch)
+
+    def run(self) -> None:
+        try:
+            connection = connect(self.path)
+        except sqlite3.Error as error:
+            # every batch fails with this error, rather than the recorded scores waiting forever
+            connection = None
+            self.error = error
+        isClosing = False
+
+        while not isClosing:
+            # wait for one score, then take whatever else queued up while the last batch was being committed
+            batch = [self.queue.get()]
+            while len(batch) < self.batchSize:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                isClosing = True
+                batch = [row for row in batch if row is not None]
+
+            if batch:
+                self.writeBatch(connection, batch)
+
+        if connection is not None:
+            connection.close()
+
+    def close(self) -> None:
+        """
+        Writes everything still queued and stops the thread
+        """
+        self.queue.put(None)
+        self.thread.join()
+
+    def __enter__(self) -> "LeaderboardWriter":
+        return self
+
+    def __exit__(self, *excInfo) -> None:
+        self.close()
+
+class Leaderboard:
+    def __init__(self, path: str):
+        """
+        Read side of the leaderboard, every query is answered from an index or the score counts
+        """
+        self.connection: sqlite3.Connection = connect(path)
+
+    def getTopScores(self, n: int, isBullsEdition: bool = None) -> list[LeaderboardEntry]:
+        """
+        Returns the n best scores, of one edition or of both if isBullsEdition is None
+        """
+        columns = "score, isBullsEdition, isTrueSightOn, numRounds, numDecks, playedAt"
+        if isBullsEdition is None:
+            rows = self.connection.execute(f"SELECT {columns} FROM scores ORDER BY score DESC LIMIT ?", (n,))
+        else:
+            rows = self.connection.execute(f"SELECT {columns} FROM scores WHERE isBullsEdition = ? ORDER BY score DESC LIMIT ?", (int(isBullsEdition), n))
+        return [LeaderboardEntry(score, bool(isBulls), bool(isTrueSightOn), numRounds, numDecks, playedAt) for score, isBulls, isTrueSightOn, numRounds, numDecks, playedAt in rows]
+
+    def getScoreCounts(self, isBullsEdition: bool) -> list[tuple[int, int]]:
+        """
+        Returns (score, number of games) for every score reached in the edition, lowest first
+        """
+        return self.connection.execute("SELECT score, count FROM scoreCounts WHERE isBullsEdition = ? ORDER BY score", (int(isBullsEdition),)).fetchall()
+
+    def getNumGames(self, isBullsEdition: bool) -> int:
+        return sum(count for _, count in self.getScoreCounts(isBullsEdition))
+
+    def getQuantile(self, q: float, isBullsEdition: bool) -> Optional[int]:
+        """
+        Returns the smallest score that at least a q fraction of the edition's games scored at most (as GameStats.getQuantile does)
+        """
+        scoreCounts = self.getScoreCounts(isBullsEdition)
+        if not scoreCounts:
+            return None
+
+        target = max(1, q * sum(count for _, count in scoreCounts))
+        seen = 0
+        for score, count in scoreCounts:
+            seen += count
+            if seen >= target:
+                return score
+        return scoreCounts[-1][0]
+
+    def getPercentileRank(self, score: int, isBullsEdition: bool) -> float:
+        """
+        Returns the fraction of the edition's games that scored less than score
+        """
+        scoreCounts = self.getScoreCounts(isBullsEdition)
+        numGames = sum(count for _, count in scoreCounts)
+        return sum(count for otherScore, count in scoreCounts if otherScore < score) / numGames if numGames else 0.0
+
+    def close(self) -> None:
+        self.connection.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shows the best scores and score percentiles in a leaderboard database")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    leaderboard = Leaderboard(args.path)
+    for isBullsEdition in (False, True):
+        print(f"{'Bulls' if isBullsEdition else 'Normal'} edition, {leaderboard.getNumGames(isBullsEdition)} games, "
+              f"median {leaderboard.getQuantile(0.5, isBullsEdition)}, p99 {leaderboard.getQuantile(0.99, isBullsEdition)}")
+        for rank, entry in enumerate(leaderboard.getTopScores(args.top, isBullsEdition), 1):
+            print(f"{rank:3}. {entry.score:4}  {entry.numRounds:3} rounds  {entry.numDecks} deck(s){'  True Sight' if entry.isTrueSightOn else ''}  "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.playedAt))}")
@@ -0,0 +1,218 @@
+from .game import Constant, HigherLowerGame
+from .session import SessionStore
+from typing import Optional
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import time
+
+
+# Protocol: one JSON object per line in each direction over a plain TCP connection, requests are answered in order.
+#   {"op": "start", "bulls": true, "decks": 1, "seed": 123}  -> {"ok": true, "session": "...", "state": {...}}
+#   {"op": "guess", "session": "...", "higher": true}         -> {"ok": true, "continue": true, "state": {...}}
+#   {"op": "state", "session": "..."}                         -> {"ok": true, "state": {...}}
+# Failures are answered with {"ok": false, "error": "..."}. Fields must have their JSON type ("higher": "false" is an
+# error, not a guess), and a line longer than LINE_LIMIT is answered with an error and skipped.
+
+LINE_LIMIT = 64 * 1024
+
+class ServerError(Exception):
+    pass
+
+def getField(request: dict, key: str, fieldType: type, default: object = None) -> object:
+    """
+    Returns request[key] (or default if it is missing), raising a ServerError unless it is of the given JSON type
+    """
+    value = request.get(key, default)
+    # a JSON true is a Python bool, which is also an int, but never a number of decks or a seed
+    if value is not default and (not isinstance(value, fieldType) or (fieldType is int and isinstance(value, bool))):
+        raise ServerError(f"{key} must be a JSON {JSON_TYPE_NAMES[fieldType]}")
+    return value
+
+JSON_TYPE_NAMES: dict[type, str] = {bool: "boolean", int: "integer", str: "string"}
+
+class Session:
+    # a server can hold a very large number of these, so they carry no per-instance dict
+    __slots__ = ("game", "isOver", "lastUsed")
+
+    def __init__(self, game: Optional[HigherLowerGame]):
+        # None when the server's SessionStore holds the game
+        self.game: Optional[HigherLowerGame] = game
+        self.isOver: bool = False
+        self.lastUsed: float = time.monotonic()
+
+def encodeResponse(response: dict) -> bytes:
+    return json.dumps(response, separators=(",", ":")).encode() + b"\n"
+
+# returned by readRequest in place of a line that was longer than the stream's limit
+TOO_LONG = b"\0"
+
+async def readRequest(reader: asyncio.StreamReader) -> bytes:
+    """
+    Returns the next line, b"" once the client is done, or TOO_LONG (after skipping to its end) for a line over the stream's limit
+    """
+    isTooLong = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+            return TOO_LONG if isTooLong else line
+        except asyncio.LimitOverrunError as error:
+            # unlike readline, readuntil leaves the data in the buffer, so drop what was read of the line and look for its end
+            await reader.readexactly(error.consumed)
+            isTooLong = True
+        except asyncio.IncompleteReadError as error:
+            # the client closed the connection, a last line without a newline is still a request
+            return TOO_LONG if isTooLong else error.partial
+
+class GameServer:
+    def __init__(self, idleTimeout: float = 600, maxDecks: int = 8, maxHotBytes: int = None):
+        """
+        Initialises a server holding many HigherLowerGame sessions
+
+        :param idleTimeout: seconds without a request after which a session is dropped
+        :param maxDecks: largest shoe a client is allowed to ask for
+        :param maxHotBytes: if given, the games are kept in a SessionStore with this memory budget, which spills the least
+        recently used ones to disk, otherwise every game stays in memory
+        """
+        self.idleTimeout: float = idleTimeout
+        self.maxDecks: int = maxDecks
+        self.sessions: dict[str, Session] = {}
+        self.store: Optional[SessionStore] = SessionStore(maxHotBytes) if maxHotBytes is not None else None
+
+    def getGame(self, sessionId: str, session: Session) -> HigherLowerGame:
+        # SessionStore.get brings a spilled game back into memory
+        return session.game if self.store is None else self.store.get(sessionId)
+
+    def getState(self, session: Session, game: HigherLowerGame) -> dict:
+        return {
+            "score": game.score,
+            "currentCard": game.currentCard.getName(),
+            "normalCardsRemaining": game.getNumRemainingNormalCards(),
+            "rodmanCards": game.currentRodmanCards if game.isBullsEdition else None,
+            "mjRound": game.currentMjRound + 1 if game.isMjActivated else None,
+            "mjRounds": len(Constant.MJ_WINNING_SEQUENCE.value),
+            "isOver": session.isOver,
+        }
+
+    def getSession(self, request: dict) -> tuple[Session, HigherLowerGame]:
+        sessionId = getField(request, "session", str)
+        session = self.sessions.get(sessionId)
+        if session is None:
+            raise ServerError("unknown or expired session")
+
+        session.lastUsed = time.monotonic()
+        return session, self.getGame(sessionId, session)
+
+    def startSession(self, request: dict) -> dict:
+        """
+        Maps onto configureSpecialEdition and startGame
+        """
+        numDecks = getField(request, "decks", int, 1)
+        if not 1 <= numDecks <= self.maxDecks:
+            raise ServerError(f"decks must be between 1 and {self.maxDecks}")
+
+        seed = getField(request, "seed", int)
+        game = HigherLowerGame()
+        game.configureSpecialEdition(getField(request, "bulls", bool, False), random.Random(seed) if seed is not None else None, numDecks)
+        game.startGame()
+
+        sessionId = secrets.token_urlsafe(12)
+        if self.store is None:
+            session = Session(game)
+        else:
+            session = Session(None)
+            self.store.put(sessionId, game)
+        self.sessions[sessionId] = session
+        return {"ok": True, "session": sessionId, "state": self.getState(session, game)}
+
+    def guess(self, request: dict) -> dict:
+        """
+        Maps onto playRound
+        """
+        session, game = self.getSession(request)
+        if session.isOver:
+            raise ServerError("game is over")
+
+        isUserInputHigher = getField(request, "higher", bool)
+        if isUserInputHigher is None:
+            raise ServerError("higher is missing")
+
+        isPlayNextRound = game.playRound(isUserInputHigher)
+        session.isOver = not isPlayNextRound
+        return {"ok": True, "continue": isPlayNextRound, "state": self.getState(session, game)}
+
+    def handleRequest(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "start":
+            return self.startSession(request)
+        elif op == "guess":
+            return self.guess(request)
+        elif op == "state":
+            return {"ok": True, "state": self.getState(*self.getSession(request))}
+        else:
+            raise ServerError(f"unknown op {op!r}")
+
+    def handleLine(self, line: bytes) -> bytes:
+        try:
+            # ValueError covers both malformed JSON and bytes that are not UTF-8
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ServerError("request must be a JSON object")
+            response = self.handleRequest(request)
+        except (ServerError, ValueError) as error:
+            response = {"ok": False, "error": str(error)}
+
+        return encodeResponse(response)
+
+    async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await readRequest(reader):
+                writer.write(self.handleLine(line) if line is not TOO_LONG else encodeResponse({"ok": False, "error": f"request longer than {LINE_LIMIT} bytes"}))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def expireIdleSessions(self) -> int:
+        """
+        Drops every session that has not been used within the idle timeout, returns how many were dropped
+        """
+        cutoff = time.monotonic() - self.idleTimeout
+        expired = [sessionId for sessionId, session in self.sessions.items() if session.lastUsed < cutoff]
+        for sessionId in expired:
+            del self.sessions[sessionId]
+            if self.store is not None:
+                self.store.delete(sessionId)
+        return len(expired)
+
+    async def expireIdleSessionsForever(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self.idleTimeout / 10))
+            self.expireIdleSessions()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handleConnection, host, port, limit=LINE_LIMIT)
+        expiryTask = asyncio.create_task(self.expireIdleSessionsForever())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiryTask.cancel()
+            if self.store is not None:
+                self.store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hosts many Higher Lower games over a line delimited JSON protocol")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--idle-timeout", type=float, default=600, help="seconds before an idle session is dropped")
+    parser.add_argument("--max-hot-bytes", type=int, default=None, help="memory budget for the games, the least recently used are spilled to disk past it (default: keep every game in memory)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(GameServer(args.idle_timeout, maxHotBytes=args.max_hot_bytes).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+from .game import CARDS, DEFAULT_RULES, Constant, Deck, HigherLowerGame, getDeckSize
+import mmap
+import os
+import struct
+import tempfile
+
+
+# flags, numDecks, currentCard id, currentMjRound, normalCardsDrawned, currentRodmanCards, score, number of cards left in the deck,
+# rodmanCardsUsed, mjRoundsEntered, mjRoundsWon, followed by the deck's card ids (top card last), padded to the full deck size so
+# every game of the same edition and shoe size packs into the same record size. Game over listeners are not packed, whoever
+# restores a game attaches its own. Neither are the rules, only games played by DEFAULT_RULES can be packed.
+HEADER = struct.Struct("<BBBBHHiHHHH")
+NO_CARD = 0xFF
+
+IS_BULLS_EDITION = 1
+IS_TIE_CORRECT = 2
+IS_MJ_ACTIVATED = 4
+IS_RODMAN_ACTIVATED = 8
+
+# what a hot game costs in memory besides its deck bytes (measured with benchmarks/memory.py), used to keep to the byte budget
+HOT_GAME_BYTES = 600
+
+def getRecordSize(isBullsEdition: bool, numDecks: int) -> int:
+    return HEADER.size + getDeckSize(isBullsEdition, numDecks)
+
+def packGame(game: HigherLowerGame) -> bytes:
+    """
+    Packs the full state of a game into a fixed size binary record, raising a ValueError for a game with custom rules
+    """
+    if game.rules is not DEFAULT_RULES:
+        raise ValueError("only games played by DEFAULT_RULES can be packed, unpackGame would restore them with the default rules")
+
+    flags = (
+        (IS_BULLS_EDITION if game.isBullsEdition else 0)
+        | (IS_TIE_CORRECT if game.isTieCorrect else 0)
+        | (IS_MJ_ACTIVATED if game.isMjActivated else 0)
+        | (IS_RODMAN_ACTIVATED if game.isRodmanActivated else 0)
+    )
+    deck = game.deck
+    header = HEADER.pack(
+        flags,
+        deck.numDecks,
+        game.currentCard.id if game.currentCard is not None else NO_CARD,
+        game.currentMjRound,
+        game.normalCardsDrawned,
+        game.currentRodmanCards,
+        game.score,
+        len(deck.cardIds),
+        game.rodmanCardsUsed,
+        game.mjRoundsEntered,
+        game.mjRoundsWon,
+    )
+    padding = bytes(getDeckSize(game.isBullsEdition, deck.numDecks) - len(deck.cardIds))
+    return header + deck.cardIds + padding
+
+def unpackGame(record: bytes) -> HigherLowerGame:
+    """
+    Restores a game packed by packGame, the restored game plays on exactly like the original would have
+    """
+    (flags, numDecks, currentCardId, currentMjRound, normalCardsDrawned, currentRodmanCards, score, numCardsLeft,
+     rodmanCardsUsed, mjRoundsEntered, mjRoundsWon) = HEADER.unpack_from(record)
+
+    game = HigherLowerGame()
+    game.isBullsEdition = bool(flags & IS_BULLS_EDITION)
+    game.isTieCorrect = bool(flags & IS_TIE_CORRECT)
+    game.isMjActivated = bool(flags & IS_MJ_ACTIVATED)
+    game.isRodmanActivated = bool(flags & IS_RODMAN_ACTIVATED)
+    game.deck = Deck.fromCardIds(record[HEADER.size:HEADER.size + numCardsLeft], numDecks)
+    game.currentCard = CARDS[currentCardId] if currentCardId != NO_CARD else None
+    game.normalCardsDrawned = normalCardsDrawned
+    game.currentRodmanCards = currentRodmanCards
+    game.currentMjRound = currentMjRound
+    # the sequence so far is always the start of the winning sequence, one entry per MJ round won
+    game.currentMjSequence = Constant.MJ_WINNING_SEQUENCE.value[:currentMjRound]
+    game.score = score
+    game.rodmanCardsUsed = rodmanCardsUsed
+    game.mjRoundsEntered = mjRoundsEntered
+    game.mjRoundsWon = mjRoundsWon
+    return game
+
+class SlotFile:
+    def __init__(self, path: str, slotSize: int, initialSlots: int = 1024):
+        """
+        Initialises an mmap backed file of fixed size slots, growing by doubling whenever it runs out of free slots
+        """
+        self.path: str = path
+        self.slotSize: int = slotSize
+        self.numSlots: int = initialSlots
+        self.freeSlots: list[int] = list(range(initialSlots - 1, -1, -1))
+
+        self.file = open(path, "w+b")
+        self.file.truncate(self.numSlots * self.slotSize)
+        self.map = mmap.mmap(self.file.fileno(), self.numSlots * self.slotSize)
+
+    def grow(self) -> None:
+        self.map.close()
+        self.freeSlots.extend(range(self.numSlots * 2 - 1, self.numSlots - 1, -1))
+        self.numSlots *= 2
+        self.file.truncate(self.numSlots * self.slotSize)
+        self.map = mmap.mmap(self.file.fileno(), self.numSlots * self.slotSize)
+
+    def write(self, record: bytes) -> int:
+        """
+        Stores a record in a free slot, returning the slot
+        """
+        if not self.freeSlots:
+            self.grow()
+
+        slot = self.freeSlots.pop()
+        self.map[slot * self.slotSize:(slot + 1) * self.slotSize] = record
+        return slot
+
+    def read(self, slot: int) -> bytes:
+        """
+        Returns the record in the slot, and frees the slot
+        """
+        record = self.map[slot * self.slotSize:(slot + 1) * self.slotSize]
+        self.freeSlots.append(slot)
+        return record
+
+    def free(self, slot: int) -> None:
+        self.freeSlots.append(slot)
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+        os.remove(self.path)
+
+class SessionStore:
+    def __init__(self, maxHotBytes: int, spillDir: str = None):
+        """
+        Initialises a store of games, keeping the most recently used ones in memory and spilling the rest to disk
+
+        :param maxHotBytes: memory budget for the games held in memory, the least recently used are packed to disk past it
+        :param spillDir: directory for the spill files (defaults to a new temporary directory)
+        """
+        self.maxHotBytes: int = maxHotBytes
+        self.hotBytes: int = 0
+        self.hot: OrderedDict[str, HigherLowerGame] = OrderedDict()
+        # what each game in memory was charged when it was put, its deck shrinks as it is played so it has to be given back as charged
+        self.hotGameBytes: dict[str, int] = {}
+
+        self.isTempSpillDir: bool = spillDir is None
+        self.spillDir: str = spillDir or tempfile.mkdtemp(prefix="higher-lower-sessions-")
+        # one slot file per record size (edition and shoe size), so every record fills its slot exactly
+        self.slotFiles: dict[int, SlotFile] = {}
+        self.cold: dict[str, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.hot) + len(self.cold)
+
+    def __contains__(self, sessionId: str) -> bool:
+        return sessionId in self.hot or sessionId in self.cold
+
+    def getGameBytes(self, game: HigherLowerGame) -> int:
+        return HOT_GAME_BYTES + len(game.deck.cardIds)
+
+    def put(self, sessionId: str, game: HigherLowerGame) -> None:
+        # checked here rather than when the game is evicted, which could be during any later put
+        if game.rules is not DEFAULT_RULES:
+            raise ValueError("only games played by DEFAULT_RULES can be stored, they are packed when evicted")
+
+        self.delete(sessionId)
+        self.hot[sessionId] = game
+        self.hotGameBytes[sessionId] = self.getGameBytes(game)
+        self.hotBytes += self.hotGameBytes[sessionId]
+        self.evict()
+
+    def get(self, sessionId: str) -> HigherLowerGame:
+        """
+        Returns the game, bringing it back into memory if it was spilled (None if there is no such session)
+        """
+        game = self.hot.get(sessionId)
+        if game is not None:
+            self.hot.move_to_end(sessionId)
+            return game
+
+        if sessionId not in self.cold:
+            return None
+
+        recordSize, slot = self.cold.pop(sessionId)
+        game = unpackGame(self.slotFiles[recordSize].read(slot))
+        self.put(sessionId, game)
+        return game
+
+    def delete(self, sessionId: str) -> None:
+        game = self.hot.pop(sessionId, None)
+        if game is not None:
+            self.hotBytes -= self.hotGameBytes.pop(sessionId)
+        elif sessionId in self.cold:
+            recordSize, slot = self.cold.pop(sessionId)
+            self.slotFiles[recordSize].free(slot)
+
+    def evict(self) -> None:
+        """
+        Packs the least recently used games to disk until the games in memory fit the budget
+        """
+        while self.hotBytes > self.maxHotBytes and len(self.hot) > 1:
+            sessionId, game = self.hot.popitem(last=False)
+            self.hotBytes -= self.hotGameBytes.pop(sessionId)
+
+            record = packGame(game)
+            if len(record) not in self.slotFiles:
+                self.slotFiles[len(record)] = SlotFile(os.path.join(self.spillDir, f"sessions_{len(record)}.bin"), len(record))
+            self.cold[sessionId] = (len(record), self.slotFiles[len(record)].write(record))
+
+    def close(self) -> None:
+        for slotFile in self.slotFiles.values():
+            slotFile.close()
+        self.slotFiles.clear()
+        self.cold.clear()
+
+        if self.isTempSpillDir:
+            os.rmdir(self.spillDir)
@@ -0,0 +1,117 @@
+import numpy as np
+from .game import CARDS, Constant, Deck, NUM_NORMAL_CARDS, Rank
+
+
+# Normal cards keep their card id, which already puts them in ascending value order, so comparing codes is the same as
+# comparing Card.value. Special cards only need to be told apart by kind, and sit above every normal card.
+MJ_CODE = NUM_NORMAL_CARDS
+RODMAN_CODE = NUM_NORMAL_CARDS + 1
+
+MJ_WINNING_SEQUENCE = np.array(Constant.MJ_WINNING_SEQUENCE.value, dtype=bool)
+
+# card id -> simulator code
+CARD_CODES = np.array([
+    MJ_CODE if card.rank == Rank.MJ else RODMAN_CODE if card.rank == Rank.RODMAN else card.id
+    for card in CARDS
+], dtype=np.int8)
+
+def encodeDeck(deck: Deck) -> np.ndarray:
+    """
+    Returns the deck as an array of card codes in the order they will be drawn (top card first)
+    """
+    return CARD_CODES[np.frombuffer(bytes(deck.cardIds), dtype=np.uint8)[::-1]]
+
+def generateDecks(numGames: int, isBullsEdition: bool, rng: np.random.Generator) -> np.ndarray:
+    """
+    Returns a (numGames, deck size) array of shuffled decks in draw order, following the same rules as Deck
+
+    :param rng: the numpy random generator used for every shuffle
+    """
+    cards = np.arange(NUM_NORMAL_CARDS, dtype=np.int8)
+    if isBullsEdition:
+        cards = np.concatenate((cards, np.full(Constant.NUM_RODMAN_CARDS.value, RODMAN_CODE, dtype=np.int8)))
+
+    decks = np.tile(cards, (numGames, 1))
+    rows = np.arange(numGames)[:, None]
+
+    if isBullsEdition:
+        # Deck reshuffles until the top card is normal, which is the same as drawing the top card uniformly from the normal
+        # cards and then shuffling everything else below it
+        topIdx = rng.integers(0, NUM_NORMAL_CARDS, size=numGames)
+        decks[np.arange(numGames), topIdx] = decks[:, 0]
+        decks[:, 0] = topIdx
+        order = np.argsort(rng.random((numGames, decks.shape[1] - 1)), axis=1) + 1
+        decks[:, 1:] = decks[rows, order]
+
+        # MJ cards go into their predefined (draw order) positions, np.insert takes positions in the array before insertion
+        mjLocations = sorted(Constant.MJ_LOCATIONS.value)
+        decks = np.insert(decks, [loc - i for i, loc in enumerate(mjLocations)], MJ_CODE, axis=1)
+    else:
+        decks = decks[rows, np.argsort(rng.random(decks.shape), axis=1)]
+
+    return decks
+
+def simulateGames(decks: np.ndarray, guesses: np.ndarray, isBullsEdition: bool) -> np.ndarray:
+    """
+    Plays every deck to the end at once, applying the same rules as HigherLowerGame.playRound, and returns the final scores
+
+    :param decks: (numGames, deck size) card codes in draw order, from generateDecks or encodeDeck
+    :param guesses: (numGames, deck size - 1) booleans, guesses[i, j] is the isUserInputHigher given to the jth playRound of the ith game
+    """
+    numGames, deckSize = decks.shape
+    startingNumPlayingCards = int(np.count_nonzero(decks[0] < NUM_NORMAL_CARDS))
+
+    # startGame draws the first card, which is always a normal card
+    currentCard = decks[:, 0].copy()
+    normalCardsDrawned = np.ones(numGames, dtype=np.int32)
+    score = np.zeros(numGames, dtype=np.int32)
+    currentRodmanCards = np.zeros(numGames, dtype=np.int32)
+    currentMjRound = np.zeros(numGames, dtype=np.int32)
+    isMjActivated = np.zeros(numGames, dtype=bool)
+    isRodmanActivated = np.zeros(numGames, dtype=bool)
+    isPlaying = np.ones(numGames, dtype=bool)
+
+    # every round draws exactly one card, so all games still playing are always at the same position in their deck
+    for roundIdx in range(deckSize - 1):
+        if not isPlaying.any():
+            break
+
+        nextCard = decks[:, roundIdx + 1]
+        isUserInputHigher = guesses[:, roundIdx]
+
+        isMjActivated |= isPlaying & (nextCard == MJ_CODE)
+        currentRodmanCards += isPlaying & (nextCard == RODMAN_CODE)
+
+        isNormal = isPlaying & (nextCard < NUM_NORMAL_CARDS)
+        isCorrect = np.where(isUserInputHigher, nextCard > currentCard, nextCard < currentCard)
+        normalCardsDrawned += isNormal
+
+        # MJ round, matching the target of the current round scores and moves on, missing it exits the MJ round
+        isInMjRound = isNormal & isMjActivated
+        isMjMatch = isInMjRound & (isCorrect == MJ_WINNING_SEQUENCE[np.minimum(currentMjRound, len(MJ_WINNING_SEQUENCE) - 1)])
+        score += isMjMatch
+        isMjWon = isMjMatch & (currentMjRound == len(MJ_WINNING_SEQUENCE) - 1)
+        score += isMjWon * Constant.MJ_BONUS_POINTS.value
+        isMjContinued = isMjMatch & ~isMjWon
+        currentMjRound += isMjContinued
+        isMjExited = isMjWon | (isInMjRound & ~isMjMatch)
+        isMjActivated &= ~isMjExited
+        currentMjRound[isMjExited] = 0
+
+        # outside of the MJ round, a wrong guess uses up a Rodman card if there is one, otherwise the game is over
+        isNormalRound = isNormal & ~isInMjRound
+        isRodmanWin = isNormalRound & isCorrect & isRodmanActivated
+        score += isRodmanWin * Constant.RODMAN_BONUS_POINTS.value
+        isRodmanActivated &= ~isRodmanWin
+        score += isNormalRound & isCorrect & ~isRodmanWin
+
+        isWrong = isNormalRound & ~isCorrect
+        isSecondChance = isWrong & (currentRodmanCards > 0) & (normalCardsDrawned < startingNumPlayingCards) & isBullsEdition
+        currentRodmanCards -= isSecondChance
+        isRodmanActivated |= isSecondChance
+
+        isLastCard = (isMjContinued | (isNormalRound & ~isWrong) | isSecondChance) & (normalCardsDrawned == startingNumPlayingCards)
+        isPlaying &= ~((isWrong & ~isSecondChance) | isLastCard)
+        currentCard = np.where(isNormal & isPlaying, nextCard, currentCard)
+
+    return score
@@ -0,0 +1,268 @@
+from .game import Constant, HigherLowerGame, NUM_NORMAL_CARDS
+from array import array
+import json
+import os
+import struct
+import sys
+
+
+# Only the order of the remaining cards matters for a guess, never their actual rank or suit, so the current card and the
+# remaining normal cards are reduced to "how many remaining cards are lower than the current card" (numLower) out of how
+# many remaining (numRemaining). Every state then has the canonical form:
+#   (cardsDrawn, numRemaining, numLower, currentRodmanCards, isRodmanActivated, currentMjRound or -1 when not in an MJ round)
+# and is stored as a context (everything except numLower) mapping to tables indexed by numLower.
+# This assumes every card value is distinct, which is true for a single deck.
+NO_MJ_ROUND = -1
+STARTING_NUM_PLAYING_CARDS = NUM_NORMAL_CARDS
+MJ_WINNING_SEQUENCE: list[int] = Constant.MJ_WINNING_SEQUENCE.value
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "higher-lower-game")
+
+# Saved tables are plain data, never unpickled: a header (magic, format version, length of the rules), the rules as JSON,
+# the number of contexts, then three little endian columns: the contexts as 5 int16s each, every context's values as
+# float64s and its guesses as one byte each (numRemaining + 1 of both per context, in the same order as the contexts).
+CACHE_MAGIC = b"HLSOLVER"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<8sII")
+CACHE_COUNT = struct.Struct("<I")
+
+class Solver:
+    def __init__(self, isBullsEdition: bool):
+        """
+        Initialises an exact solver of the best expected score (and the guess that achieves it) from any game state
+        """
+        self.isBullsEdition: bool = isBullsEdition
+        self.mjLocations: tuple[int] = tuple(sorted(Constant.MJ_LOCATIONS.value)) if isBullsEdition else ()
+        self.numRodmanCards: int = Constant.NUM_RODMAN_CARDS.value if isBullsEdition else 0
+        self.deckSize: int = STARTING_NUM_PLAYING_CARDS + self.numRodmanCards + len(self.mjLocations)
+
+        # context -> (expected future score for each numLower, isUserInputHigher for each numLower), this is also the memo used while solving
+        self.tables: dict[tuple, tuple[list[float], list[bool]]] = {}
+
+    def solveContext(self, cardsDrawn: int, numRemaining: int, rodmanCards: int, isRodmanActivated: bool, mjRound: int) -> tuple[list[float], list[bool]]:
+        """
+        Returns the expected future score, and the best guess, for every possible numLower in the given context
+        """
+        context = (cardsDrawn, numRemaining, rodmanCards, isRodmanActivated, mjRound)
+        if context in self.tables:
+            return self.tables[context]
+
+        if numRemaining == 0:
+            table = ([0.0], [True])
+        elif cardsDrawn in self.mjLocations:
+            # the next card is always an MJ card, which starts the MJ round (or carries on with the current one)
+            values, _ = self.solveContext(cardsDrawn + 1, numRemaining, rodmanCards, isRodmanActivated, max(mjRound, 0))
+            table = (values, [True] * (numRemaining + 1))
+        else:
+            table = self.computeGuessContext(cardsDrawn, numRemaining, rodmanCards, isRodmanActivated, mjRound)
+
+        self.tables[context] = table
+        return table
+
+    def computeGuessContext(self, cardsDrawn: int, numRemaining: int, rodmanCards: int, isRodmanActivated: bool, mjRound: int) -> tuple[list[float], list[bool]]:
+        """
+        Solves a context where the next card is either a Rodman card or one of the remaining normal cards (uniformly at random)
+        """
+        normalCardsDrawned = STARTING_NUM_PLAYING_CARDS - numRemaining
+        mjCardsDrawn = sum(1 for location in self.mjLocations if location < cardsDrawn)
+        rodmanCardsInDeck = self.numRodmanCards - (cardsDrawn - normalCardsDrawned - mjCardsDrawn)
+        probRodman = rodmanCardsInDeck / (rodmanCardsInDeck + numRemaining)
+
+        isLastCard = numRemaining == 1
+        nextContext = (cardsDrawn + 1, numRemaining - 1)
+
+        # (score gained, context of the following round or None when the game ends) for a correct and a wrong guess
+        if mjRound != NO_MJ_ROUND:
+            isTargetCorrect = MJ_WINNING_SEQUENCE[mjRound] == 1
+            matched = (1 + Constant.MJ_BONUS_POINTS.value, nextContext + (rodmanCards, isRodmanActivated, NO_MJ_ROUND)) if mjRound == len(MJ_WINNING_SEQUENCE) - 1 \
+                else (1, None if isLastCard else nextContext + (rodmanCards, isRodmanActivated, mjRound + 1))
+            missed = (0, nextContext + (rodmanCards, isRodmanActivated, NO_MJ_ROUND))
+            correct, wrong = (matched, missed) if isTargetCorrect else (missed, matched)
+        else:
+            points = Constant.RODMAN_BONUS_POINTS.value if isRodmanActivated else 1
+            correct = (points, None if isLastCard else nextContext + (rodmanCards, False, NO_MJ_ROUND))
+            if self.isBullsEdition and rodmanCards > 0 and not isLastCard:
+                wrong = (0, nextContext + (rodmanCards - 1, True, NO_MJ_ROUND))
+            else:
+                wrong = (0, None)
+
+        # the next card is the jth lowest remaining card, which makes numLower == j for the following round
+        def getOutcomeValues(outcome: tuple[int, tuple]) -> list[float]:
+            points, context = outcome
+            if context is None:
+                return [float(points)] * numRemaining
+            values, _ = self.solveContext(*context)
+            return [points + value for value in values]
+
+        correctPrefix = getPrefixSums(getOutcomeValues(correct))
+        wrongPrefix = getPrefixSums(getOutcomeValues(wrong))
+
+        if rodmanCardsInDeck:
+            rodmanValues, _ = self.solveContext(cardsDrawn + 1, numRemaining, rodmanCards + 1, isRodmanActivated, mjRound)
+
+        values: list[float] = []
+        guesses: list[bool] = []
+        for numLower in range(numRemaining + 1):
+            # guessing higher is correct for every j >= numLower, guessing lower is correct for every j < numLower
+            higher = wrongPrefix[numLower] + correctPrefix[numRemaining] - correctPrefix[numLower]
+            lower = correctPrefix[numLower] + wrongPrefix[numRemaining] - wrongPrefix[numLower]
+
+            value = (1 - probRodman) * max(higher, lower) / numRemaining
+            if rodmanCardsInDeck:
+                value += probRodman * rodmanValues[numLower]
+
+            values.append(value)
+            guesses.append(higher >= lower)
+
+        return values, guesses
+
+    def solve(self) -> float:
+        """
+        Solves every state reachable from the start of a game and returns the best achievable expected score
+        """
+        # startGame draws the first card, which is equally likely to be any of the normal cards
+        values, _ = self.solveContext(1, STARTING_NUM_PLAYING_CARDS - 1, 0, False, NO_MJ_ROUND)
+        return sum(values) / len(values)
+
+    def getState(self, game: HigherLowerGame) -> tuple:
+        """
+        Returns the canonical state of a game in progress
+        """
+        return (
+            self.deckSize - len(game.deck),
+            game.deck.getValueIndex().total,
+            game.deck.countLower(game.currentCard),
+            game.currentRodmanCards,
+            game.isRodmanActivated,
+            game.currentMjRound if game.isMjActivated else NO_MJ_ROUND,
+        )
+
+    def bestGuess(self, state: tuple) -> bool:
+        """
+        Returns the best isUserInputHigher for a canonical state (see getState), the tables must already be solved or loaded
+        """
+        cardsDrawn, numRemaining, numLower, rodmanCards, isRodmanActivated, mjRound = state
+        return self.tables[(cardsDrawn, numRemaining, rodmanCards, isRodmanActivated, mjRound)][1][numLower]
+
+    def getExpectedScore(self, state: tuple) -> float:
+        """
+        Returns the best achievable expected score from a canonical state onwards (not counting points already scored)
+        """
+        cardsDrawn, numRemaining, numLower, rodmanCards, isRodmanActivated, mjRound = state
+        return self.tables[(cardsDrawn, numRemaining, rodmanCards, isRodmanActivated, mjRound)][0][numLower]
+
+    def getDefaultPath(self) -> str:
+        return os.path.join(CACHE_DIR, f"solver_{'bulls' if self.isBullsEdition else 'normal'}.bin")
+
+    def getRules(self) -> list:
+        """
+        Returns everything the tables depend on (as JSON types), so tables solved under different rules are never loaded
+        """
+        return [self.isBullsEdition, STARTING_NUM_PLAYING_CARDS, list(self.mjLocations), self.numRodmanCards, list(MJ_WINNING_SEQUENCE), Constant.MJ_BONUS_POINTS.value, Constant.RODMAN_BONUS_POINTS.value]
+
+    def save(self, path: str = None) -> None:
+        path = path or self.getDefaultPath()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        contexts = array("h")
+        values = array("d")
+        guesses = bytearray()
+        for context, (contextValues, contextGuesses) in self.tables.items():
+            contexts.extend(int(field) for field in context)
+            values.extend(contextValues)
+            guesses.extend(contextGuesses)
+        if sys.byteorder == "big":
+            contexts.byteswap()
+            values.byteswap()
+
+        rules = json.dumps(self.getRules()).encode()
+        # written next to the cache and moved over it, so a process loading it never sees half a file
+        tempPath = f"{path}.{os.getpid()}.tmp"
+        with open(tempPath, "wb") as file:
+            file.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(rules)))
+            file.write(rules)
+            file.write(CACHE_COUNT.pack(len(self.tables)))
+            file.write(contexts.tobytes())
+            file.write(values.tobytes())
+            file.write(guesses)
+        os.replace(tempPath, path)
+
+    def load(self, path: str = None) -> bool:
+        """
+        Loads previously solved tables, returns False if there are none (or they were solved under different rules, or cannot be read)
+        """
+        path = path or self.getDefaultPath()
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return False
+
+        try:
+            magic, version, rulesLength = CACHE_HEADER.unpack_from(data)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                return False
+            offset = CACHE_HEADER.size
+            if json.loads(data[offset:offset + rulesLength]) != self.getRules():
+                return False
+            offset += rulesLength
+            numContexts, = CACHE_COUNT.unpack_from(data, offset)
+            offset += CACHE_COUNT.size
+
+            contexts = array("h", data[offset:offset + numContexts * 5 * 2])
+            offset += len(contexts) * 2
+            numCells = sum(contexts[i + 1] + 1 for i in range(0, len(contexts), 5))
+            values = array("d", data[offset:offset + numCells * 8])
+            offset += len(values) * 8
+            guesses = data[offset:]
+        except (struct.error, ValueError):
+            return False
+
+        if len(contexts) != numContexts * 5 or len(values) != numCells or len(guesses) != numCells:
+            return False
+        if sys.byteorder == "big":
+            contexts.byteswap()
+            values.byteswap()
+
+        tables: dict[tuple, tuple[list[float], list[bool]]] = {}
+        start = 0
+        for i in range(0, len(contexts), 5):
+            cardsDrawn, numRemaining, rodmanCards, isRodmanActivated, mjRound = contexts[i:i + 5]
+            end = start + numRemaining + 1
+            tables[(cardsDrawn, numRemaining, rodmanCards, bool(isRodmanActivated), mjRound)] = (values[start:end].tolist(), [bool(guess) for guess in guesses[start:end]])
+            start = end
+
+        self.tables = tables
+        return True
+
+def getPrefixSums(values: list[float]) -> list[float]:
+    prefixSums = [0.0]
+    for value in values:
+        prefixSums.append(prefixSums[-1] + value)
+    return prefixSums
+
+# one solver per edition in each process, keyed by isBullsEdition
+loadedSolvers: dict[bool, Solver] = {}
+
+def getSolver(isBullsEdition: bool) -> Solver:
+    """
+    Returns a solver with its tables ready, loading them from disk if they were solved by an earlier run
+    """
+    if isBullsEdition not in loadedSolvers:
+        solver = Solver(isBullsEdition)
+        if not solver.load():
+            solver.solve()
+            try:
+                solver.save()
+            except OSError:
+                # the tables are only cached to skip solving next time, the game can do without
+                pass
+        loadedSolvers[isBullsEdition] = solver
+
+    return loadedSolvers[isBullsEdition]
+
+if __name__ == "__main__":
+    for isBullsEdition in (False, True):
+        solver = Solver(isBullsEdition)
+        print(f"{'bulls' if isBullsEdition else 'normal':>6}: best expected score {solver.solve():.4f} over {len(solver.tables)} contexts")
+        if "--save" in sys.argv:
+            solver.save()
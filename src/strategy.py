@@ -0,0 +1,224 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+from .analytics import GameStats
+from .game import CARDS, Card, HigherLowerGame, getDeckSize
+from .solver import Solver, getSolver
+import argparse
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    # only needed by decideBatch, strategies can still be asked one game at a time
+    np = None
+
+
+NO_MJ_ROUND = -1
+SIM_EXTRA_MESSAGE = "deciding games in batches needs numpy, install the sim extra (pip install higher-lower-game[sim]) or use a batch size of 1"
+
+class GameSnapshot(NamedTuple):
+    """
+    Everything a strategy may look at before a guess, copied out of the game so strategies cannot change it
+    """
+    isBullsEdition: bool
+    numDecks: int
+    currentCardId: int
+    currentRank: int
+    # cards drawn from the deck so far, special cards included
+    cardsDrawn: int
+    # normal cards left in the deck, and how many of them are lower / higher than the current card (the rest are equal to it)
+    numRemaining: int
+    numLower: int
+    numHigher: int
+    rodmanCards: int
+    isRodmanActivated: bool
+    mjRound: int
+    # during an MJ round, 1 if this guess must be right and 0 if it must be wrong, otherwise NO_MJ_ROUND
+    mjTarget: int
+
+    @property
+    def currentCard(self) -> Card:
+        return CARDS[self.currentCardId]
+
+class SnapshotBatch(NamedTuple):
+    """
+    The same fields as GameSnapshot, each holding a numpy array with one entry per game
+    """
+    isBullsEdition: "np.ndarray"
+    numDecks: "np.ndarray"
+    currentCardId: "np.ndarray"
+    currentRank: "np.ndarray"
+    cardsDrawn: "np.ndarray"
+    numRemaining: "np.ndarray"
+    numLower: "np.ndarray"
+    numHigher: "np.ndarray"
+    rodmanCards: "np.ndarray"
+    isRodmanActivated: "np.ndarray"
+    mjRound: "np.ndarray"
+    mjTarget: "np.ndarray"
+
+    @classmethod
+    def fromSnapshots(cls, snapshots: list[GameSnapshot]) -> "SnapshotBatch":
+        return cls(*(np.array(field) for field in zip(*snapshots)))
+
+def getSnapshot(game: HigherLowerGame) -> GameSnapshot:
+    valueIndex = game.deck.getValueIndex()
+    mjRound = game.currentMjRound if game.isMjActivated else NO_MJ_ROUND
+    return GameSnapshot(
+        game.isBullsEdition,
+        game.deck.numDecks,
+        game.currentCard.id,
+        game.currentCard.rank.value,
+        getDeckSize(game.isBullsEdition, game.deck.numDecks) - len(game.deck),
+        valueIndex.total,
+        valueIndex.countLower(game.currentCard.value),
+        valueIndex.countHigher(game.currentCard.value),
+        game.currentRodmanCards,
+        game.isRodmanActivated,
+        mjRound,
+        game.rules.mjWinningSequence[mjRound] if game.isMjActivated else NO_MJ_ROUND,
+    )
+
+class Strategy(ABC):
+    """
+    Decides isUserInputHigher from a snapshot of the game. Strategies are looked up by name in BOTS, so they can be used in worker processes.
+    """
+    @abstractmethod
+    def decide(self, snapshot: GameSnapshot) -> bool:
+        pass
+
+    def decideBatch(self, batch: SnapshotBatch) -> "np.ndarray":
+        """
+        Decides for many games at once, strategies that can be vectorised override this
+        """
+        return np.array([self.decide(GameSnapshot(*fields)) for fields in zip(*batch)], dtype=bool)
+
+class AlwaysHigher(Strategy):
+    def decide(self, snapshot: GameSnapshot) -> bool:
+        return True
+
+    def decideBatch(self, batch: SnapshotBatch) -> "np.ndarray":
+        return np.ones(len(batch.currentRank), dtype=bool)
+
+class Midpoint(Strategy):
+    """
+    Guesses higher when the current card is in the bottom half of the ranks
+    """
+    def decide(self, snapshot: GameSnapshot) -> bool:
+        return snapshot.currentRank < 8
+
+    def decideBatch(self, batch: SnapshotBatch) -> "np.ndarray":
+        return batch.currentRank < 8
+
+class CardCounting(Strategy):
+    """
+    Guesses whichever way more of the remaining cards lie
+    """
+    def decide(self, snapshot: GameSnapshot) -> bool:
+        return snapshot.numHigher >= snapshot.numLower
+
+    def decideBatch(self, batch: SnapshotBatch) -> "np.ndarray":
+        return batch.numHigher >= batch.numLower
+
+class MjAware(Strategy):
+    """
+    Counts cards like CardCounting, but deliberately guesses the unlikely way when the MJ sequence asks for a wrong guess
+    """
+    def decide(self, snapshot: GameSnapshot) -> bool:
+        if snapshot.mjTarget == 0:
+            return snapshot.numHigher < snapshot.numLower
+        return snapshot.numHigher >= snapshot.numLower
+
+    def decideBatch(self, batch: SnapshotBatch) -> "np.ndarray":
+        isHigherLikely = batch.numHigher >= batch.numLower
+        return np.where(batch.mjTarget == 0, ~isHigherLikely, isHigherLikely)
+
+class Optimal(Strategy):
+    """
+    Plays the guess that maximises the expected final score. The Solver only covers single deck games, so in a shoe of
+    several decks it counts cards like MjAware instead.
+    """
+    def __init__(self):
+        # solved on first use in each process, keyed by isBullsEdition
+        self.solvers: dict[bool, Solver] = {}
+        self.multiDeckStrategy: Strategy = MjAware()
+
+    def decide(self, snapshot: GameSnapshot) -> bool:
+        if snapshot.numDecks != 1:
+            return self.multiDeckStrategy.decide(snapshot)
+
+        if snapshot.isBullsEdition not in self.solvers:
+            self.solvers[snapshot.isBullsEdition] = getSolver(snapshot.isBullsEdition)
+
+        return self.solvers[snapshot.isBullsEdition].bestGuess(
+            (snapshot.cardsDrawn, snapshot.numRemaining, snapshot.numLower, snapshot.rodmanCards, snapshot.isRodmanActivated, snapshot.mjRound)
+        )
+
+BOTS: dict[str, Strategy] = {
+    "alwaysHigher": AlwaysHigher(),
+    "midpoint": Midpoint(),
+    "cardCounting": CardCounting(),
+    "mjAware": MjAware(),
+    "optimal": Optimal(),
+}
+
+def runStrategy(strategy: Strategy, numGames: int, isBullsEdition: bool, seed: int = 0, batchSize: int = 1024, numDecks: int = 1) -> tuple[GameStats, float]:
+    """
+    Plays numGames games through playRound, batchSize of them side by side so the strategy decides for all of them in one decideBatch call
+
+    :param batchSize: games played side by side, 1 asks the strategy one game at a time with decide instead
+    :returns: the aggregated games, and the strategy's decisions per second (time spent in decide / decideBatch only, not taking the snapshots)
+    """
+    if batchSize > 1 and np is None:
+        raise ImportError(SIM_EXTRA_MESSAGE)
+
+    rng = random.Random(seed)
+    stats = GameStats()
+    games: list[HigherLowerGame] = []
+    numStarted = 0
+    numDecisions = 0
+    decideTime = 0.0
+
+    while numStarted < numGames or games:
+        while len(games) < batchSize and numStarted < numGames:
+            game = HigherLowerGame()
+            game.gameOverListeners.append(stats.add)
+            game.configureSpecialEdition(isBullsEdition, rng, numDecks)
+            game.startGame()
+            games.append(game)
+            numStarted += 1
+
+        if batchSize == 1:
+            snapshot = getSnapshot(games[0])
+            start = time.perf_counter()
+            guesses = [strategy.decide(snapshot)]
+        else:
+            batch = SnapshotBatch.fromSnapshots([getSnapshot(game) for game in games])
+            start = time.perf_counter()
+            guesses = strategy.decideBatch(batch).tolist()
+        decideTime += time.perf_counter() - start
+        numDecisions += len(games)
+
+        games = [game for game, isUserInputHigher in zip(games, guesses) if game.playRound(isUserInputHigher)]
+
+    return stats, numDecisions / decideTime
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays games with one of the bots and reports its decisions per second")
+    parser.add_argument("--bot", default="mjAware", choices=list(BOTS))
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1024, help="games decided in one call (1 decides one game at a time)")
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bulls", action="store_true", help="play the Bulls edition")
+    args = parser.parse_args()
+    if args.batch > 1 and np is None:
+        parser.error(SIM_EXTRA_MESSAGE)
+
+    start = time.perf_counter()
+    stats, decisionsPerSec = runStrategy(BOTS[args.bot], args.games, args.bulls, args.seed, args.batch, args.decks)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.bot}: mean score {stats.getMeanScore():.2f} over {stats.numGames} games")
+    print(f"{decisionsPerSec:,.0f} decisions/sec, {stats.numGames / elapsed:,.0f} games/sec including playRound")
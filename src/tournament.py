@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+from .analytics import GameStats
+from .game import HigherLowerGame
+from .strategy import BOTS, Strategy, getSnapshot
+import argparse
+import os
+import random
+
+
+def getGameRng(seed: int, worker: int, index: int) -> random.Random:
+    """
+    Returns the random number generator for a single game, every (seed, worker, index) triple gets its own independent stream
+    """
+    # string seeds are hashed with sha512, so neighbouring triples do not give correlated streams
+    return random.Random(f"{seed}:{worker}:{index}")
+
+def playGame(strategy: Strategy, isBullsEdition: bool, rng: random.Random) -> HigherLowerGame:
+    """
+    Plays a full game with the given strategy and returns the finished game
+    """
+    game = HigherLowerGame()
+    game.configureSpecialEdition(isBullsEdition, rng)
+    game.startGame()
+
+    while game.playRound(strategy.decide(getSnapshot(game))):
+        pass
+
+    return game
+
+def replayGame(seed: int, worker: int, index: int, strategy: Strategy, isBullsEdition: bool) -> HigherLowerGame:
+    """
+    Replays a single game of a tournament from its (seed, worker, index) triple
+    """
+    return playGame(strategy, isBullsEdition, getGameRng(seed, worker, index))
+
+def runWorker(seed: int, worker: int, numGames: int, strategyNames: list[str], isBullsEdition: bool) -> dict[str, GameStats]:
+    """
+    Plays numGames decks in one worker process, every strategy plays the same decks so they are compared fairly (strategies are
+    passed by name, see strategy.BOTS)
+
+    :returns: the aggregated games of each strategy
+    """
+    stats: dict[str, GameStats] = {name: GameStats() for name in strategyNames}
+
+    for index in range(numGames):
+        for name in strategyNames:
+            stats[name].add(replayGame(seed, worker, index, BOTS[name], isBullsEdition))
+
+    return stats
+
+def runTournament(numGames: int, strategyNames: list[str], isBullsEdition: bool, seed: int = 0, numWorkers: int = None) -> dict[str, GameStats]:
+    """
+    Spreads numGames games per strategy across a process pool and merges the workers' aggregates
+
+    :param numWorkers: number of worker processes (defaults to the number of cores)
+    """
+    numWorkers = numWorkers or os.cpu_count() or 1
+    gamesPerWorker = [numGames // numWorkers + (1 if worker < numGames % numWorkers else 0) for worker in range(numWorkers)]
+
+    stats: dict[str, GameStats] = {name: GameStats() for name in strategyNames}
+    with ProcessPoolExecutor(max_workers=numWorkers) as executor:
+        futures = [
+            executor.submit(runWorker, seed, worker, gamesPerWorker[worker], strategyNames, isBullsEdition)
+            for worker in range(numWorkers) if gamesPerWorker[worker] > 0
+        ]
+        for future in futures:
+            for name, workerStats in future.result().items():
+                stats[name].merge(workerStats)
+
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plays guessing strategies against each other over many games")
+    parser.add_argument("--games", type=int, default=10_000, help="number of games played by each strategy")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (defaults to the number of cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bulls", action="store_true", help="play the Bulls edition")
+    parser.add_argument("--strategies", nargs="+", default=list(BOTS), choices=list(BOTS))
+    args = parser.parse_args()
+
+    results = runTournament(args.games, args.strategies, args.bulls, args.seed, args.workers)
+    for name, stats in sorted(results.items(), key=lambda item: item[1].getMeanScore(), reverse=True):
+        summary = stats.getSummary()
+        print(
+            f"{name:>16}: mean {summary['meanScore']:6.2f}  median {summary['scoreQuantiles']['0.5']:3}  max {summary['maxScore']:3}  "
+            f"last card {summary['reachedLastCardRate']:6.2%}  Rodman used {summary['rodmanUseRate']:6.2%}  "
+            f"MJ entered {summary['mjEntryRate']:6.2%}  MJ completed {summary['mjCompletionRate']:6.2%}"
+        )
@@ -0,0 +1,11 @@
+from benchmarks.deckconstruction import checkDistribution, getBulkDecks, getSinglePassDecks
+from src.game import getDeckSize
+import pytest
+
+
+@pytest.mark.parametrize("getDecks", (getSinglePassDecks, getBulkDecks))
+def testDecksMatchLegacyShuffle(getDecks):
+    # seeded, so this is deterministic, the thresholds only say how unlikely a real match would be to fail
+    minPositionPValue, pairPValue = checkDistribution(getDecks, 2_000, seed=0)
+    assert minPositionPValue > 0.001 / getDeckSize(True)
+    assert pairPValue > 0.001
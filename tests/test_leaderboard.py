@@ -0,0 +1,20 @@
+from benchmarks.leaderboard import loadTest
+from src.leaderboard import Leaderboard
+import os
+
+
+def testConcurrentWritersLoseNoScores(tmp_path):
+    path = os.path.join(tmp_path, "leaderboard.db")
+    loadTest(path, numWriters=4, scoresPerWriter=500)
+
+    leaderboard = Leaderboard(path)
+    try:
+        numRows = leaderboard.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        assert numRows == 4 * 500
+        assert leaderboard.getNumGames(False) + leaderboard.getNumGames(True) == numRows
+
+        topScores = [entry.score for entry in leaderboard.getTopScores(10)]
+        maxScore = leaderboard.connection.execute("SELECT MAX(score) FROM scores").fetchone()[0]
+        assert topScores == sorted(topScores, reverse=True) and topScores[0] == maxScore
+    finally:
+        leaderboard.close()
@@ -0,0 +1,6 @@
+from benchmarks.ruleengine import checkDifferential
+
+
+def testRuleTableMatchesLegacyEngine():
+    # covers both editions, multi deck shoes, the tie rule and back to back MJ cards
+    assert checkDifferential(1_000) == 0
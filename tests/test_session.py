@@ -0,0 +1,42 @@
+from benchmarks.sessionstore import checkRoundTrip
+from src.game import HigherLowerGame, RuleTable
+from src.server import GameServer
+from src.session import SessionStore, packGame
+import json
+import pytest
+
+
+def testRoundTrip():
+    assert checkRoundTrip(500) == 0
+
+def testCustomRulesAreNotPacked(tmp_path):
+    game = HigherLowerGame()
+    game.rules = RuleTable([1, 0, 1], 20, 5)
+    game.configureSpecialEdition(True)
+    game.startGame()
+
+    with pytest.raises(ValueError):
+        packGame(game)
+
+    store = SessionStore(0, str(tmp_path))
+    with pytest.raises(ValueError):
+        store.put("custom", game)
+    store.close()
+
+def testServerSpillsGamesToStore():
+    server = GameServer(maxHotBytes=0)
+    request = lambda **fields: json.loads(server.handleLine(json.dumps(fields).encode()))
+
+    sessionIds = [request(op="start", bulls=True, seed=seed)["session"] for seed in range(5)]
+    # with no memory budget only the most recently used game stays in memory
+    assert len(server.store.hot) == 1 and len(server.store.cold) == 4
+
+    for sessionId in sessionIds:
+        state = request(op="state", session=sessionId)["state"]
+        response = request(op="guess", session=sessionId, higher=True)
+        assert response["ok"] and response["state"]["isOver"] == (not response["continue"])
+        assert response["state"]["score"] >= state["score"]
+
+    server.idleTimeout = -1
+    assert server.expireIdleSessions() == 5 and len(server.store) == 0
+    server.store.close()
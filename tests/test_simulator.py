@@ -0,0 +1,11 @@
+import pytest
+
+# the simulator and its conformance check need numpy, from the sim extra
+pytest.importorskip("numpy")
+
+from benchmarks.simulator import checkConformance
+
+
+@pytest.mark.parametrize("isBullsEdition", (False, True))
+def testSimulatorMatchesEngine(isBullsEdition: bool):
+    assert checkConformance(300, isBullsEdition, seed=0) == 0